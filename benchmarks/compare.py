@@ -0,0 +1,92 @@
+"""
+    Compare two result files of the `run_benchmarks.py`, print the changes of per case, and exit with 1 when any case regressed more than the threshold,
+    or the new version has the failed urls (or more failed / less succeeded urls than the baseline), so it can guard the upgrades in the CI:
+
+        python benchmarks/compare.py benchmarks/results/base.json benchmarks/results/new.json --threshold 0.1
+"""
+import sys
+import json
+from argparse import ArgumentParser
+from typing import Any
+
+# the metric, the path to get it from a result, and wheather the bigger is the better
+_METRICS = (
+    ('throughput', ('throughput',), True),
+    ('p50', ('latency', 'p50'), False),
+    ('p99', ('latency', 'p99'), False),
+    ('peak_rss', ('peak_rss_mb',), False),
+)
+
+
+def _get_value(result: dict[str, Any], keys: tuple[str, ...]) -> float | None:
+    value: Any = result
+    for key in keys:
+        if not isinstance(value, dict) or value.get(key) is None:
+            return None
+        value = value[key]
+    return float(value)
+
+
+def _load_results(path: str) -> dict[str, dict[str, Any]]:
+    with open(path, 'r', encoding='utf-8') as file:
+        return {result['name']: result for result in json.load(file)['results'] if 'skipped' not in result}
+
+
+def compare(base_path: str, new_path: str, threshold: float = 0.1) -> list[str]:
+    """
+        print the changes between the two result files, and return the regressed `case: metric` list.
+    """
+    base_results, new_results = _load_results(base_path), _load_results(new_path)
+    regressions = []
+    print(f'{"case":<45}' + ''.join(f'{name:>22}' for name, _, _ in _METRICS))
+    for name in sorted(base_results.keys() & new_results.keys()):
+        if 'error' in base_results[name] or 'error' in new_results[name]:
+            print(f'{name:<45} error in {base_path if "error" in base_results[name] else new_path}')
+            continue
+        cells = []
+        for metric, keys, bigger_is_better in _METRICS:
+            base_value, new_value = _get_value(base_results[name], keys), _get_value(new_results[name], keys)
+            if not base_value or new_value is None:
+                cells.append(f'{"-":>22}')
+                continue
+            change = (new_value - base_value) / base_value
+            regressed = -change > threshold if bigger_is_better else change > threshold
+            if regressed:
+                regressions.append(f'{name}: {metric}')
+            cell = f'{change:+.1%}' + (' !' if regressed else '')
+            cells.append(f'{cell:>22}')
+        print(f'{name:<45}' + ''.join(cells))
+    for name in sorted(base_results.keys() - new_results.keys()):
+        print(f'{name:<45} only in {base_path}')
+    for name in sorted(new_results.keys() - base_results.keys()):
+        print(f'{name:<45} only in {new_path}')
+    # the timings of the failed urls look like a speedup, so any failures of the new version are the regressions
+    for name in sorted(base_results.keys() & new_results.keys()):
+        base_failed = _get_value(base_results[name], ('failed',)) or 0
+        new_failed = _get_value(new_results[name], ('failed',)) or 0
+        base_succeeded = _get_value(base_results[name], ('succeeded',)) or 0
+        new_succeeded = _get_value(new_results[name], ('succeeded',)) or 0
+        if new_failed > 0 or new_failed > base_failed or new_succeeded < base_succeeded:
+            regressions.append(f'{name}: failed {base_failed:.0f} -> {new_failed:.0f}, succeeded {base_succeeded:.0f} -> {new_succeeded:.0f}')
+    for name in sorted(new_results.keys()):
+        if 'error' in new_results[name]:
+            regressions.append(f'{name}: error')
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    argument_parser = ArgumentParser(description='compare two result files of the preparser benchmarks.')
+    argument_parser.add_argument('base', help='the result json of the baseline version.')
+    argument_parser.add_argument('new', help='the result json of the new version.')
+    argument_parser.add_argument('--threshold', type=float, default=0.1, help='the allowed ratio of the change before it counts as a regression, default is 0.1.')
+    args = argument_parser.parse_args(argv)
+    regressions = compare(args.base, args.new, args.threshold)
+    if regressions:
+        print(f'{len(regressions)} regressions over {args.threshold:.0%}: {", ".join(regressions)}')
+        return 1
+    print(f'no regressions over {args.threshold:.0%} !')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
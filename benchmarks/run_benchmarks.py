@@ -0,0 +1,280 @@
+"""
+    The offline benchmarks of the `PreParser`, which parse the synthetic pages of the local `server.py` in the matrix of
+    `parser_mode`, `threading_mode`, `threading_numbers` and `parser_backend`, and write the throughput, the latency percentiles,
+    the average seconds of per phase and the peak RSS of per case into a json file, compare two of them by `compare.py`.
+
+    per case runs in a fresh python process, so the peak RSS and the imported modules of a case won't leak into the next one,
+    and the preparser of this working tree is benchmarked, so checkout the other version and run it again to compare.
+
+        python benchmarks/run_benchmarks.py                          # the default matrix
+        python benchmarks/run_benchmarks.py --quick                  # a small matrix to check quickly
+        python benchmarks/run_benchmarks.py --modes html --threading-modes map,async --threading-numbers 8 --backends html.parser,lxml
+"""
+import os
+import sys
+import json
+import platform
+import subprocess
+from time import perf_counter, strftime
+from argparse import ArgumentParser
+from importlib.util import find_spec
+from itertools import product
+from statistics import median
+from typing import Any
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCHMARK_DIR)
+
+# the optional packages of the cases, the case is skipped when it's not installed
+_BACKEND_MODULES = {'html.parser': None, 'lxml': 'lxml', 'html5lib': 'html5lib', 'selectolax': 'selectolax'}
+_THREADING_MODE_MODULES = {'none': None, 'map': None, 'single': None, 'async': 'aiohttp'}
+
+
+# the callbacks do a little of the typical work, and return a not None result to stand for the success
+def _count_html_items(url: str, soup) -> int:
+    from bs4 import Tag
+    if isinstance(soup, Tag):
+        return len(soup.select('div.item'))
+    return len(soup.css('div.item'))  # the selectolax html tree of the `selectolax` backend
+
+
+def _count_json_items(url: str, data) -> int:
+    return len(data['items'])
+
+
+def _percentile(sorted_values: list[float], percent: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(percent / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def _peak_rss_mb() -> float | None:
+    try:
+        import resource
+    except ImportError:  # windows
+        return None
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak_rss / (1024 * 1024) if sys.platform == 'darwin' else peak_rss / 1024  # bytes on mac, KB on linux
+
+
+def run_case(case: dict[str, Any]) -> dict[str, Any]:
+    """
+        run a case in current process, and return its metrics.
+    """
+    sys.path.insert(0, ROOT_DIR)
+    from preparser import PreParser
+    import_rss_mb = _peak_rss_mb()
+    latencies: list[float] = []
+    parser_mode = case['parser_mode']
+    if parser_mode == 'api':
+        path, callback = f'json/{case["json_items"]}', _count_json_items
+    elif parser_mode == 'html_dynamic':
+        path, callback = f'js/{case["js_items"]}', _count_html_items
+    else:
+        path, callback = f'html/{case["html_kb"]}', _count_html_items
+    url_list = [f'{case["base_url"]}/{path}/{index}' for index in range(case['urls'])]
+    parser = PreParser(
+        url_list=url_list,
+        request_call_back_func=callback,
+        parser_mode=parser_mode,
+        start_threading=case['threading_mode'] != 'none',
+        threading_mode=case['threading_mode'] if case['threading_mode'] != 'none' else 'single',
+        threading_numbers=case['threading_numbers'],
+        stop_when_task_failed=False,
+        html_dynamic_scope=['#main', 'attached'] if parser_mode == 'html_dynamic' else None,
+        parser_backend=case['parser_backend'],
+        metric_hooks=[lambda trace: latencies.append(trace.phases.get('total', 0.0))],
+    )
+    started = perf_counter()
+    parser.start_parse()
+    seconds = perf_counter() - started
+    snapshot = parser.metricer.snapshot()
+    latencies.sort()
+    return {
+        'seconds': seconds,
+        'succeeded': snapshot['urls']['succeeded'],
+        'failed': snapshot['urls']['failed'],
+        'throughput': case['urls'] / seconds if seconds else 0.0,
+        'body_mb': snapshot['body_bytes'] / (1024 * 1024),
+        'latency': {f'p{percent}': _percentile(latencies, percent) for percent in (50, 90, 95, 99)} | {'max': latencies[-1] if latencies else 0.0},
+        'phases': {name: histogram['avg'] for name, histogram in snapshot['phases'].items()},
+        'import_rss_mb': import_rss_mb,
+        'peak_rss_mb': _peak_rss_mb(),
+    }
+
+
+def _is_browser_installed() -> bool:
+    if find_spec('playwright') is None:
+        return False
+    try:
+        from playwright.sync_api import sync_playwright
+        with sync_playwright() as p:
+            return any(os.path.exists(browser.executable_path) for browser in (p.chromium, p.firefox, p.webkit))
+    except Exception:
+        return False
+
+
+def build_cases(args) -> list[dict[str, Any]]:
+    cases = []
+    for parser_mode, threading_mode in product(args.modes, args.threading_modes):
+        # the backends don't matter to the json, and the threading_numbers don't matter without threading
+        backends = ['html.parser'] if parser_mode == 'api' else args.backends
+        threading_numbers_list = [1] if threading_mode == 'none' else args.threading_numbers
+        html_kb_list = args.html_kb if parser_mode == 'html' else [args.html_kb[0]]
+        for backend, threading_numbers, html_kb in product(backends, threading_numbers_list, html_kb_list):
+            name = f'{parser_mode}/{threading_mode}/{threading_numbers}/{backend}'
+            if parser_mode == 'html':
+                name += f'/{html_kb}kb'
+            cases.append({
+                'name': name,
+                'parser_mode': parser_mode,
+                'threading_mode': threading_mode,
+                'threading_numbers': threading_numbers,
+                'parser_backend': backend,
+                'html_kb': html_kb,
+                'json_items': args.json_items,
+                'js_items': args.js_items,
+                'urls': args.dynamic_urls if parser_mode == 'html_dynamic' else args.urls,
+            })
+    return cases
+
+
+def _get_skip_reason(case: dict[str, Any], browser_installed: bool) -> str | None:
+    backend_module = _BACKEND_MODULES.get(case['parser_backend'])
+    if backend_module and find_spec(backend_module) is None:
+        return f'the parser_backend {case["parser_backend"]} is not installed'
+    threading_module = _THREADING_MODE_MODULES.get(case['threading_mode'])
+    if threading_module and find_spec(threading_module) is None:
+        return f'the {threading_module} of the {case["threading_mode"]} threading_mode is not installed'
+    if case['parser_mode'] == 'html_dynamic' and not browser_installed:
+        return 'no playwright browser is installed'
+    return None
+
+
+def _run_case_process(case: dict[str, Any], timeout: float) -> dict[str, Any]:
+    try:
+        completed = subprocess.run([sys.executable, os.path.abspath(__file__), '--case', json.dumps(case)],
+                                   capture_output=True, text=True, timeout=timeout, stdin=subprocess.DEVNULL)
+    except subprocess.TimeoutExpired:
+        return {'error': f'timeout after {timeout} seconds'}
+    if completed.returncode != 0 or not completed.stdout.strip():
+        return {'error': (completed.stderr.strip() or f'exit code {completed.returncode}')[-2000:]}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def _summarize_runs(runs: list[dict[str, Any]]) -> dict[str, Any]:
+    # the median of the repeated runs, so a noisy run won't make a fake regression
+    summary = {key: median(run[key] for run in runs) for key in ('seconds', 'throughput', 'body_mb')}
+    # but the worst counts of the urls, so a flaky failure won't be hidden
+    summary['succeeded'] = min(run['succeeded'] for run in runs)
+    summary['failed'] = max(run['failed'] for run in runs)
+    summary['latency'] = {key: median(run['latency'][key] for run in runs) for key in runs[0]['latency']}
+    summary['phases'] = {key: median(run['phases'].get(key, 0.0) for run in runs) for key in runs[0]['phases']}
+    for key in ('import_rss_mb', 'peak_rss_mb'):
+        values = [run[key] for run in runs if run[key] is not None]
+        summary[key] = max(values) if values else None
+    return summary
+
+
+def _get_git_commit() -> str | None:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR, capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def _get_preparser_version() -> str:
+    try:
+        from importlib.metadata import version
+        return version('preparser')
+    except Exception:
+        return 'unknown'
+
+
+def main(argv: list[str] | None = None) -> int:
+    argument_parser = ArgumentParser(description='the offline benchmarks of the preparser.')
+    split = lambda value: [item.strip() for item in value.split(',') if item.strip()]
+    split_int = lambda value: [int(item) for item in split(value)]
+    argument_parser.add_argument('--case', help='run a single json case in current process, used by the benchmark itself.')
+    argument_parser.add_argument('--modes', type=split, default=['html', 'api', 'html_dynamic'], help='the parser_mode list, default is html,api,html_dynamic.')
+    argument_parser.add_argument('--threading-modes', type=split, default=['none', 'map', 'single', 'async'], help='the threading_mode list, `none` means start_threading=False, default is none,map,single,async.')
+    argument_parser.add_argument('--threading-numbers', type=split_int, default=[4, 16], help='the threading_numbers list, default is 4,16.')
+    argument_parser.add_argument('--backends', type=split, default=['html.parser', 'lxml', 'selectolax'], help='the parser_backend list of the html modes, default is html.parser,lxml,selectolax.')
+    argument_parser.add_argument('--html-kb', type=split_int, default=[16, 256], help='the size list of the static html pages in KB, default is 16,256.')
+    argument_parser.add_argument('--json-items', type=int, default=5000, help='the records of per json response, default is 5000.')
+    argument_parser.add_argument('--js-items', type=int, default=200, help='the nodes built by the javascript of per dynamic page, default is 200.')
+    argument_parser.add_argument('--urls', type=int, default=200, help='the urls of per case, default is 200.')
+    argument_parser.add_argument('--dynamic-urls', type=int, default=30, help='the urls of per html_dynamic case, default is 30.')
+    argument_parser.add_argument('--repeat', type=int, default=3, help='run per case this times and keep the median, default is 3.')
+    argument_parser.add_argument('--timeout', type=float, default=600, help='the maximum seconds of per run, default is 600.')
+    argument_parser.add_argument('--quick', action='store_true', help='a small matrix to check quickly: 50 urls, 1 repeat, threading_numbers 8 and the html.parser backend.')
+    argument_parser.add_argument('--output', help='the path of the result json, default is benchmarks/results/preparser-<commit>-<time>.json.')
+    args = argument_parser.parse_args(argv)
+
+    if args.case:
+        print(json.dumps(run_case(json.loads(args.case))))
+        return 0
+
+    if args.quick:
+        args.urls, args.dynamic_urls, args.repeat = 50, 10, 1
+        args.threading_numbers, args.backends, args.html_kb = [8], ['html.parser'], [64]
+
+    from server import BenchmarkServer
+    browser_installed = 'html_dynamic' in args.modes and _is_browser_installed()
+    git_commit = _get_git_commit()
+    results = []
+    failed_cases = []
+    with BenchmarkServer() as server:
+        for case in build_cases(args):
+            case['base_url'] = server.base_url
+            result: dict[str, Any] = {'name': case['name'], 'case': {key: value for key, value in case.items() if key not in ('name', 'base_url')}}
+            skip_reason = _get_skip_reason(case, browser_installed)
+            if skip_reason:
+                result['skipped'] = skip_reason
+                print(f'{case["name"]:<45} skipped, {skip_reason}')
+                results.append(result)
+                continue
+            runs = [_run_case_process(case, args.timeout) for _ in range(args.repeat)]
+            errors = [run['error'] for run in runs if 'error' in run]
+            if errors:
+                result['error'] = errors[0]
+                failed_cases.append(case['name'])
+                print(f'{case["name"]:<45} error, {errors[0].splitlines()[-1]}')
+            else:
+                result.update(_summarize_runs(runs))
+                result['runs'] = runs
+                print(f'{case["name"]:<45} {result["throughput"]:>9.1f} urls/s  p50 {result["latency"]["p50"] * 1000:>8.1f} ms  '
+                      f'p99 {result["latency"]["p99"] * 1000:>8.1f} ms  rss {result["peak_rss_mb"] or 0:>7.1f} MB  ok {result["succeeded"]:.0f}/{case["urls"]}'
+                      + ('  FAILED' if result['failed'] else ''))
+                if result['failed']:
+                    failed_cases.append(case['name'])
+            results.append(result)
+
+    output = args.output or os.path.join(BENCHMARK_DIR, 'results', f'preparser-{git_commit or _get_preparser_version()}-{strftime("%Y%m%d-%H%M%S")}.json')
+    output_dir = os.path.dirname(os.path.abspath(output))
+    os.makedirs(output_dir, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as file:
+        json.dump({
+            'meta': {
+                'preparser_version': _get_preparser_version(),
+                'git_commit': git_commit,
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'machine': platform.machine(),
+                'cpu_count': os.cpu_count(),
+                'created_at': strftime('%Y-%m-%dT%H:%M:%S%z'),
+                'repeat': args.repeat,
+            },
+            'results': results,
+        }, file, ensure_ascii=False, indent=2)
+    print(f'saved the results into {output} !')
+    if failed_cases:
+        # the timings of the failed urls are not comparable, so don't let them pass as the results
+        print(f'{len(failed_cases)} cases failed or had the failed urls: {", ".join(failed_cases)}')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""
+    A slight local HTTP server for the benchmarks, which serves the synthetic pages, so the benchmarks run offline and get the same pages every time:
+
+        /html/<size_kb>/<index>     the static html page of about `size_kb` KB, with the `div.item` nodes in the `#main` node.
+        /json/<items>/<index>       the json of `{"index": ..., "items": [...]}` with `items` records.
+        /js/<items>/<index>         the page which builds its `#main` node with javascript, for the `html_dynamic` mode.
+
+    run it alone to try the pages in the browser:
+
+        python benchmarks/server.py --port 8765
+"""
+import json
+import threading
+from argparse import ArgumentParser
+from functools import lru_cache
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+@lru_cache(maxsize=64)
+def _html_items(size_kb: int) -> str:
+    # the bulk of the page is built once per size, only the head is different for per index
+    items = []
+    size = 0
+    index = 0
+    while size < size_kb * 1024:
+        item = (f'<div class="item" data-id="{index}"><h2><a href="/detail/{index}">the title of item {index}</a></h2>'
+                f'<p class="desc">the description of item {index}, which makes the page look like a real listing page.</p>'
+                f'<span class="price">{index * 7 % 1000}.{index % 100:02d}</span></div>\n')
+        items.append(item)
+        size += len(item)
+        index += 1
+    return ''.join(items)
+
+
+def render_html(size_kb: int, index: int) -> bytes:
+    return (f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>page {index}</title></head>'
+            f'<body><div id="header"><h1>page {index}</h1></div><div id="main">\n{_html_items(size_kb)}</div>'
+            f'<div id="footer"><p>the end of page {index}</p></div></body></html>').encode('utf-8')
+
+
+@lru_cache(maxsize=64)
+def _json_items(items: int) -> str:
+    return json.dumps([{'id': index, 'name': f'item {index}', 'price': index * 7 % 1000, 'tags': ['a', 'b', 'c'], 'active': index % 2 == 0} for index in range(items)])
+
+
+def render_json(items: int, index: int) -> bytes:
+    return f'{{"index": {index}, "items": {_json_items(items)}}}'.encode('utf-8')
+
+
+def render_js(items: int, index: int) -> bytes:
+    # the `#main` node only exists after the script ran, so the static html has nothing to parse
+    return ('<!DOCTYPE html><html><head><meta charset="utf-8"><title>page %d</title></head><body><div id="root"></div><script>'
+            'window.addEventListener("DOMContentLoaded", () => {'
+            '  const main = document.createElement("div"); main.id = "main";'
+            '  for (let i = 0; i < %d; i++) {'
+            '    const item = document.createElement("div"); item.className = "item";'
+            '    item.innerHTML = `<h2><a href="/detail/${i}">the title of item ${i}</a></h2><p class="desc">the description of item ${i}</p>`;'
+            '    main.appendChild(item);'
+            '  }'
+            '  setTimeout(() => document.getElementById("root").appendChild(main), 10);'
+            '});'
+            '</script></body></html>' % (index, items)).encode('utf-8')
+
+
+_RENDERERS = {
+    'html': (render_html, 'text/html; charset=utf-8'),
+    'json': (render_json, 'application/json'),
+    'js': (render_js, 'text/html; charset=utf-8'),
+}
+
+
+class _BenchmarkHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep the connections alive like the real sites
+    # the headers and the body are sent separately, with the Nagle the small pages would wait for the delayed ACK (about 40ms) and hide the real timings
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        parts = self.path.strip('/').split('/')
+        renderer = _RENDERERS.get(parts[0]) if len(parts) == 3 else None
+        if renderer is None or not (parts[1].isdigit() and parts[2].isdigit()):
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        render, content_type = renderer
+        body = render(int(parts[1]), int(parts[2]))
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class BenchmarkServer():
+    """
+        serve the synthetic pages on `127.0.0.1` in a daemon thread.
+
+        Parameters:
+            port (int): the port to listen, default is 0, which means any free port.
+    """
+    def __init__(self, port: int = 0) -> None:
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), _BenchmarkHandler)
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        return f'http://127.0.0.1:{self._server.server_port}'
+
+    def start(self) -> 'BenchmarkServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> 'BenchmarkServer':
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+if __name__ == '__main__':
+    argument_parser = ArgumentParser(description='serve the synthetic pages of the preparser benchmarks.')
+    argument_parser.add_argument('--port', type=int, default=8765)
+    args = argument_parser.parse_args()
+    server = BenchmarkServer(args.port)
+    print(f'serving the benchmark pages on {server.base_url}, like {server.base_url}/html/64/1, press Ctrl+C to stop.')
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
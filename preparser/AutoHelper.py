@@ -0,0 +1,117 @@
+import threading
+from urllib.parse import urlparse
+from typing import Literal
+
+
+class _HostModes():
+    def __init__(self) -> None:
+        self.static_passed = 0
+        self.escalated = 0
+        self.dynamic_direct = 0
+
+
+class AutoModer():
+    """
+        A slight per-host learner for the `html_auto` mode, which records wheather the static html of a host passed the check or escalated to the browser,
+        and once a host almost always needs the browser, its urls will go to the browser directly without the static fetching.
+
+        Parameters:
+            min_samples (int): the number of the static tries of a host before learning its mode, default is 3.
+            escalate_ratio (float): the escalated ratio of the static tries to treat a host as a dynamic one, default is 0.8.
+            reprobe_every (int): after this number of the urls went to the browser directly, try the static fetching again for the host, as the site may change, default is 50.
+
+        Attributes:
+            static_passed (int): the number of the urls whose static html passed the check.
+            escalated (int): the number of the urls which failed the static check and escalated to the browser.
+            dynamic_direct (int): the number of the urls which went to the browser directly as their hosts were learned as dynamic.
+    """
+    def __init__(self, min_samples: int = 3, escalate_ratio: float = 0.8, reprobe_every: int = 50) -> None:
+        self.min_samples = max(min_samples, 1)
+        self.escalate_ratio = escalate_ratio
+        self.reprobe_every = max(reprobe_every, 1)
+        self.static_passed = 0
+        self.escalated = 0
+        self.dynamic_direct = 0
+        self._hosts: dict[str, _HostModes] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_host(url: str) -> str:
+        return urlparse(str(url)).netloc.lower()
+
+    def _get_modes(self, url: str) -> _HostModes:
+        host = self.get_host(url)
+        modes = self._hosts.get(host)
+        if modes is None:
+            modes = _HostModes()
+            self._hosts[host] = modes
+        return modes
+
+    def _is_dynamic_host(self, modes: _HostModes) -> bool:
+        tried_numbers = modes.static_passed + modes.escalated
+        return tried_numbers >= self.min_samples and modes.escalated / tried_numbers >= self.escalate_ratio
+
+    def prefer_dynamic(self, url: str) -> bool:
+        """
+            check wheather the url should go to the browser directly, and it will be counted as `dynamic_direct` if so.
+        """
+        with self._lock:
+            modes = self._get_modes(url)
+            if not self._is_dynamic_host(modes):
+                return False
+            if modes.dynamic_direct and modes.dynamic_direct % self.reprobe_every == 0:
+                modes.dynamic_direct += 1  # let this one reprobe the static html
+                return False
+            modes.dynamic_direct += 1
+            self.dynamic_direct += 1
+            return True
+
+    def record(self, url: str, escalated: bool):
+        """
+            record the static check result of the url.
+        """
+        with self._lock:
+            modes = self._get_modes(url)
+            if escalated:
+                modes.escalated += 1
+                self.escalated += 1
+            else:
+                modes.static_passed += 1
+                self.static_passed += 1
+
+    def _get_host_mode(self, modes: _HostModes) -> Literal['html', 'html_dynamic', 'learning']:
+        if modes.static_passed + modes.escalated < self.min_samples:
+            return 'learning'
+        return 'html_dynamic' if self._is_dynamic_host(modes) else 'html'
+
+    def get_host_mode(self, url: str) -> Literal['html', 'html_dynamic', 'learning']:
+        """
+            get the learned mode of the host of the url.
+        """
+        with self._lock:
+            return self._get_host_mode(self._get_modes(url))
+
+    @property
+    def stats(self) -> dict[str, int | float | dict[str, str]]:
+        """
+            the counters of the `html_auto` mode, and the learned mode for per host.
+        """
+        with self._lock:
+            total = self.static_passed + self.escalated + self.dynamic_direct
+            return {
+                'static_passed': self.static_passed,
+                'escalated': self.escalated,
+                'dynamic_direct': self.dynamic_direct,
+                'escalated_ratio': (self.escalated + self.dynamic_direct) / total if total else 0.0,
+                'hosts': {host: self._get_host_mode(modes) for host, modes in self._hosts.items()},
+            }
+
+    def reset(self):
+        """
+            forget all of the learned hosts and counters.
+        """
+        with self._lock:
+            self._hosts = {}
+            self.static_passed = 0
+            self.escalated = 0
+            self.dynamic_direct = 0
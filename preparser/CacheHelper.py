@@ -0,0 +1,277 @@
+import logging
+import os
+import threading
+from time import time
+from hashlib import sha256
+from json import dump, load
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from .SessionHelper import FetchedResponse
+
+logger = logging.getLogger(__name__)
+
+
+class CacheEntry():
+    """
+        A cached response of an url, which loaded from the `Cacher`.
+
+        Parameters:
+            key (str): the cache key.
+            meta (dict): the cached informations of the response, like the status code, headers and the expired time.
+            content (bytes): the cached response body.
+    """
+    def __init__(self, key: str, meta: dict, content: bytes) -> None:
+        self.key = key
+        self.meta = meta
+        self.content = content
+
+    @property
+    def response(self) -> FetchedResponse:
+        return FetchedResponse(self.meta['url'], self.meta['status_code'], self.meta['headers'], self.content, self.meta['encoding'])
+
+    def is_fresh(self) -> bool:
+        """
+            check wheather the cached response can be used without revalidating it with the server.
+        """
+        return time() < self.meta['expires_at']
+
+    def get_validators(self) -> dict[str, str]:
+        """
+            get the conditional request headers (`If-None-Match` / `If-Modified-Since`) to revalidate the cached response.
+        """
+        validators = {}
+        headers = self.meta['headers']
+        if headers.get('ETag'):
+            validators['If-None-Match'] = headers['ETag']
+        if headers.get('Last-Modified'):
+            validators['If-Modified-Since'] = headers['Last-Modified']
+        return validators
+
+
+class Cacher():
+    """
+        A slight on-disk http response cache, which respects the `Cache-Control` / `Expires` headers, revalidates the stale responses with
+        the `ETag` / `Last-Modified` validators, and evicts the least recently used responses when the total size exceeds the `max_size`.
+
+        Parameters:
+            cache_dir (str): the directory to save the cached responses, default is `.preparser_cache`.
+            max_size (int): the maximum total bytes of the cached response bodies, default is 512 MB.
+            vary_headers (tuple[str,...]): the request headers which are part of the cache key, default is `('Accept', 'Accept-Language')`.
+
+        Attributes:
+            hits (int): the times that returned a fresh cached response without requesting.
+            revalidations (int): the times that the server responded `304` and the cached response was used.
+            misses (int): the times that the response was not cached or changed.
+    """
+    _stored_headers = ('Content-Type', 'ETag', 'Last-Modified', 'Cache-Control', 'Expires', 'Date')
+
+    def __init__(self, cache_dir: str = '.preparser_cache', max_size: int = 512 * 1024 * 1024, vary_headers: tuple[str, ...] = ('Accept', 'Accept-Language')) -> None:
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_size = max_size
+        self.vary_headers = vary_headers
+        self.hits = 0
+        self.revalidations = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._index: OrderedDict[str, int] = OrderedDict()  # key -> body size, in the least recently used order
+        self._total_size = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._load_index()
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """
+            the counters of the cache.
+        """
+        return {
+            'hits': self.hits,
+            'revalidations': self.revalidations,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self._index),
+            'size': self._total_size,
+        }
+
+    def _get_path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f'{key}.{suffix}')
+
+    def _load_index(self):
+        entries = []
+        for dir_name in os.listdir(self.cache_dir):
+            dir_path = os.path.join(self.cache_dir, dir_name)
+            if not os.path.isdir(dir_path):
+                continue
+            for file_name in os.listdir(dir_path):
+                if file_name.endswith('.meta'):
+                    key = file_name[:-5]
+                    body_path = self._get_path(key, 'body')
+                    if os.path.exists(body_path):
+                        # the meta file will be touched when it was used, so its mtime is the last used time
+                        entries.append((os.path.getmtime(os.path.join(dir_path, file_name)), key, os.path.getsize(body_path)))
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._total_size += size
+        self._delete_files(self._evict())  # the max_size may be smaller than last time
+
+    def get_key(self, url: str, request_headers: dict[str, str] | None = None) -> str:
+        request_headers = request_headers if request_headers else {}
+        vary_values = '\n'.join(f'{name}:{request_headers.get(name, "")}' for name in self.vary_headers)
+        return sha256(f'{url}\n{vary_values}'.encode('utf-8')).hexdigest()
+
+    def get(self, url: str, request_headers: dict[str, str] | None = None) -> CacheEntry | None:
+        """
+            get the cached response of the url, if not cached, return None.
+        """
+        key = self.get_key(url, request_headers)
+        # the lock only guards the index, the files are replaced atomically, so they can be read without it
+        with self._lock:
+            if key not in self._index:
+                return None
+            self._index.move_to_end(key)
+        try:
+            with open(self._get_path(key, 'meta'), 'r', encoding='utf-8') as file:
+                meta = load(file)
+            with open(self._get_path(key, 'body'), 'rb') as file:
+                content = file.read()
+        except (OSError, ValueError):  # evicted by other threads or broken
+            self._remove(key)
+            return None
+        return CacheEntry(key, meta, content)
+
+    def hit(self, entry: CacheEntry) -> FetchedResponse:
+        """
+            count and return the fresh cached response.
+        """
+        with self._lock:
+            self.hits += 1
+        self._touch(entry.key)
+        return entry.response
+
+    def update(self, url: str, request_headers: dict[str, str] | None, respos: FetchedResponse, entry: CacheEntry | None = None) -> FetchedResponse:
+        """
+            update the cache with the response from the server, if the server responded `304`, the cached response will be returned.
+        """
+        if respos.status_code == 304 and entry is not None:
+            with self._lock:
+                self.revalidations += 1
+            entry.meta['expires_at'] = self._get_expires_at(respos.headers)
+            for name in self._stored_headers:
+                if respos.headers.get(name):
+                    entry.meta['headers'][name] = respos.headers[name]
+            try:
+                self._write_meta(entry.key, entry.meta)
+            except OSError:  # evicted by other threads
+                pass
+            return entry.response
+        with self._lock:
+            self.misses += 1
+        if respos.status_code == 200:
+            self._store(self.get_key(url, request_headers), url, respos)
+        return respos
+
+    def _parse_cache_control(self, headers: dict[str, str]) -> dict[str, str | None]:
+        directives = {}
+        for directive in headers.get('Cache-Control', '').split(','):
+            name, _, value = directive.strip().partition('=')
+            if name:
+                directives[name.lower()] = value.strip('"') if value else None
+        return directives
+
+    def _get_expires_at(self, headers: dict[str, str]) -> float:
+        now = time()
+        directives = self._parse_cache_control(headers)
+        if 'no-cache' in directives:
+            return now
+        if directives.get('max-age'):
+            try:
+                return now + max(int(directives['max-age']) - int(headers.get('Age', 0)), 0)
+            except ValueError:
+                return now
+        if headers.get('Expires'):
+            try:
+                return parsedate_to_datetime(headers['Expires']).timestamp()
+            except (TypeError, ValueError):
+                return now
+        return now  # no freshness informations, revalidate it every time
+
+    def _store(self, key: str, url: str, respos: FetchedResponse):
+        directives = self._parse_cache_control(respos.headers)
+        if 'no-store' in directives:
+            return
+        expires_at = self._get_expires_at(respos.headers)
+        if expires_at <= time() and not (respos.headers.get('ETag') or respos.headers.get('Last-Modified')):
+            return  # can't be reused or revalidated
+        size = len(respos.content)
+        if size > self.max_size:
+            return
+        meta = {
+            'url': url,
+            'status_code': respos.status_code,
+            'headers': {name: respos.headers[name] for name in self._stored_headers if respos.headers.get(name)},
+            'encoding': respos.encoding,
+            'expires_at': expires_at,
+        }
+        try:
+            # write into the temp files of current thread and replace the old ones, so the readers never see the half written files
+            os.makedirs(os.path.dirname(self._get_path(key, 'body')), exist_ok=True)
+            temp_path = f"{self._get_path(key, 'body')}.{threading.get_ident()}.tmp"
+            with open(temp_path, 'wb') as file:
+                file.write(respos.content)
+            os.replace(temp_path, self._get_path(key, 'body'))
+            self._write_meta(key, meta)
+        except OSError as error:
+            logger.warning(f'failed to cache the response of url: {url}, error: {error} !!!')
+            self._remove(key)
+            return
+        with self._lock:
+            self._total_size += size - self._index.pop(key, 0)
+            self._index[key] = size
+            evicted_keys = self._evict()
+        self._delete_files(evicted_keys)
+
+    def _write_meta(self, key: str, meta: dict):
+        temp_path = f"{self._get_path(key, 'meta')}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            dump(meta, file)
+        os.replace(temp_path, self._get_path(key, 'meta'))
+
+    def _touch(self, key: str):
+        try:
+            os.utime(self._get_path(key, 'meta'))
+        except OSError:
+            pass
+
+    def _remove(self, key: str):
+        with self._lock:
+            self._total_size -= self._index.pop(key, 0)
+        self._delete_files([key])
+
+    def _delete_files(self, keys: list[str]):
+        # a key stored again by the other threads before its files were deleted is just missed next time
+        for key in keys:
+            for suffix in ('body', 'meta'):
+                try:
+                    os.remove(self._get_path(key, suffix))
+                except OSError:
+                    pass
+
+    def _evict(self) -> list[str]:
+        # pop the least recently used keys until the total size fits, the lock must be held, and the files of the returned keys are deleted after releasing it
+        evicted_keys = []
+        while self._total_size > self.max_size and self._index:
+            key, size = self._index.popitem(last=False)
+            self._total_size -= size
+            self.evictions += 1
+            evicted_keys.append(key)
+        return evicted_keys
+
+    def clear(self):
+        """
+            remove all of the cached responses.
+        """
+        with self._lock:
+            keys = list(self._index)
+            self._index.clear()
+            self._total_size = 0
+        self._delete_files(keys)
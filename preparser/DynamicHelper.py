@@ -1,25 +1,639 @@
 
+import logging
+import re
 import sys
-from os import path
+import json
+import asyncio
+import threading
+from os import path,makedirs,replace
+from importlib import metadata
+from fnmatch import fnmatchcase
+from urllib.parse import urlparse
+from queue import Queue,Empty
+from concurrent.futures import Future,InvalidStateError,TimeoutError as FutureTimeoutError
 from subprocess import check_call
-from typing import Literal,Optional
-from playwright.sync_api import sync_playwright 
+from time import monotonic
+from typing import Any,Literal,Optional,Pattern
+
+logger = logging.getLogger(__name__)
 
 
 Moniter_Notes = list[str,Literal['attached', 'detached', 'hidden', 'visible']] | None
+Dynamic_Engine = Literal['sync','async']
+# field name -> css selector, or the field spec dict like {'selector': 'a.title', 'attr': 'href', 'all': True, 'fields': {...}}
+Extract_Fields = dict[str, str | dict[str, Any]]
+
+# extract all of the fields in one `evaluate` call, so the page html won't be serialized and re-parsed
+_EXTRACT_SCRIPT = '''(fields) => {
+    const getValue = (node, attr) => attr === 'text' ? node.textContent.trim() : attr === 'html' ? node.innerHTML : attr === 'outer_html' ? node.outerHTML : node.getAttribute(attr);
+    const pick = (root, field) => {
+        const nodes = field.selector ? (field.all ? Array.from(root.querySelectorAll(field.selector)) : [root.querySelector(field.selector)].filter(Boolean)) : [root];
+        const values = nodes.map(node => field.fields ? extract(node, field.fields) : getValue(node, field.attr));
+        return field.all ? values : (values.length ? values[0] : null);
+    };
+    const extract = (root, fields) => Object.fromEntries(Object.entries(fields).map(([name, field]) => [name, pick(root, field)]));
+    return extract(document, fields);
+}'''
+
+# the on-disk cache of the browser probing result, which is invalidated when the playwright version changed
+BROWSER_PROBE_FILE = path.join(path.expanduser('~'),'.cache','preparser','browser_probe.json')
+
+# the in-process cache of the browser probing result, playwright version -> (browser index, executable path)
+_probed_browsers:dict[str,tuple[int,str]] = {}
+_probe_lock = threading.Lock()
+
+# the heavy resource types which are usually not needed for parsing the html
+HEAVY_RESOURCE_TYPES = ['image','media','font']
+
+
+class ResourcePolicy():
+    """
+        A slight request interception policy of the browser pages, which is installed before navigating, 
+        so the blocked resources won't be downloaded at all.
+
+        Parameters:
+            blocked_resource_types (list[str] | None): the resource types to block, like `image`, `media`, `font`, `stylesheet`, `script`, `xhr` or `fetch`, default is None, which means no resource types blocked.
+            blocked_url_patterns (list[str | Pattern[str]] | None): the url glob patterns like `*://*.doubleclick.net/*` or the compiled regex patterns to block, default is None.
+            allowed_hosts (list[str] | None): only the resources from these hosts (and their sub domains) can be loaded, default is None, which means all of the hosts are allowed.
+                                              the page documents are always allowed, so the navigating won't be blocked.
+    """
+    def __init__(self,blocked_resource_types:list[str] | None = None,blocked_url_patterns:list[str | Pattern[str]] | None = None,allowed_hosts:list[str] | None = None) -> None:
+        self.blocked_resource_types = set(blocked_resource_types) if blocked_resource_types else set()
+        self._blocked_globs = [pattern for pattern in (blocked_url_patterns or []) if isinstance(pattern,str)]
+        self._blocked_regexes = [pattern for pattern in (blocked_url_patterns or []) if isinstance(pattern,re.Pattern)]
+        self.allowed_hosts = [host.lower().lstrip('.') for host in allowed_hosts] if allowed_hosts else []
+        self.blocked_numbers = 0
+
+    @property
+    def is_active(self) -> bool:
+        return bool(self.blocked_resource_types or self._blocked_globs or self._blocked_regexes or self.allowed_hosts)
+
+    def is_allowed_host(self,url:str) -> bool:
+        host = (urlparse(url).hostname or '').lower()
+        return any(host == allowed_host or host.endswith(f'.{allowed_host}') for allowed_host in self.allowed_hosts)
+
+    def should_block(self,url:str,resource_type:str) -> bool:
+        """
+            check wheather the request of the resource should be aborted.
+        """
+        if resource_type == 'document':
+            return False
+        if resource_type in self.blocked_resource_types:
+            return True
+        if self.allowed_hosts and url.startswith(('http:','https:')) and not self.is_allowed_host(url):
+            return True
+        return any(fnmatchcase(url,pattern) for pattern in self._blocked_globs) or any(pattern.search(url) for pattern in self._blocked_regexes)
+
+    def handle_route(self,route):
+        # the route handler of the playwright sync api
+        request = route.request
+        if self.should_block(request.url,request.resource_type):
+            self.blocked_numbers += 1
+            route.abort()
+        else:
+            route.continue_()
+
+    async def async_handle_route(self,route):
+        # the route handler of the playwright async api
+        request = route.request
+        if self.should_block(request.url,request.resource_type):
+            self.blocked_numbers += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+
+def normalize_extract_fields(extract_fields:Extract_Fields) -> dict[str,dict[str,Any]]:
+    """
+        normalize the field specs into the dicts with `selector`, `attr`, `all` and `fields` keys, and check them.
+
+        the field spec can be a css selector string, which means the trimmed text of the first matched node, or a dict with the keys below:
+            selector (str): the css selector relative to its parent scope, empty means the parent scope node itself.
+            attr (str): `text` (default), `html` (the inner html), `outer_html` or the attribute name like `href`.
+            all (bool): wheather get all of the matched nodes as a list, default is False, which means only the first matched node, and None if not matched.
+            fields (dict): the nested field specs, which makes the matched nodes as the scopes and extracts a dict for per scope node.
+    """
+    normalized_fields = {}
+    for name,field in extract_fields.items():
+        if isinstance(field,str):
+            field = {'selector':field}
+        if not isinstance(field,dict):
+            raise ValueError(f'invalid extract field {name}: {field}, it should be a css selector or a dict !!!')
+        unknown_keys = set(field) - {'selector','attr','all','fields'}
+        if unknown_keys:
+            raise ValueError(f'invalid extract field {name}: unknown keys {",".join(unknown_keys)} !!!')
+        normalized_field = {'selector':field.get('selector',''),'attr':field.get('attr','text'),'all':bool(field.get('all',False))}
+        if field.get('fields'):
+            normalized_field['fields'] = normalize_extract_fields(field['fields'])
+        normalized_fields[name] = normalized_field
+    return normalized_fields
+
+
+class _BrowserJob():
+    def __init__(self,url:str,moniter_scope:Moniter_Notes = None,extract_fields:dict[str,dict[str,Any]] | None = None) -> None:
+        self.url = url
+        self.moniter_scope = moniter_scope
+        self.extract_fields = extract_fields
+        self.future:Future = Future()
+
+
+class BrowserPool():
+    """
+        A slight pool of the long-lived browsers, as the playwright sync objects can only be used in the thread which created them,
+        each browser is owned by a worker thread, and the urls are handed to the workers by a queue, so a browser will be reused by lots of urls
+        instead of launching a new one for per url.
+
+        Parameters:
+            browser_index (int): the browser core to launch, `0` is chromium, `1` is firefox and `2` is webkit.
+            browser_numbers (int): the number of the browsers (and their worker threads), default is 1.
+            max_pages_per_context (int): the number of the pages opened in a browser context before it's recycled, so the cookies, caches and leaked memory won't keep growing, default is 20.
+            browser_restart_after (int): the number of the navigations before the browser is restarted, and the crashed browser will be restarted at once, default is 200.
+            ignore_https_errors (bool): wheather ignore the https errors when navigating, default is False.
+            page_timeout (float): the maximum seconds to navigate or wait for the `moniter_scope` of per page, default is 30.
+            resource_policy (ResourcePolicy | None): to block the heavy resources before navigating, default is None, which means all of the resources will be loaded.
+    """
+    def __init__(self,browser_index:int,browser_numbers:int = 1,max_pages_per_context:int = 20,browser_restart_after:int = 200,ignore_https_errors:bool = False,page_timeout:float = 30,resource_policy:ResourcePolicy | None = None) -> None:
+        self.browser_index = browser_index
+        self.browser_numbers = max(browser_numbers,1)
+        self.max_pages_per_context = max(max_pages_per_context,1)
+        self.browser_restart_after = max(browser_restart_after,1)
+        self.ignore_https_errors = ignore_https_errors
+        self.page_timeout = page_timeout
+        self.resource_policy = resource_policy if (resource_policy and resource_policy.is_active) else None
+        self.restarted_times = 0
+        # the seconds to wait for a running url, the navigating and the waiting for the `moniter_scope` are limited by the `page_timeout` respectively
+        self.result_timeout = self.page_timeout * 2 + 10
+        self._jobs:Queue[_BrowserJob | None] = Queue()
+        self._workers:list[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._dead_error:Exception | None = None  # the error which stopped the workers, like the playwright can't be started
+        self._hung_futures:set[Future] = set()  # the abandoned urls which the browsers hung on, their workers exit when they return
+
+    def start(self):
+        """
+            start the browser workers if they are not running.
+        """
+        with self._lock:
+            self._workers = [worker for worker in self._workers if worker.is_alive()]
+            for _ in range(self.browser_numbers - len(self._workers)):
+                self._start_worker()
+
+    def _start_worker(self):
+        worker = threading.Thread(target=self._run_worker,name='preparser-browser',daemon=True)
+        worker.start()
+        self._workers.append(worker)
+
+    def submit(self,url:str,moniter_scope:Moniter_Notes = None,extract_fields:dict[str,dict[str,Any]] | None = None) -> Future:
+        """
+            hand the url to the browser workers, and get a `Future` of its html content, or the extracted datas if the normalized `extract_fields` was set.
+        """
+        if self._dead_error is not None:
+            raise RuntimeError(f'the preparser browser pool is dead, error: {self._dead_error}')
+        self.start()
+        job = _BrowserJob(url,moniter_scope,extract_fields)
+        self._jobs.put(job)
+        if self._dead_error is not None:  # the workers died while putting it
+            self._fail_pending_jobs()
+        return job.future
+
+    def wait_result(self,future:Future) -> str | dict[str,Any] | None:
+        """
+            wait for the result of the submitted url, the waiting url waits as long as the pool is alive, and the running one waits `result_timeout` seconds at most,
+            raise `TimeoutError` if the browser hung on it (and the url is abandoned), or `RuntimeError` if the pool is dead.
+        """
+        running_since = None
+        while True:
+            try:
+                return future.result(timeout=1)
+            except FutureTimeoutError:
+                running_since = self._check_waiting(future,running_since)
+
+    async def async_wait_result(self,future:Future) -> str | dict[str,Any] | None:
+        """
+            the async version of `wait_result`, which waits on the running event loop without blocking a thread.
+        """
+        waiting_future = asyncio.wrap_future(future)
+        running_since = None
+        while True:
+            done, _ = await asyncio.wait({waiting_future},timeout=1)
+            if done:
+                return waiting_future.result()
+            running_since = self._check_waiting(future,running_since)
+
+    def _check_waiting(self,future:Future,running_since:float | None) -> float | None:
+        # called every second while waiting, return since when the url has been running
+        if future.running():
+            running_since = running_since if running_since is not None else monotonic()
+            if monotonic() - running_since > self.result_timeout:
+                error = TimeoutError(f'the browser did not finish the page in {self.result_timeout} seconds')
+                with self._lock:
+                    try:
+                        future.set_exception(error)  # abandon it, the worker can't set its late result any more
+                    except InvalidStateError:  # just finished
+                        return running_since
+                    # the hung worker can't serve the waiting urls, so start another one instead of it
+                    self._hung_futures.add(future)
+                    self._start_worker()
+                raise error
+        elif self._dead_error is not None:
+            self._fail_pending_jobs()
+        return running_since
+
+    def get_html(self,url:str,moniter_scope:Moniter_Notes = None) -> str | None:
+        """
+            get the html content of the url with a pooled browser, it blocks current thread until the page was loaded.
+        """
+        return self.wait_result(self.submit(url,moniter_scope))
+
+    def close(self,wait:bool = True):
+        """
+            cancel the waiting urls and close all of the browsers, if `wait` is False, it won't wait for the loading pages to be finished.
+        """
+        with self._lock:
+            workers = self._workers
+            self._workers = []
+        while True:
+            try:
+                job = self._jobs.get_nowait()
+            except Empty:
+                break
+            if job is not None:
+                job.future.cancel()
+        for _ in workers:
+            self._jobs.put(None)  # stop signal for per worker
+        if wait:
+            for worker in workers:
+                if worker is not threading.current_thread():
+                    worker.join()
+
+    def _launch_browser(self,playwright):
+        browser_type = [playwright.chromium,playwright.firefox,playwright.webkit][self.browser_index]
+        return browser_type.launch(headless=True)
+
+    def _load_html(self,page,url:str,moniter_scope:Moniter_Notes = None,extract_fields:dict[str,dict[str,Any]] | None = None) -> str | dict[str,Any] | None:
+        page.goto(url)
+        if moniter_scope is not None:
+            target_element = page.wait_for_selector(moniter_scope[0],state=moniter_scope[1])
+            if extract_fields:
+                return page.evaluate(_EXTRACT_SCRIPT,extract_fields)
+            if target_element:
+                target_element.scroll_into_view_if_needed()
+                return target_element.as_element().inner_html()
+            return None
+        if extract_fields:
+            return page.evaluate(_EXTRACT_SCRIPT,extract_fields)
+        return page.content()
+
+    def _run_worker(self):
+        job = None
+        browser, context = None, None
+        navigations, context_pages = 0, 0
+        try:
+            from playwright.sync_api import sync_playwright
+            with sync_playwright() as playwright:
+                while True:
+                    job = self._jobs.get()
+                    if job is None:
+                        break
+                    if not job.future.set_running_or_notify_cancel():
+                        continue
+                    try:
+                        if browser is not None and (navigations >= self.browser_restart_after or not browser.is_connected()):
+                            self._close_quietly(browser)
+                            browser, context = None, None
+                            self.restarted_times += 1
+                        if browser is None:
+                            browser = self._launch_browser(playwright)
+                            navigations = 0
+                        if context is not None and context_pages >= self.max_pages_per_context:
+                            self._close_quietly(context)
+                            context = None
+                        if context is None:
+                            context = browser.new_context(ignore_https_errors=self.ignore_https_errors)
+                            if self.resource_policy:
+                                context.route('**/*',self.resource_policy.handle_route)
+                            context_pages = 0
+                        navigations += 1
+                        context_pages += 1
+                        page = context.new_page()
+                        page.set_default_timeout(self.page_timeout * 1000)
+                        try:
+                            job.future.set_result(self._load_html(page,job.url,job.moniter_scope,job.extract_fields))
+                        finally:
+                            # closing the page also stops all of its rest resources loading
+                            self._close_quietly(page)
+                    except Exception as err:
+                        if not job.future.done():
+                            job.future.set_exception(err)
+                        if browser is not None and not browser.is_connected():  # crashed, restart it with the next url
+                            context = None
+                    with self._lock:
+                        replaced = job.future in self._hung_futures  # another worker was started instead of this one
+                        self._hung_futures.discard(job.future)
+                    if replaced:
+                        break
+                self._close_quietly(browser)
+        except Exception as err:
+            logger.error(f'the preparser browser worker stopped, error: {err} !!!')
+            # no worker can serve the urls any more, so fail the waiting ones instead of blocking their threads forever
+            self._dead_error = err
+            if job is not None and not job.future.done():
+                job.future.set_exception(err)
+            self._fail_pending_jobs()
+
+    def _fail_pending_jobs(self):
+        stop_signals = 0
+        while True:
+            try:
+                job = self._jobs.get_nowait()
+            except Empty:
+                break
+            if job is None:
+                stop_signals += 1
+            elif job.future.set_running_or_notify_cancel():
+                job.future.set_exception(RuntimeError(f'the preparser browser pool is dead, error: {self._dead_error}'))
+        for _ in range(stop_signals):  # keep the stop signals for the other workers
+            self._jobs.put(None)
+
+    @staticmethod
+    def _close_quietly(target):
+        try:
+            if target is not None:
+                target.close()
+        except Exception:
+            pass
+
+
+class _AsyncSlot():
+    # a browser or a browser context which can be retired and closed after all of its pages finished
+    def __init__(self,target) -> None:
+        self.target = target
+        self.used = 0
+        self.active = 0
+        self.retired = False
+
+
+class AsyncBrowserPool():
+    """
+        A slight pool which drives lots of pages at the same time inside a single browser process with the playwright async api,
+        the browser runs on an event loop in a background thread, so the urls can be handed to it from any threads or event loops,
+        and it takes far less memory than launching one browser for per thread.
+
+        Parameters:
+            browser_index (int): the browser core to launch, `0` is chromium, `1` is firefox and `2` is webkit.
+            max_pages_per_browser (int): the maximum number of the pages loading at the same time in the browser, default is 8.
+            max_pages_per_context (int): the number of the pages opened in a browser context before it's recycled, default is 20.
+            browser_restart_after (int): the number of the navigations before the browser is restarted, and the crashed browser will be restarted at once, default is 200.
+            ignore_https_errors (bool): wheather ignore the https errors when navigating, default is False.
+            page_timeout (float): the maximum seconds to load per page, including the navigating and waiting for the `moniter_scope`, default is 30.
+            resource_policy (ResourcePolicy | None): to block the heavy resources before navigating, default is None, which means all of the resources will be loaded.
+    """
+    def __init__(self,browser_index:int,max_pages_per_browser:int = 8,max_pages_per_context:int = 20,browser_restart_after:int = 200,ignore_https_errors:bool = False,page_timeout:float = 30,resource_policy:ResourcePolicy | None = None) -> None:
+        self.browser_index = browser_index
+        self.max_pages_per_browser = max(max_pages_per_browser,1)
+        self.max_pages_per_context = max(max_pages_per_context,1)
+        self.browser_restart_after = max(browser_restart_after,1)
+        self.ignore_https_errors = ignore_https_errors
+        self.page_timeout = page_timeout
+        self.resource_policy = resource_policy if (resource_policy and resource_policy.is_active) else None
+        self.restarted_times = 0
+        self._loop:asyncio.AbstractEventLoop | None = None
+        self._thread:threading.Thread | None = None
+        self._thread_lock = threading.Lock()
+        # the belows are only used on the event loop of the pool
+        self._playwright = None
+        self._browser:_AsyncSlot | None = None
+        self._context:_AsyncSlot | None = None
+        self._page_semaphore:asyncio.Semaphore | None = None
+        self._launch_lock:asyncio.Lock | None = None
+
+    def start(self):
+        """
+            start the event loop thread of the pool if it's not running, the browser will be launched when loading the first url.
+        """
+        with self._thread_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._run_loop,args=(self._loop,),name='preparser-async-browser',daemon=True)
+                self._thread.start()
+
+    def _run_loop(self,loop:asyncio.AbstractEventLoop):
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+        loop.close()
+
+    def submit(self,url:str,moniter_scope:Moniter_Notes = None,extract_fields:dict[str,dict[str,Any]] | None = None) -> Future:
+        """
+            hand the url to the browser, and get a `Future` of its html content, or the extracted datas if the normalized `extract_fields` was set.
+        """
+        self.start()
+        return asyncio.run_coroutine_threadsafe(self._get_html(url,moniter_scope,extract_fields),self._loop)
+
+    def get_html(self,url:str,moniter_scope:Moniter_Notes = None) -> str | None:
+        """
+            get the html content of the url, it blocks current thread until the page was loaded.
+        """
+        return self.submit(url,moniter_scope).result()
+
+    def close(self,wait:bool = True):
+        """
+            cancel the loading pages, close the browser and stop the event loop thread, if `wait` is False, it won't wait for the browser to be closed.
+        """
+        with self._thread_lock:
+            loop, thread = self._loop, self._thread
+            self._loop, self._thread = None, None
+        if loop is None:
+            return
+        shutdown_future = asyncio.run_coroutine_threadsafe(self._shutdown(),loop)
+        shutdown_future.add_done_callback(lambda _: loop.call_soon_threadsafe(loop.stop))
+        if wait and thread is not threading.current_thread():
+            thread.join()
+
+    async def _shutdown(self):
+        current_task = asyncio.current_task()
+        tasks = [task for task in asyncio.all_tasks() if task is not current_task]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks,return_exceptions=True)
+        if self._browser is not None:
+            await self._close_quietly(self._browser.target)
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception:
+                pass
+        self._playwright, self._browser, self._context = None, None, None
+
+    async def _launch_browser(self):
+        if self._playwright is None:
+            from playwright.async_api import async_playwright
+            self._playwright = await async_playwright().start()
+        browser_type = [self._playwright.chromium,self._playwright.firefox,self._playwright.webkit][self.browser_index]
+        return await browser_type.launch(headless=True)
+
+    async def _open_page(self) -> tuple[_AsyncSlot,_AsyncSlot,object]:
+        async with self._launch_lock:
+            browser = self._browser
+            if browser is not None and (browser.used >= self.browser_restart_after or not browser.target.is_connected()):
+                self._browser, self._context = None, None
+                self.restarted_times += 1
+                await self._retire(browser)
+            if self._browser is None:
+                self._browser = _AsyncSlot(await self._launch_browser())
+            if self._context is not None and self._context.used >= self.max_pages_per_context:
+                context, self._context = self._context, None
+                await self._retire(context)
+            if self._context is None:
+                context = await self._browser.target.new_context(ignore_https_errors=self.ignore_https_errors)
+                if self.resource_policy:
+                    await context.route('**/*',self.resource_policy.async_handle_route)
+                self._context = _AsyncSlot(context)
+            browser, context = self._browser, self._context
+            for slot in (browser,context):
+                slot.used += 1
+                slot.active += 1
+        try:
+            page = await context.target.new_page()
+        except Exception:
+            await self._release(browser,context)
+            raise
+        return browser, context, page
+
+    async def _release(self,*slots:_AsyncSlot):
+        for slot in slots:
+            slot.active -= 1
+            if slot.retired and slot.active == 0:
+                await self._close_quietly(slot.target)
+
+    async def _retire(self,slot:_AsyncSlot):
+        # close it at once if no pages are loading, otherwise close it when its last page finished
+        slot.retired = True
+        if slot.active == 0:
+            await self._close_quietly(slot.target)
+
+    async def _load_html(self,page,url:str,moniter_scope:Moniter_Notes = None,extract_fields:dict[str,dict[str,Any]] | None = None) -> str | dict[str,Any] | None:
+        await page.goto(url)
+        if moniter_scope is not None:
+            target_element = await page.wait_for_selector(moniter_scope[0],state=moniter_scope[1])
+            if extract_fields:
+                return await page.evaluate(_EXTRACT_SCRIPT,extract_fields)
+            if target_element:
+                await target_element.scroll_into_view_if_needed()
+                return await target_element.inner_html()
+            return None
+        if extract_fields:
+            return await page.evaluate(_EXTRACT_SCRIPT,extract_fields)
+        return await page.content()
+
+    async def _get_html(self,url:str,moniter_scope:Moniter_Notes = None,extract_fields:dict[str,dict[str,Any]] | None = None) -> str | dict[str,Any] | None:
+        if self._page_semaphore is None:
+            self._page_semaphore = asyncio.Semaphore(self.max_pages_per_browser)
+            self._launch_lock = asyncio.Lock()
+        async with self._page_semaphore:
+            browser, context, page = await self._open_page()
+            try:
+                page.set_default_timeout(self.page_timeout * 1000)
+                return await asyncio.wait_for(self._load_html(page,url,moniter_scope,extract_fields),self.page_timeout)
+            except asyncio.TimeoutError:
+                raise TimeoutError(f'loading the page of url:{url} timed out after {self.page_timeout} seconds')
+            finally:
+                await self._close_quietly(page)
+                await self._release(browser,context)
+
+    @staticmethod
+    async def _close_quietly(target):
+        try:
+            if target is not None:
+                await target.close()
+        except Exception:
+            pass
+
 
 class Dynamicer():
     """
-        install the Browser Core
+        install the Browser Core, and load the dynamic html content with the pooled browsers.
+
+        Parameters:
+            ignore_https_errors (bool): wheather ignore the https errors when navigating, default is False.
+            browser_numbers (int): the number of the long-lived browsers to load the pages at the same time, default is 1.
+            max_pages_per_context (int): the number of the pages opened in a browser context before it's recycled, default is 20.
+            browser_restart_after (int): the number of the navigations before a browser is restarted, default is 200.
+            dynamic_engine (Literal['sync','async']): the engine to drive the browsers, default is `sync`.
+                                                `sync`: `browser_numbers` browsers driven by the playwright sync api in their own threads, each browser loads one page at a time.
+                                                `async`: a single browser driven by the playwright async api, which loads at most `max_pages_per_browser` pages at the same time.
+            max_pages_per_browser (int): the maximum number of the pages loading at the same time in the browser of the `async` engine, default is 8.
+            page_timeout (float): the maximum seconds to load per page, default is 30.
+            resource_policy (ResourcePolicy | None): to block the heavy resources before navigating, default is None, which means all of the resources will be loaded.
     """
-    def __init__(self,ignore_https_errors:bool=False) -> None:
+    def __init__(self,
+                 ignore_https_errors:bool=False,
+                 browser_numbers:int = 1,
+                 max_pages_per_context:int = 20,
+                 browser_restart_after:int = 200,
+                 dynamic_engine:Dynamic_Engine = 'sync',
+                 max_pages_per_browser:int = 8,
+                 page_timeout:float = 30,
+                 resource_policy:ResourcePolicy | None = None
+                 ) -> None:
         self.browser_list = ['chromium','firefox','webkit']
         self._async_index = -1
         self._ignore_https_errors = ignore_https_errors
+        self.browser_numbers = browser_numbers
+        self.max_pages_per_context = max_pages_per_context
+        self.browser_restart_after = browser_restart_after
+        self.dynamic_engine:Dynamic_Engine = dynamic_engine
+        self.max_pages_per_browser = max_pages_per_browser
+        self.page_timeout = page_timeout
+        self.resource_policy = resource_policy
+        self.browser_pool:BrowserPool | AsyncBrowserPool | None = None
+        self._pool_lock = threading.Lock()
         
-    def _check_dynamic_async_env(self) -> int:
+    @staticmethod
+    def get_playwright_version() -> str:
+        try:
+            return metadata.version('playwright')
+        except metadata.PackageNotFoundError:
+            return ''
+
+    def _load_browser_probe(self,playwright_version:str) -> int:
+        # get the probed browser index from the in-process or on-disk cache, -1 means not cached or the browser was removed
+        with _probe_lock:
+            probed_browser = _probed_browsers.get(playwright_version)
+            if probed_browser is None:
+                try:
+                    with open(BROWSER_PROBE_FILE,'r',encoding='utf-8') as file:
+                        probe = json.load(file)
+                    if probe.get('playwright_version') == playwright_version:
+                        probed_browser = (int(probe['browser_index']),probe['executable_path'])
+                except (OSError,ValueError,KeyError,TypeError):
+                    pass
+            if probed_browser is None or not path.exists(probed_browser[1]):
+                _probed_browsers.pop(playwright_version,None)
+                return -1
+            _probed_browsers[playwright_version] = probed_browser
+            return probed_browser[0]
+
+    def _save_browser_probe(self,playwright_version:str,browser_index:int,executable_path:str):
+        with _probe_lock:
+            _probed_browsers[playwright_version] = (browser_index,executable_path)
+            try:
+                makedirs(path.dirname(BROWSER_PROBE_FILE),exist_ok=True)
+                temp_path = f'{BROWSER_PROBE_FILE}.{threading.get_ident()}.tmp'
+                with open(temp_path,'w',encoding='utf-8') as file:
+                    json.dump({'playwright_version':playwright_version,'browser_index':browser_index,'executable_path':executable_path},file)
+                replace(temp_path,BROWSER_PROBE_FILE)
+            except OSError:
+                pass  # the cache is optional
+
+    def _check_dynamic_async_env(self,install_missing:bool = True) -> int:
+        # get the index of the installed browser, if none is installed, prompt to install one when `install_missing`, otherwise return -1
         installed_browser_index = -1
         try:
+            playwright_version = self.get_playwright_version()
+            installed_browser_index = self._load_browser_probe(playwright_version)
+            if installed_browser_index >= 0:
+                return installed_browser_index
+            from playwright.sync_api import sync_playwright
             with sync_playwright() as p:
                 browser_Bundle_List = [
                         p.chromium,
@@ -29,55 +643,65 @@ class Dynamicer():
                 for i,browser_budle in enumerate(browser_Bundle_List):
                     if path.exists(browser_budle.executable_path):
                         installed_browser_index = i
+                        self._save_browser_probe(playwright_version,i,browser_budle.executable_path)
                         break
-            if installed_browser_index == -1:
+            if installed_browser_index == -1 and install_missing:
                 installed_browser_index = self.init_install_browser()
             # else:
                 # because so far is in the use checking, so no need add the re-install logical
                 # fro the precheck and install will added into the setup logical in the future
         except Exception as error:
-            print(f"error: when check the preparser browser bundle, error:{error} !!!")
-            print(f'please try again, if failed again, please reinstall preparser !!!')
+            logger.error(f"when check the preparser browser bundle, error:{error} !!!")
+            logger.error('please try again, if failed again, please reinstall preparser !!!')
         finally:
             self._async_index = installed_browser_index
             return installed_browser_index
     
-    def _get_dynamic_html(self,url:str,moniter_scope:Moniter_Notes = None) -> str | None:
+    def _get_browser_pool(self) -> BrowserPool | AsyncBrowserPool:
+        with self._pool_lock:
+            if self.browser_pool is None:
+                if self.dynamic_engine == 'async':
+                    self.browser_pool = AsyncBrowserPool(self._async_index,self.max_pages_per_browser,self.max_pages_per_context,self.browser_restart_after,self._ignore_https_errors,self.page_timeout,self.resource_policy)
+                else:
+                    self.browser_pool = BrowserPool(self._async_index,self.browser_numbers,self.max_pages_per_context,self.browser_restart_after,self._ignore_https_errors,self.page_timeout,self.resource_policy)
+            return self.browser_pool
+
+    def _get_dynamic_html(self,url:str,moniter_scope:Moniter_Notes = None,extract_fields:dict[str,dict[str,Any]] | None = None) -> str | dict[str,Any] | None:
         try:
             if 0 <= self._async_index < 3:
-                with sync_playwright() as p:
-                    if self._async_index == 0:
-                        browser = p.chromium.launch(headless=True)
-                    elif self._async_index == 1:
-                        browser = p.firefox.launch(headless=True)
-                    else:
-                        browser = p.webkit.launch(headless=True)
-                
-                    page = browser.new_page(ignore_https_errors=self._ignore_https_errors)
-                    page.goto(url)
-                    html = None
-                    if moniter_scope is not None:
-                        target_element = page.wait_for_selector(moniter_scope[0],state=moniter_scope[1])
-                        if target_element:
-                            target_element.scroll_into_view_if_needed()
-                            html = target_element.as_element().inner_html()
-                            # print(target_element.eval_on_selector_all('.row', 'elements => elements.map(el => el.outerHTML)'))
-                        # stop all of rest pages resouce loading to faster the loading speed 
-                        page.route("**/*",lambda route,request:route.abort())
-                        # html = page.content()
-                        # stop specified type of resource loading, here below is the ['image', 'script'] two kind of the resouce type
-                        # page.route("**/*", lambda route, request: route.abort() if request.resource_type() in ['image', 'script'] else route.continue_())
-                    else:
-                        html = page.content()
-                    page.close()
-                    browser.close()
-                    return html
+                browser_pool = self._get_browser_pool()
+                future = browser_pool.submit(url,moniter_scope,extract_fields)
+                # the pages of the async pool are already limited by the `page_timeout` on its event loop
+                return browser_pool.wait_result(future) if isinstance(browser_pool,BrowserPool) else future.result()
             else:
                 return None
         except Exception as err:
-            print(f'error when parsing dynamic html , error: {err} !')
+            logger.error(f'error when parsing dynamic html , error: {err} !')
             return None
 
+    async def _async_get_dynamic_html(self,url:str,moniter_scope:Moniter_Notes = None,extract_fields:dict[str,dict[str,Any]] | None = None) -> str | dict[str,Any] | None:
+        # wait for the pooled browsers on the running event loop without blocking a thread
+        try:
+            if 0 <= self._async_index < 3:
+                browser_pool = self._get_browser_pool()
+                future = browser_pool.submit(url,moniter_scope,extract_fields)
+                return await (browser_pool.async_wait_result(future) if isinstance(browser_pool,BrowserPool) else asyncio.wrap_future(future))
+            else:
+                return None
+        except Exception as err:
+            logger.error(f'error when parsing dynamic html , error: {err} !')
+            return None
+
+    def close(self,wait:bool = True):
+        """
+            close all of the pooled browsers, they will be launched again when loading the next url.
+        """
+        with self._pool_lock:
+            browser_pool = self.browser_pool
+            self.browser_pool = None
+        if browser_pool is not None:
+            browser_pool.close(wait)
+
     def init_install_browser(self):
         # if not , just let the user to choose
         print("please choose a preparser browser  to install: ")
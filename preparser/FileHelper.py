@@ -1,8 +1,11 @@
+import logging
 from typing import Literal,Any
 from os import makedirs
 from os.path import dirname,exists,abspath
 from json import dump,load
 
+logger = logging.getLogger(__name__)
+
 
 FileType = Literal['txt','json']
 
@@ -21,7 +24,7 @@ class Filer():
         if self._file_type in self._available_file_types:
             return abspath(f'{file_path_without_type}.{self._file_type}')
         else:
-            print(f'error: so fare , the type {self._file_type} is not supported by the preparser, only {','.join(self._available_file_types)} is avaliable')
+            logger.error(f'so fare , the type {self._file_type} is not supported by the preparser, only {','.join(self._available_file_types)} is avaliable')
             return None
 
     def write_data_into_file(self,new_file_name:str,datas:list[Any],ensure_json_ascii:bool=False):
@@ -40,15 +43,15 @@ class Filer():
             # make sure files existed
             makedirs(dir_path, exist_ok=True)
             try:
-                print(f'begin to save datas into file: {abs_file_path} !')
+                logger.info(f'begin to save datas into file: {abs_file_path} !')
                 with open(abs_file_path,'w',encoding="utf-8")  as file:
                     if self._file_type == 'json':
                         dump(datas, file, indent=4,ensure_ascii=ensure_json_ascii)
                     else:
                         file.writelines(datas)
-                print(f'successd to save datas into file: {abs_file_path} !')
+                logger.info(f'successd to save datas into file: {abs_file_path} !')
             except Exception as err:
-                print(f'failed to save datas into file: {abs_file_path}, error: {err}')
+                logger.error(f'failed to save datas into file: {abs_file_path}, error: {err}')
     
     def read_datas_from_file(self,file_name:str):
         """
@@ -70,10 +73,10 @@ class Filer():
                         else:
                             return file.read()
                 else:
-                    print(f"read file {file_name} failed, error: we can't find out current file from the path: {abs_file_path}")
+                    logger.error(f"read file {file_name} failed, error: we can't find out current file from the path: {abs_file_path}")
                     return None
             except Exception as error:
-                print(f"read file {abs_file_path} failed, error: {error}")
+                logger.error(f"read file {abs_file_path} failed, error: {error}")
                 return None
         else:
             return None
\ No newline at end of file
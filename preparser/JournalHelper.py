@@ -0,0 +1,174 @@
+import logging
+import os
+import sqlite3
+import threading
+from time import time
+from typing import Any, Iterable, Iterator, Literal
+
+logger = logging.getLogger(__name__)
+
+Journal_Status = Literal['done', 'failed']
+
+
+class Journaler():
+    """
+        A slight crash-safe crawl journal in the SQLite WAL mode, which records the status, the attempts and the result location of per url as soon as it finished,
+        so a crashed (or terminated) run can be resumed without fetching the finished urls again.
+        the records are committed in batches to keep the writing overhead low, so at most `batch_size` records (or the records of the last `flush_interval` seconds) may be lost when the process was killed.
+
+        Parameters:
+            journal_path (str): the path of the SQLite journal file, default is `.preparser_journal.db`.
+            batch_size (int): commit the records after this number of the urls finished, default is 100.
+            flush_interval (float): commit the records after this seconds since the last commit even the batch is not full, default is 1.
+
+        Attributes:
+            done_numbers (int): the number of the done urls recorded in the journal.
+            failed_numbers (int): the number of the failed urls recorded in the journal.
+            skipped_numbers (int): the number of the done urls skipped by `filter_urls` in the last resumed run.
+    """
+    def __init__(self, journal_path: str = '.preparser_journal.db', batch_size: int = 100, flush_interval: float = 1) -> None:
+        self.journal_path = os.path.abspath(journal_path)
+        self.batch_size = max(batch_size, 1)
+        self.flush_interval = flush_interval
+        self.skipped_numbers = 0
+        self._lock = threading.Lock()
+        self._pending: list[tuple[str, Journal_Status, str | None, float]] = []
+        self._last_flushed_at = time()
+        journal_dir = os.path.dirname(self.journal_path)
+        if journal_dir:
+            os.makedirs(journal_dir, exist_ok=True)
+        # the records are written by the threads of the pool, so share one connection with the lock
+        self._connection = sqlite3.connect(self.journal_path, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')  # the WAL is still consistent after a crash, only the last commits may be lost on a power failure
+        self._connection.execute('''
+            CREATE TABLE IF NOT EXISTS urls (
+                url TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                result_location TEXT,
+                updated_at REAL NOT NULL
+            )
+        ''')
+        self._connection.commit()
+
+    def record(self, url: str, result: Any):
+        """
+            record the result of the url, the url is `done` if the result is not empty, otherwise `failed`.
+            the string result (like the path of the saved file) is recorded as the result location.
+        """
+        status: Journal_Status = 'done' if result else 'failed'
+        result_location = result if isinstance(result, str) else None
+        with self._lock:
+            self._pending.append((url, status, result_location, time()))
+            if len(self._pending) >= self.batch_size or time() - self._last_flushed_at >= self.flush_interval:
+                self._flush()
+
+    def _flush(self):
+        if self._pending:
+            self._connection.executemany('''
+                INSERT INTO urls (url, status, attempts, result_location, updated_at) VALUES (?, ?, 1, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    status = excluded.status,
+                    attempts = urls.attempts + 1,
+                    result_location = COALESCE(excluded.result_location, urls.result_location),
+                    updated_at = excluded.updated_at
+            ''', self._pending)
+            self._connection.commit()
+            self._pending = []
+        self._last_flushed_at = time()
+
+    def flush(self):
+        """
+            commit all of the not committed records.
+        """
+        with self._lock:
+            self._flush()
+
+    def is_done(self, url: str) -> bool:
+        """
+            check wheather the url was done in the journal.
+        """
+        with self._lock:
+            row = self._connection.execute('SELECT status FROM urls WHERE url = ?', (url,)).fetchone()
+        return row is not None and row[0] == 'done'
+
+    def filter_urls(self, url_list: Iterable[str]) -> Iterator[str]:
+        """
+            yield the urls which were not done in the journal, so the failed and the not started ones will be parsed again.
+        """
+        self.flush()
+        self.skipped_numbers = 0
+        for url in url_list:
+            if self.is_done(url):
+                self.skipped_numbers += 1
+                continue
+            yield url
+        if self.skipped_numbers > 0:
+            logger.info(f'skipped {self.skipped_numbers} done urls in the journal !!!')
+
+    def get_record(self, url: str) -> dict[str, Any] | None:
+        """
+            get the `status`, `attempts`, `result_location` and `updated_at` of the url, if not recorded, return None.
+        """
+        self.flush()
+        with self._lock:
+            row = self._connection.execute('SELECT status, attempts, result_location, updated_at FROM urls WHERE url = ?', (url,)).fetchone()
+        if row is None:
+            return None
+        return {'status': row[0], 'attempts': row[1], 'result_location': row[2], 'updated_at': row[3]}
+
+    def iter_urls(self, status: Journal_Status | None = None) -> Iterator[str]:
+        """
+            yield the recorded urls with the status, None means all of them.
+        """
+        self.flush()
+        with self._lock:
+            if status is None:
+                rows = self._connection.execute('SELECT url FROM urls').fetchall()
+            else:
+                rows = self._connection.execute('SELECT url FROM urls WHERE status = ?', (status,)).fetchall()
+        for row in rows:
+            yield row[0]
+
+    def _count(self, status: Journal_Status) -> int:
+        self.flush()
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM urls WHERE status = ?', (status,)).fetchone()[0]
+
+    @property
+    def done_numbers(self) -> int:
+        return self._count('done')
+
+    @property
+    def failed_numbers(self) -> int:
+        return self._count('failed')
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """
+            the counters of the journal.
+        """
+        return {
+            'done': self.done_numbers,
+            'failed': self.failed_numbers,
+            'skipped': self.skipped_numbers,
+        }
+
+    def reset(self):
+        """
+            forget all of the recorded urls, for a new run which is not resumed.
+        """
+        with self._lock:
+            self._pending = []
+            self._connection.execute('DELETE FROM urls')
+            self._connection.commit()
+        self.skipped_numbers = 0
+
+    def close(self):
+        """
+            commit the not committed records and close the journal.
+        """
+        with self._lock:
+            self._flush()
+            self._connection.close()
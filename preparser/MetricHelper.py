@@ -0,0 +1,268 @@
+import logging
+import threading
+from time import perf_counter, time
+from json import dumps
+from contextvars import ContextVar
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+logger = logging.getLogger(__name__)
+
+# the phases of per url
+#   `queue_wait`: from the url was taken from the `url_list` to it started, including the waiting in the scheduler and the threading pool.
+#   `connect`: opening the TCP (and TLS) connection, only when a new connection was opened.
+#   `ttfb`: from sending the request to the response headers arrived, including the `connect`.
+#   `download`: reading the response body.
+#   `parse`: parsing the response into the `BeautifulSoup` or `json` Object (including the callback when it runs in the processing pool).
+#   `browser`: loading the page with the browser in the `html_dynamic` and `html_auto` modes.
+#   `callback`: running the `request_call_back_func`.
+#   `total`: the whole parse task of the url.
+METRIC_PHASES = ('queue_wait', 'connect', 'ttfb', 'download', 'parse', 'browser', 'callback', 'total')
+
+DEFAULT_METRIC_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+class UrlTrace():
+    """
+        The timings and counters of an url, which will be handed to the hooks of the `Metricer` when the url finished.
+
+        Attributes:
+            url (str): the url.
+            phases (dict[str,float]): the seconds of per phase, the retried requests are added up.
+            body_size (int): the bytes of the downloaded response bodies.
+            status_code (int | None): the status code of the last response.
+            succeeded (bool): wheather the url was parsed successfully.
+            skipped_reason (str | None): why the failed url was skipped as the transient failure of its host, `circuit_open` or `retries_exhausted`, None means it's not skipped.
+            started_at (float): the timestamp when the url started.
+    """
+    __slots__ = ('url', 'phases', 'body_size', 'status_code', 'succeeded', 'skipped_reason', 'started_at')
+
+    def __init__(self, url: str) -> None:
+        self.url = url
+        self.phases: dict[str, float] = {}
+        self.body_size = 0
+        self.status_code: int | None = None
+        self.succeeded = False
+        self.skipped_reason: str | None = None
+        self.started_at = time()
+
+    def add_phase(self, name: str, seconds: float):
+        self.phases[name] = self.phases.get(name, 0) + seconds
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            'url': self.url,
+            'phases': self.phases,
+            'body_size': self.body_size,
+            'status_code': self.status_code,
+            'succeeded': self.succeeded,
+            'skipped_reason': self.skipped_reason,
+            'started_at': self.started_at,
+        }
+
+
+# the trace of the url which is running in current thread (or asyncio task)
+_current_trace: ContextVar[UrlTrace | None] = ContextVar('preparser_url_trace', default=None)
+
+
+def record_phase(name: str, seconds: float):
+    """
+        add the seconds of the phase into the trace of the running url, it does nothing outside a trace.
+    """
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add_phase(name, seconds)
+
+
+def record_response(status_code: int, body_size: int = 0):
+    """
+        record the status code and the body bytes of a response into the trace of the running url.
+    """
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.status_code = status_code
+        trace.body_size += body_size
+
+
+def mark_skipped(reason: str):
+    """
+        mark the running url as skipped for the transient failure of its host, like `circuit_open` or `retries_exhausted`.
+    """
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.skipped_reason = reason
+
+
+@contextmanager
+def measure_phase(name: str) -> Iterator[None]:
+    """
+        measure the seconds of the code inside the `with` statement as the phase of the running url.
+    """
+    started = perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(name, perf_counter() - started)
+
+
+class _Histogram():
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.bucket_counts[index] += 1
+                break
+
+    def to_dict(self) -> dict[str, Any]:
+        cumulative_counts = []
+        count = 0
+        for bucket_count in self.bucket_counts:
+            count += bucket_count
+            cumulative_counts.append(count)
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'avg': self.sum / self.count if self.count else 0.0,
+            'max': self.max,
+            'buckets': dict(zip([str(bound) for bound in self.buckets], cumulative_counts)),
+        }
+
+
+class Metricer():
+    """
+        A slight metrics collector of the parse pipeline, which records the seconds of per phase (see `METRIC_PHASES`) of per url into histograms,
+        counts the bytes and the status codes, and hands the `UrlTrace` of per finished url to the hooks,
+        so you can tell wheather the network, the parsing or the callback is the bottleneck.
+
+        Parameters:
+            buckets (tuple[float,...]): the upper bounds of the histogram buckets in seconds, default is `DEFAULT_METRIC_BUCKETS`.
+            hooks (list[Callable[[UrlTrace],Any]] | None): the functions called with the `UrlTrace` when per url finished, for example to send the traces to your tracing system, default is None.
+    """
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_METRIC_BUCKETS, hooks: list[Callable[[UrlTrace], Any]] | None = None) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self.hooks: list[Callable[[UrlTrace], Any]] = list(hooks) if hooks else []
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+            clear all of the recorded metrics.
+        """
+        with self._lock:
+            self._phases = {name: _Histogram(self.buckets) for name in METRIC_PHASES}
+            self.succeeded_numbers = 0
+            self.failed_numbers = 0
+            self.skipped_numbers: dict[str, int] = {}  # the failed urls skipped by per reason
+            self.body_bytes = 0
+            self.status_codes: dict[int, int] = {}
+
+    def add_hook(self, hook: Callable[[UrlTrace], Any]):
+        """
+            add a function called with the `UrlTrace` when per url finished.
+        """
+        self.hooks.append(hook)
+
+    @contextmanager
+    def trace(self, url: str, queue_wait: float | None = None) -> Iterator[UrlTrace]:
+        """
+            trace the url inside the `with` statement, the phases recorded by `record_phase` in it will be added to the trace,
+            set `UrlTrace.succeeded` inside it, and the trace will be collected when it exits.
+        """
+        trace = UrlTrace(url)
+        if queue_wait is not None:
+            trace.add_phase('queue_wait', queue_wait)
+        token = _current_trace.set(trace)
+        started = perf_counter()
+        try:
+            yield trace
+        finally:
+            trace.add_phase('total', perf_counter() - started)
+            _current_trace.reset(token)
+            self.collect(trace)
+
+    def collect(self, trace: UrlTrace):
+        """
+            add the trace of a finished url into the metrics, and hand it to the hooks.
+        """
+        with self._lock:
+            for name, seconds in trace.phases.items():
+                histogram = self._phases.get(name)
+                if histogram is None:  # the custom phases
+                    histogram = self._phases[name] = _Histogram(self.buckets)
+                histogram.observe(seconds)
+            if trace.succeeded:
+                self.succeeded_numbers += 1
+            else:
+                self.failed_numbers += 1
+                if trace.skipped_reason:
+                    self.skipped_numbers[trace.skipped_reason] = self.skipped_numbers.get(trace.skipped_reason, 0) + 1
+            self.body_bytes += trace.body_size
+            if trace.status_code is not None:
+                self.status_codes[trace.status_code] = self.status_codes.get(trace.status_code, 0) + 1
+        for hook in self.hooks:
+            try:
+                hook(trace)
+            except Exception as err:
+                logger.error(f'error when calling the metric hook {hook}, error: {err}.')
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+            get all of the metrics as a dict.
+        """
+        with self._lock:
+            return {
+                'urls': {'succeeded': self.succeeded_numbers, 'failed': self.failed_numbers},
+                'skipped_urls': dict(self.skipped_numbers),
+                'body_bytes': self.body_bytes,
+                'status_codes': {str(code): count for code, count in sorted(self.status_codes.items())},
+                'phases': {name: histogram.to_dict() for name, histogram in self._phases.items() if histogram.count},
+            }
+
+    def to_json(self) -> str:
+        """
+            export the metrics as a json string.
+        """
+        return dumps(self.snapshot(), ensure_ascii=False)
+
+    def to_prometheus(self, prefix: str = 'preparser') -> str:
+        """
+            export the metrics in the Prometheus text format, which can be served at a `/metrics` endpoint.
+        """
+        snapshot = self.snapshot()
+        lines = [
+            f'# HELP {prefix}_urls_total The number of the finished urls.',
+            f'# TYPE {prefix}_urls_total counter',
+            f'{prefix}_urls_total{{result="succeeded"}} {snapshot["urls"]["succeeded"]}',
+            f'{prefix}_urls_total{{result="failed"}} {snapshot["urls"]["failed"]}',
+            f'# HELP {prefix}_skipped_urls_total The number of the failed urls skipped for the transient failures of their hosts.',
+            f'# TYPE {prefix}_skipped_urls_total counter',
+        ]
+        for reason, count in snapshot['skipped_urls'].items():
+            lines.append(f'{prefix}_skipped_urls_total{{reason="{reason}"}} {count}')
+        lines += [
+            f'# HELP {prefix}_body_bytes_total The bytes of the downloaded response bodies.',
+            f'# TYPE {prefix}_body_bytes_total counter',
+            f'{prefix}_body_bytes_total {snapshot["body_bytes"]}',
+            f'# HELP {prefix}_responses_total The number of the responses by status code.',
+            f'# TYPE {prefix}_responses_total counter',
+        ]
+        for code, count in snapshot['status_codes'].items():
+            lines.append(f'{prefix}_responses_total{{code="{code}"}} {count}')
+        lines.append(f'# HELP {prefix}_phase_seconds The seconds of per phase of the urls.')
+        lines.append(f'# TYPE {prefix}_phase_seconds histogram')
+        for name, histogram in snapshot['phases'].items():
+            for bound, count in histogram['buckets'].items():
+                lines.append(f'{prefix}_phase_seconds_bucket{{phase="{name}",le="{bound}"}} {count}')
+            lines.append(f'{prefix}_phase_seconds_bucket{{phase="{name}",le="+Inf"}} {histogram["count"]}')
+            lines.append(f'{prefix}_phase_seconds_sum{{phase="{name}"}} {histogram["sum"]}')
+            lines.append(f'{prefix}_phase_seconds_count{{phase="{name}"}} {histogram["count"]}')
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,293 @@
+import logging
+import re
+import asyncio
+from inspect import isawaitable
+from importlib.util import find_spec
+from typing import Any, AsyncIterator, Callable, Iterator, Literal
+from bs4 import BeautifulSoup, SoupStrainer
+from .SessionHelper import FetchedResponse
+from .MetricHelper import measure_phase
+
+logger = logging.getLogger(__name__)
+
+Parser_Backend = Literal['html.parser', 'lxml', 'html5lib', 'selectolax']
+Json_Decoder = Literal['auto', 'json', 'orjson']
+
+# the packages need to be installed for per backend
+_BACKEND_PACKAGES = {
+    'html.parser': None,
+    'lxml': 'lxml',
+    'html5lib': 'html5lib',
+    'selectolax': 'selectolax',
+}
+
+_checked_backends: dict[str, bool] = {}
+
+# the simple css selector which can be converted into a SoupStrainer, like `div`, `div#main`, `table.data`, `.item`, `div[data-id=1]`
+_SIMPLE_SELECTOR_PATTERN = re.compile(r'^(?P<tag>[a-zA-Z][\w-]*)?(?:#(?P<id>[\w-]+))?(?:\.(?P<class>[\w-]+))?(?:\[(?P<attr>[\w-]+)(?:=["\']?(?P<value>[^\]"\']*)["\']?)?\])?$')
+
+
+class Souper():
+    """
+        A slight object to parse the html content with the specified parser backend, and fall back to the built-in `html.parser` when the backend is not installed.
+
+        Parameters:
+            parser_backend (Literal['html.parser','lxml','html5lib','selectolax']): the parser backend, default is `html.parser`.
+                                                `html.parser`: the python built-in parser of `BeautifulSoup`, which is the slowest one but no need to install anything.
+                                                `lxml`: the `BeautifulSoup` with the C based `lxml` parser, which is much faster than `html.parser` (`pip install lxml`).
+                                                `html5lib`: the `BeautifulSoup` with the `html5lib` parser, which parses the page the same way as the browsers, but it's the slowest (`pip install html5lib`).
+                                                `selectolax`: not a `BeautifulSoup` Object, but a `selectolax` html tree, which only supports the css selection like `tree.css('div.test')`,
+                                                              but it's several times faster than `lxml` (`pip install selectolax`).
+    """
+    def __init__(self, parser_backend: Parser_Backend = 'html.parser') -> None:
+        self.parser_backend: Parser_Backend = self.resolve_backend(parser_backend)
+        # the backend of the BeautifulSoup, for the places must need a BeautifulSoup Object
+        self.soup_backend: Parser_Backend = self.parser_backend if self.parser_backend != 'selectolax' else self.resolve_backend('lxml', warning=False)
+
+    @staticmethod
+    def is_backend_available(parser_backend: str) -> bool:
+        if parser_backend not in _checked_backends:
+            package = _BACKEND_PACKAGES.get(parser_backend, '')
+            _checked_backends[parser_backend] = package is None or (bool(package) and find_spec(package) is not None)
+        return _checked_backends[parser_backend]
+
+    @classmethod
+    def resolve_backend(cls, parser_backend: str, warning: bool = True) -> Parser_Backend:
+        """
+            get the available parser backend, if the `parser_backend` is invalid or not installed, return `html.parser`.
+        """
+        if parser_backend not in _BACKEND_PACKAGES:
+            if warning:
+                logger.warning(f'invalid parser_backend: {parser_backend}, only {",".join(_BACKEND_PACKAGES)} are available, use the html.parser instead !!!')
+            return 'html.parser'
+        if not cls.is_backend_available(parser_backend):
+            if warning:
+                logger.warning(f'the parser_backend {parser_backend} is not installed, please install it by `pip install {_BACKEND_PACKAGES[parser_backend]}`, use the html.parser instead !!!')
+            return 'html.parser'
+        return parser_backend
+
+    @staticmethod
+    def create_strainer(scope: str | SoupStrainer | None) -> SoupStrainer | None:
+        """
+            convert the simple css selector like `div`, `div#main`, `table.data`, `.item` or `div[data-id=1]` into a `SoupStrainer`,
+            return None if the selector is too complex to be converted.
+        """
+        if scope is None or isinstance(scope, SoupStrainer):
+            return scope
+        match = _SIMPLE_SELECTOR_PATTERN.match(scope.strip())
+        if not match or not any(match.groupdict().values()):
+            return None
+        attrs = {}
+        if match.group('id'):
+            attrs['id'] = match.group('id')
+        if match.group('class'):
+            class_name = match.group('class')
+            # the class attribute may have multiple values, like `class="item active"`
+            attrs['class'] = lambda value: value is not None and class_name in (value.split() if isinstance(value, str) else value)
+        if match.group('attr'):
+            attrs[match.group('attr')] = match.group('value') if match.group('value') is not None else True
+        return SoupStrainer(match.group('tag'), attrs)
+
+    def parse(self, markup: str | bytes, scope: str | SoupStrainer | None = None) -> BeautifulSoup | Any | None:
+        """
+            parse the html content with the `parser_backend`, return a `BeautifulSoup` Object or a `selectolax` html tree.
+
+            Parameters:
+                markup (str | bytes): the html content.
+                scope (str | SoupStrainer | None): only keep the nodes matched by this css selector or `SoupStrainer`, default is None, which means parse the whole page.
+                                                   all of the matched nodes are returned in one `BeautifulSoup` Object (or `selectolax` html tree) with any backend,
+                                                   for the simple selectors like `div#main`, `table` or `div.item`, only the matched nodes will be built,
+                                                   for the complex selectors (or the `html5lib` and `selectolax` backends), the whole page will be parsed first and then the matched nodes are moved into a new one.
+                                                   the `selectolax` backend doesn't support the `SoupStrainer`.
+                                                   if no nodes matched, return None.
+        """
+        if self.parser_backend == 'selectolax':
+            try:
+                from selectolax.lexbor import LexborHTMLParser as HTMLParser
+            except ImportError:
+                from selectolax.parser import HTMLParser
+            return self.select_scope(HTMLParser(markup), scope)
+        if scope is None:
+            return self.make_soup(markup)
+        strainer = self.create_strainer(scope)
+        if strainer is not None and self.parser_backend != 'html5lib':  # html5lib doesn't support the parse_only
+            soup = self.make_soup(markup, parse_only=strainer)
+            return soup if soup.find() is not None else None
+        return self.select_scope(self.make_soup(markup), scope)
+
+    def select_scope(self, soup: BeautifulSoup | Any, scope: str | SoupStrainer | None) -> BeautifulSoup | Any | None:
+        """
+            move all of the nodes matched by the css selector or `SoupStrainer` from the parsed whole page into a new `BeautifulSoup` Object (or `selectolax` html tree),
+            return the page itself if the `scope` is None, or None if no nodes matched.
+        """
+        if scope is None:
+            return soup
+        if self.parser_backend == 'selectolax':
+            if isinstance(scope, SoupStrainer):
+                raise ValueError('the selectolax parser_backend only supports the css selector scope, not the `SoupStrainer` !!!')
+            matched_nodes = self._drop_nested_nodes(soup.css(scope), lambda node: node.mem_id)
+            if not matched_nodes:
+                return None
+            scoped_tree = type(soup)('')
+            for node in matched_nodes:
+                scoped_tree.body.insert_child(node)  # copied into the new tree
+            return scoped_tree
+        strainer = self.create_strainer(scope)
+        matched_tags = self._drop_nested_nodes(soup.find_all(strainer) if strainer is not None else soup.select(scope), id)
+        if not matched_tags:
+            return None
+        scoped_soup = BeautifulSoup('', 'html.parser')
+        for tag in matched_tags:
+            scoped_soup.append(tag.extract())
+        return scoped_soup
+
+    @staticmethod
+    def _drop_nested_nodes(nodes: list[Any], get_key: Callable[[Any], Any]) -> list[Any]:
+        # the nodes inside the other matched nodes are already kept with their parents, just like the `parse_only`
+        kept_keys = set()
+        kept_nodes = []
+        for node in nodes:
+            parent = node.parent
+            while parent is not None and get_key(parent) not in kept_keys:
+                parent = parent.parent
+            if parent is None:
+                kept_keys.add(get_key(node))
+                kept_nodes.append(node)
+        return kept_nodes
+
+    def select_one(self, soup: BeautifulSoup | Any, selector: str) -> Any | None:
+        """
+            get the first node matched by the css selector from the parsed `BeautifulSoup` Object or `selectolax` html tree, return None if not matched.
+        """
+        if self.parser_backend == 'selectolax':
+            return soup.css_first(selector)
+        return soup.select_one(selector)
+
+    def get_text(self, soup: BeautifulSoup | Any) -> str:
+        """
+            get the text content of the parsed `BeautifulSoup` Object or `selectolax` html tree.
+        """
+        if self.parser_backend == 'selectolax':
+            return soup.text()
+        return soup.get_text()
+
+    def make_soup(self, markup: str | bytes, **kwargs) -> BeautifulSoup:
+        """
+            parse the html content into a `BeautifulSoup` Object, if the `parser_backend` is `selectolax`, `lxml` or `html.parser` will be used instead.
+        """
+        return BeautifulSoup(markup, self.soup_backend, **kwargs)
+
+
+def resolve_json_decoder(json_decoder: str) -> Literal['json', 'orjson']:
+    """
+        get the available json decoder, `auto` means `orjson` if it's installed, otherwise the built-in `json`.
+    """
+    if json_decoder not in ('auto', 'json', 'orjson'):
+        logger.warning(f'invalid json_decoder: {json_decoder}, only auto,json,orjson are available, use the auto instead !!!')
+        json_decoder = 'auto'
+    if json_decoder == 'json':
+        return 'json'
+    if find_spec('orjson') is None:
+        if json_decoder == 'orjson':
+            logger.warning('the json_decoder orjson is not installed, please install it by `pip install orjson`, use the json instead !!!')
+        return 'json'
+    return 'orjson'
+
+
+def get_json_stream_prefix(api_stream_path: str) -> str:
+    """
+        convert the json path like `data.items[*]` into the `ijson` prefix like `data.items.item`, and `[*]` means the items of the top-level array.
+    """
+    return api_stream_path.strip().replace('[*]', '.item').strip('.')
+
+
+def _import_ijson():
+    try:
+        import ijson
+    except ImportError:
+        raise ImportError('the api_stream_path needs the `ijson` package, please install it by `pip install ijson` !!!')
+    return ijson
+
+
+def iter_json_items(reader: Any, api_stream_path: str) -> Iterator[Any]:
+    """
+        incrementally parse the json body from the file-like `reader`, and yield the items matched by the `api_stream_path` one by one.
+    """
+    return _import_ijson().items(reader, get_json_stream_prefix(api_stream_path), use_float=True)
+
+
+def aiter_json_items(reader: Any, api_stream_path: str) -> AsyncIterator[Any]:
+    """
+        the async version of `iter_json_items`, the `reader` should have an async `read` method.
+    """
+    return _import_ijson().items(reader, get_json_stream_prefix(api_stream_path), use_float=True)
+
+
+class ResponseParser():
+    """
+        A slight picklable parse stage, which parses the fetched response into the `BeautifulSoup` or `json` Object, and hands it to the callback function,
+        so it can be sent to and run in the other processes.
+
+        Parameters:
+            parser_mode (Literal['html','api','html_dynamic','html_auto']): the parsing mode of the response.
+            souper (Souper): to parse the html content.
+            html_scope (str | SoupStrainer | None): the specified scope nodes to parse in the `html` mode, default is None, which means parse the whole page.
+            call_back (Callable[[str,BeautifulSoup | dict[str,Any]],Any] | None): the callback function to handle the parsed object, default is None.
+            json_decoder (Literal['auto','json','orjson']): the json decoder in the `api` mode, default is `auto`, which means `orjson` if it's installed, otherwise the built-in `json`.
+    """
+    def __init__(self,
+                 parser_mode: Literal['html', 'api', 'html_dynamic', 'html_auto'],
+                 souper: Souper,
+                 html_scope: str | SoupStrainer | None = None,
+                 call_back: Callable[[str, Any], Any] | None = None,
+                 json_decoder: Json_Decoder = 'auto'
+                 ) -> None:
+        self.parser_mode: Literal['html', 'api', 'html_dynamic', 'html_auto'] = parser_mode
+        self.souper = souper
+        self.html_scope = html_scope
+        self.call_back = call_back
+        self.json_decoder: Literal['json', 'orjson'] = resolve_json_decoder(json_decoder)
+
+    def load_json(self, respos: FetchedResponse) -> Any:
+        """
+            decode the json body of the response, `orjson` decodes the utf-8 bytes directly without decoding them into the `str` first.
+        """
+        encoding = (respos.encoding or 'utf-8').lower().replace('_', '-')
+        if self.json_decoder == 'orjson' and encoding in ('utf-8', 'utf8', 'ascii', 'us-ascii'):
+            import orjson
+            return orjson.loads(respos.content)
+        return respos.json()
+
+    def parse_response(self, url: str, respos: FetchedResponse) -> BeautifulSoup | Any | None:
+        """
+            parse the response into the `BeautifulSoup` or `json` Object, return None if the response is failed.
+        """
+        if respos.status_code == 200:
+            with measure_phase('parse'):
+                if self.parser_mode == 'api':
+                    return self.load_json(respos)
+                soup = self.souper.parse(respos.text, self.html_scope if self.parser_mode in ('html', 'html_auto') else None)
+            if soup is None:
+                logger.warning(f"can't find the html_scope({self.html_scope}) from the url:({url}) !!!")
+            return soup
+        else:
+            logger.warning(f"something unknow happend when parsing the datas with the url:({url}), response_status_code:{respos.status_code},response:{respos}!!!")
+            return None
+
+    def check_call_back_result(self, url: str, handled_result: Any) -> Any:
+        if handled_result is None:
+            logger.warning(f"parsing by function({self.call_back})with url({url}) get None Result !!!")
+        return handled_result
+
+    def __call__(self, url: str, respos: FetchedResponse) -> Any:
+        """
+            parse the response and hand the parsed object to the callback function, the async callback will be run by `asyncio.run`.
+        """
+        to_pass_next_data = self.parse_response(url, respos)
+        if (self.call_back is not None) and (to_pass_next_data is not None):
+            with measure_phase('callback'):
+                handled_result = self.call_back(url, to_pass_next_data)
+                if isawaitable(handled_result):  # the async callback outside the event loop
+                    handled_result = asyncio.run(handled_result)
+            return self.check_call_back_result(url, handled_result)
+        return to_pass_next_data
@@ -1,10 +1,31 @@
 
+import logging
+import asyncio
+import threading
+import pickle
 import requests
-from bs4 import BeautifulSoup
-from typing import Callable,Literal,Any 
+from concurrent.futures import ProcessPoolExecutor
+from time import sleep,perf_counter
+from inspect import isawaitable
+from bs4 import BeautifulSoup,SoupStrainer
+from typing import AsyncIterator,Callable,Iterable,Iterator,Literal,Any,Pattern,Sized
 from urllib.parse import urlparse
-from .TaskHelper import Tasker
-from .DynamicHelper import Dynamicer,Moniter_Notes
+from .TaskHelper import Tasker,AsyncTasker
+from .DynamicHelper import Dynamicer,Moniter_Notes,Dynamic_Engine,ResourcePolicy,Extract_Fields,normalize_extract_fields
+from .SessionHelper import Sessioner,AsyncSessioner,FetchedResponse,ResponseChecker,Request_Timeout
+from .ScheduleHelper import Scheduler,ConcurrencyLimiter
+from .RetryHelper import RetryPolicy,CircuitBreaker
+from .CacheHelper import Cacher,CacheEntry
+from .UrlHelper import Urler
+from .JournalHelper import Journaler
+from .MetricHelper import Metricer,UrlTrace,measure_phase,mark_skipped
+from .AutoHelper import AutoModer
+from .ParserHelper import Souper,Parser_Backend,Json_Decoder,ResponseParser,iter_json_items,aiter_json_items
+
+logger = logging.getLogger(__name__)
+
+_BROWSER_NOT_PROBED = -2  # the browser of the html_auto mode is probed at the first escalation
+
 # typing 
 Json_Data = dict[str, Any]
 
@@ -14,19 +35,25 @@ class PreParser():
         A slight PreParser oject to handle the parsing task with threading pools or other methods from webpage urls or api urls.
 
         Parameters:
-            url_list(list):The list of URLs to parse from. Default is an empty list.
+            url_list(Iterable[str]):The list of URLs to parse from, or any iterable of them like a generator or the `Urler.iter_file_urls(file_path)`, which will be consumed lazily,
+                                    so the huge url sources won't be loaded into memory at once, note that an iterator can be parsed only once. Default is an empty list.
             request_call_back_func (Callable[[str,BeautifulSoup | Dict[str, Any]], Any] | None):A callback function according to the parser_mode to handle the `BeautifulSoup` object or request `json` Object. and if you want to show your business process failed, you can return `None`, otherwise please return a `not None` Object.  
-            parser_mode(Literal['html','api']): the pre-parsing datas mode,default is html, 
+            parser_mode(Literal['html','api','html_dynamic','html_auto']): the pre-parsing datas mode,default is html, 
                                                 `html`: parse the content from static html, and return an `BeautifulSoup` Object. 
                                                 `api`: parse the datas from an api, and return the `json` Object.
                                                 `html_dynamic`: parse  from  the whole webpage html content and return an `BeautifulSoup` Object, even the content that generated by the dynamic js code.
+                                                `html_auto`: fetch the static html first just like the `html` mode, and only when it failed the `static_check`, load it with the browser just like the `html_dynamic` mode,
+                                                             and the hosts which almost always need the browser will be learned and go to the browser directly, you can get the counters from `auto_moder.stats`.
             cached_data(bool): weather cache the parsed datas, defalt is False.
             start_threading(bool): Whether to use threading pool for parsing the data. Default is False.
-            threading_mode(Literal['map','single']): to run the task mode,default is `single`. 
+            threading_mode(Literal['map','single','async']): to run the task mode,default is `single`. 
                                                 `map`: use the `map` func of the theading pool to distribute tasks.
                                                 `single`: use the `submit` func to distribute the task one by one into the theading pool.
+                                                `async`: run the tasks on an `asyncio` event loop, which need the package `aiohttp` installed, and at most `threading_numbers` urls will be in flight at the same time.
             stop_when_task_failed(bool): wheather need stop when you failed to get request from a Url,default is True.
-            threading_numbers(int): The maximum number of threads in the threading pool. Default is 3.
+                                         the urls skipped by the open circuit of the `circuit_breaker_threshold` or still failed after all of the `max_retries` won't stop the task,
+                                         as they are the transient failures of their hosts, and they are counted in the `skipped_urls` of the `metricer.snapshot()`.
+            threading_numbers(int): The maximum number of threads in the threading pool, or the maximum number of in-flight requests in the `async` threading_mode. Default is 3.
             checked_same_site(bool): wheather need add more headers info to pretend requesting in a same site to parse datas, default is True,to resolve the CORS Block.
             html_dynamic_scope(list[str,Literal['attached', 'detached', 'hidden', 'visible']] | None): point and get the specied scope dom of the whole page html, default is None, which stands for the whole page dom.
                                                                                                         else if this value was set, the parameter should be a list(2) Object.
@@ -40,32 +67,174 @@ class PreParser():
                                                                                                           `hidden`: wait for element to have non-empty bounding box and no `visibility:hidden`. Note that element,without any content or with `display:none` has an empty bounding box and is not considered visible.
                                                                                                           `visible`: wait for element to be either detached from DOM, or have an empty bounding box or `visibility:hidden`. This is opposite to the 'visible' option. 
             ssl_certi_verified(bool): wheather need verify the ssl certi when requesting datas from urls, default is True, which means will verify the ssl certi to make the requesting safe.
+            pool_connections(int): the number of the hosts keep-alive connection pools to cache, which shared by all of the threads, default is 10.
+            pool_maxsize(int): the maximum number of the keep-alive connections for per host, default is 10.
+            host_pool_sizes(dict[str,int] | None): the specified maximum number of keep-alive connections for the specified hosts, for example `{'example.com': 20}`, default is None, which means all of the hosts use the `pool_maxsize`.
+            requests_per_second(float | None): the maximum requests per second for per host, default is None, which means no limit.
+            max_concurrent_per_host(int | None): the maximum number of the in-flight requests for per host, default is None, which means no limit.
+                                                 if one of `requests_per_second` and `max_concurrent_per_host` was set, the urls will be dispatched by a per-host politeness `Scheduler`,
+                                                 which also pauses the host that responded `429` or `Retry-After`.
+            max_retries(int): the maximum retry times for per url when met the transient errors (timeouts, connection resets, 5xx and 429), default is 0, which means no retry.
+            retry_backoff_factor(float): the base seconds of the exponential backoff with jitter between the retries, the n-th retry will wait `retry_backoff_factor * 2 ** (n - 1)` seconds at most, default is 0.5.
+            circuit_breaker_threshold(int | None): the continuous failure times to open the circuit of a host, when the circuit is open, all of the urls of this host will be failed directly without requesting,
+                                                   default is None, which means no circuit breaker.
+            circuit_breaker_timeout(float): the seconds to keep the circuit of a host open before probing it again, default is 30.
+            cache_dir(str | None): the directory of the on-disk http response cache for the `html` and `api` modes, default is None, which means no cache.
+                                   the cache respects the `Cache-Control` and revalidates the stale responses with `ETag` / `If-Modified-Since`, so the unchanged pages will come back as cheap `304`.
+            cache_max_size(int): the maximum total bytes of the cached responses, the least recently used ones will be evicted when exceeded, default is 512 MB.
+            request_timeout(float | tuple[float,float] | None): the seconds of the connect and read timeout when requesting the urls, or a tuple of `(connect timeout, read timeout)`, default is `(10, 60)`, None means no timeout.
+            max_body_size(int | None): the maximum bytes of the response body, the body is streamed and the download will be aborted once it's larger than this value, default is None, which means no limit.
+            allowed_content_types(list[str] | None): the allowed prefixes of the response content type, for example `['text/html']`, the response will be aborted before downloading the body if its content type is not allowed,
+                                                     default is None, which means all of the content types except the binary ones (images, videos, archives and so on) are allowed.
+            dedup_urls(bool): wheather canonicalize the urls (lowercase the scheme and host, remove the default port, the fragment and the tracking parameters, and sort the query parameters without re-encoding them) and drop the duplicated ones before parsing,
+                              if you set True, the `request_call_back_func` and the cached datas will get the canonicalized urls, default is False.
+            url_tracking_params(list[str] | None): the query parameters to remove when canonicalizing the urls, the one ends with `*` matches all of the parameters with the same prefix, default is None, which means the common tracking parameters like `utm_*`, `gclid`, `fbclid` and so on.
+            dedup_backend(Literal['set','bloom']): the seen-set to drop the duplicated urls, default is `set`.
+                                                   `set`: the exact hash set, which takes about 70 bytes for per url (a 64 bits hash in the python `set`).
+                                                   `bloom`: the bloom filter, which takes fixed memory for tens of millions of urls, but may drop a few (0.1%) of the not duplicated urls.
+            parser_backend(Literal['html.parser','lxml','html5lib','selectolax']): the parser backend to parse the html in the `html` and `html_dynamic` modes, default is `html.parser`,
+                                                   if the backend is not installed, will fall back to the `html.parser`.
+                                                   `html.parser`: the python built-in parser of `BeautifulSoup`.
+                                                   `lxml`: the `BeautifulSoup` with the C based `lxml` parser, which is much faster (`pip install lxml`).
+                                                   `html5lib`: the `BeautifulSoup` with the `html5lib` parser, which parses the page the same way as the browsers, but slower (`pip install html5lib`).
+                                                   `selectolax`: the `request_call_back_func` will get a `selectolax` html tree instead of the `BeautifulSoup` Object, which only supports the css selection like `tree.css('div.test')`, but it's the fastest (`pip install selectolax`).
+            html_scope(str | SoupStrainer | None): only parse the specified scope nodes of the page in the `html` mode, just like the `html_dynamic_scope` in the `html_dynamic` mode, default is None, which means parse the whole page.
+                                                   the value can be a css selecter or a `bs4.SoupStrainer` Object, for the simple selecters like `div#main`, `table`, `div.test` or `div[data-id="1"]`,
+                                                   only all of the matched nodes will be built into the `BeautifulSoup` Object, which saves the parsing time and memory,
+                                                   for the complex selecters like `div#main > p` (or the `html5lib` and `selectolax` parser_backend), the whole page will be parsed first and then all of the matched nodes are moved into a new one,
+                                                   so the `request_call_back_func` always gets all of the matched nodes in one `BeautifulSoup` Object (or `selectolax` html tree) with any parser_backend.
+                                                   the `selectolax` parser_backend only supports the css selecter, and raises the `ValueError` for the `SoupStrainer`.
+                                                   if no nodes matched, the url will be treated as failed.
+            parse_in_process(bool): wheather parse the responses and run the `request_call_back_func` in a processing pool, while the threads or the event loop only do the fetching, default is False.
+                                    as the parsing and the callback are CPU-bound, which can't run in parallel in the threads, this helps use the multiple CPU cores,
+                                    but the `request_call_back_func` must be defined at the module level (not a lambda or a nested function) and its result must be picklable.
+            process_numbers(int): the maximum number of the processes in the processing pool when `parse_in_process` is True, default is 2.
+            json_decoder(Literal['auto','json','orjson']): the json decoder in the `api` mode, default is `auto`, which means use the faster `orjson` if it's installed (`pip install orjson`), otherwise the built-in `json`.
+            api_stream_path(str | None): the json path of the items to stream in the `api` mode, like `data.items[*]` or `[*]` for a top-level array, default is None, which means decode the whole json body at once.
+                                         if this value was set, the json body will be parsed incrementally while downloading (`pip install ijson`), and the `request_call_back_func` will be called with per item
+                                         instead of the whole `json` Object, so the huge responses won't be held in memory, and the parsing result of the url will be the number of the items whose callback result was not None.
+                                         note that the streamed responses are not retried or cached, and the callback is always run in the fetching threads (or the event loop) even if `parse_in_process` is True.
+            browser_numbers(int | None): the number of the long-lived browsers to load the pages at the same time in the `html_dynamic` mode, default is None, which means the `threading_numbers` when `start_threading` is True, otherwise 1.
+                                         the browsers are launched once and reused by all of the urls, and they will be closed when the parsing task finished or stopped.
+            max_pages_per_context(int): the number of the pages opened in a browser context before it's recycled in the `html_dynamic` mode, so the cookies, caches and leaked memory won't keep growing, default is 20.
+            browser_restart_after(int): the number of the navigations before a browser is restarted in the `html_dynamic` mode, and the crashed browser will be restarted at once, default is 200.
+            dynamic_engine(Literal['sync','async']): the engine to drive the browsers in the `html_dynamic` mode, default is `sync`.
+                                                   `sync`: `browser_numbers` browsers driven by the playwright sync api in their own threads, and each browser loads one page at a time.
+                                                   `async`: a single browser driven by the playwright async api on a background event loop, which loads at most `max_pages_per_browser` pages at the same time,
+                                                            so it takes far less memory than one browser for per thread, and the `browser_numbers` is not used.
+            max_pages_per_browser(int): the maximum number of the pages loading at the same time in the browser of the `async` dynamic_engine, default is 8.
+            page_timeout(float): the maximum seconds to load per page in the `html_dynamic` mode, including the navigating and waiting for the `html_dynamic_scope`, default is 30.
+            blocked_resource_types(list[str] | None): the resource types to block before navigating in the `html_dynamic` mode, like `image`, `media`, `font`, `stylesheet` or `script`, default is None, which means no resource types blocked.
+                                                      the blocked resources won't be downloaded at all, which saves lots of loading time and bandwidth on the heavy sites, `preparser.HEAVY_RESOURCE_TYPES` is a good start.
+            blocked_url_patterns(list[str | Pattern[str]] | None): the url glob patterns like `*://*.doubleclick.net/*` or the compiled regex patterns of the resources to block in the `html_dynamic` mode, default is None.
+            allowed_hosts(list[str] | None): only the resources from these hosts (and their sub domains) can be loaded in the `html_dynamic` mode, and the page documents are always allowed, default is None, which means all of the hosts are allowed.
+            dynamic_extract_fields(dict[str,str | dict] | None): extract the fields inside the browser in the `html_dynamic` mode, and the `request_call_back_func` will get a `dict` of the extracted datas instead of the `BeautifulSoup` Object,
+                                                   which saves the time of serializing the page html and re-parsing it, default is None, which means get the `BeautifulSoup` Object.
+                                                   the value is a map of the field name to a css selecter (the trimmed text of the first matched node), or a dict with the keys below:
+                                                   `selector`: the css selecter relative to its parent scope, empty means the parent scope node itself.
+                                                   `attr`: `text` (default), `html` (the inner html), `outer_html` or the attribute name like `href`.
+                                                   `all`: wheather get all of the matched nodes as a list, default is False, which means only the first matched node, and None if not matched.
+                                                   `fields`: the nested fields, which makes per matched node as a scope and extracts a dict from it, so the several scopes of a page can be extracted at once,
+                                                   for example: `{'title': 'h1', 'items': {'selector': 'div.item', 'all': True, 'fields': {'name': 'h2', 'link': {'selector': 'a', 'attr': 'href'}}}}`.
+                                                   the `html_dynamic_scope` is still used to wait for the page loaded before extracting.
+            static_check(str | Callable[[str,BeautifulSoup],bool] | None): the check of the static html in the `html_auto` mode, the url will be loaded with the browser when the check failed, default is None.
+                                                   it can be a css selecter which must be matched in the whole page (not only in the `html_scope` nodes), or a function which gets the url and the parsed static `BeautifulSoup` Object and returns wheather it's enough to parse,
+                                                   None means the selecter of the `html_dynamic_scope` must be matched if it was set, otherwise the static page must have some text.
+                                                   note that in the `html_auto` mode, the `request_call_back_func` always gets the `BeautifulSoup` Object and runs in the fetching threads (or the event loop),
+                                                   the `dynamic_extract_fields` and `parse_in_process` are not used, and the browser is only checked at the first escalation, if no browser is installed, the escalated urls are failed.
+            max_in_flight(int | None): the maximum number of the urls which were taken from the `url_list` but their results were not handled yet, to bound the memory of the huge crawls,
+                                                   default is None, which means 4 times of the `threading_numbers` (2 times in the `async` threading_mode), and the 256 when parsing without threading.
+            journal_path(str | None): the path of the crash-safe SQLite crawl journal, which records the status, attempts and result location of per url as soon as it finished,
+                                                   so the run can be resumed by `start_parse(resume=True)` after a crash, default is None, which means no journal.
+                                                   the string result of the `request_call_back_func` (like the path of the saved file) is recorded as the result location.
+            journal_batch_size(int): commit the journal records after this number of the urls finished (or 1 second passed), default is 100.
+            adaptive_concurrency(bool): wheather adjust the number of the running urls at runtime in the AIMD way by the observed latency, failures and the throttled responses (`429` / `503`),
+                                                   within `[min_threading_numbers, threading_numbers]`, default is False, which means always run `threading_numbers` urls at the same time.
+                                                   you can get the current limit from `PreParser(....).concurrency_limiter.current_limit` or `concurrency_limiter.stats`.
+            min_threading_numbers(int): the minimum number of the running urls in the `adaptive_concurrency`, and it starts from this number, default is 1.
+            metric_hooks(list[Callable[[UrlTrace],Any]] | None): the functions called with the `UrlTrace` (the seconds of per phase, the bytes and the status code) when per url finished,
+                                                   for example to send the traces to your tracing system, default is None.
+                                                   all of the phases are also collected into the `metricer`, you can export them by `metricer.to_prometheus()` or `metricer.to_json()`.
         
         Attributes:
-            url_list(list):The list of URLs to parse from.
+            url_list(Iterable[str]):The list of URLs to parse from.
             request_call_back_func(Callable[[str,BeautifulSoup | Dict[str, Any]], bool] | None): The callback function to process the BeautifulSoup Or Json object.
-            parser_mode(Literal['html','api']): the preparse  datas mode.
+            parser_mode(Literal['html','api','html_dynamic','html_auto']): the preparse  datas mode.
             cached_data(bool): weather to cache the parse datas.
             start_threading(bool): Whether to use threading pool.
-            threading_mode(Literal['map','single']): to run the task mode.
+            threading_mode(Literal['map','single','async']): to run the task mode.
             stop_when_task_failed(bool): wheather need stop when you failed to get request from a Url.
             threading_numbers(int): The maximum number of threads.
             checked_same_site(bool): wheather need add more headers info to pretend requesting in a same site to parse datas, to resolve the CORS Block.
             html_dynamic_scope(list[str,Literal['attached', 'detached', 'hidden', 'visible']] | None): to get and load specified scope html nodes resouce.
             ssl_certi_verified(bool): wheather need verify the ssl certi when requesting datas from urls. 
+            sessioner(Sessioner): the pooled keep-alive sessions to request the datas from urls.
+            async_sessioner(AsyncSessioner): the pooled `aiohttp` session to request the datas from urls in the `async` threading_mode.
+            scheduler(Scheduler | None): the per-host politeness scheduler.
+            retry_policy(RetryPolicy | None): the retry policy for the transient errors.
+            circuit_breaker(CircuitBreaker | None): the per-host circuit breaker.
+            cacher(Cacher | None): the on-disk http response cache, you can get the hit/miss counters from `cacher.stats`.
+            journaler(Journaler | None): the crash-safe crawl journal, you can get the done/failed counters from `journaler.stats`.
+            concurrency_limiter(ConcurrencyLimiter | None): the adaptive limiter of the number of the running urls when `adaptive_concurrency` is True.
+            metricer(Metricer): the metrics of per phase (`queue_wait`, `connect`, `ttfb`, `download`, `parse`, `browser`, `callback` and `total`) of the urls, and the bytes and status code counters.
+            urler(Urler | None): to canonicalize the urls and drop the duplicated ones.
+            souper(Souper): to parse the html content with the `parser_backend`.
+            auto_moder(AutoModer): the per-host learner of the `html_auto` mode, you can get how often the urls escalated to the browser from `auto_moder.stats`.
+            dynamicer(Dynamicer): to load the dynamic html content with the pooled long-lived browsers in the `html_dynamic` mode.
+            response_parser(ResponseParser): the picklable parse stage to parse the responses with the `parser_backend` and `html_scope`, and hand them to the `request_call_back_func`.
     """
     def __init__(self, 
-                 url_list: list[str] = [],
+                 url_list: Iterable[str] = [],
                  request_call_back_func: Callable[[str,BeautifulSoup | Json_Data], Any ] | None = None,
-                 parser_mode:Literal['html','api','html_dynamic'] = 'html',
+                 parser_mode:Literal['html','api','html_dynamic','html_auto'] = 'html',
                  cached_data:bool = False,
                  start_threading: bool = False,
-                 threading_mode:Literal['map','single'] = 'single',
+                 threading_mode:Literal['map','single','async'] = 'single',
                  stop_when_task_failed:bool = True,
                  threading_numbers: int = 3,
                  checked_same_site:bool = True,
                  html_dynamic_scope:Moniter_Notes= None,  # await loaded contions
-                 ssl_certi_verified:bool = True
+                 ssl_certi_verified:bool = True,
+                 pool_connections:int = 10,
+                 pool_maxsize:int = 10,
+                 host_pool_sizes:dict[str,int] | None = None,
+                 requests_per_second:float | None = None,
+                 max_concurrent_per_host:int | None = None,
+                 max_retries:int = 0,
+                 retry_backoff_factor:float = 0.5,
+                 circuit_breaker_threshold:int | None = None,
+                 circuit_breaker_timeout:float = 30,
+                 cache_dir:str | None = None,
+                 cache_max_size:int = 512 * 1024 * 1024,
+                 request_timeout:Request_Timeout = (10,60),
+                 max_body_size:int | None = None,
+                 allowed_content_types:list[str] | None = None,
+                 dedup_urls:bool = False,
+                 url_tracking_params:list[str] | None = None,
+                 dedup_backend:Literal['set','bloom'] = 'set',
+                 parser_backend:Parser_Backend = 'html.parser',
+                 html_scope:str | SoupStrainer | None = None,
+                 parse_in_process:bool = False,
+                 process_numbers:int = 2,
+                 json_decoder:Json_Decoder = 'auto',
+                 api_stream_path:str | None = None,
+                 browser_numbers:int | None = None,
+                 max_pages_per_context:int = 20,
+                 browser_restart_after:int = 200,
+                 dynamic_engine:Dynamic_Engine = 'sync',
+                 max_pages_per_browser:int = 8,
+                 page_timeout:float = 30,
+                 blocked_resource_types:list[str] | None = None,
+                 blocked_url_patterns:list[str | Pattern[str]] | None = None,
+                 allowed_hosts:list[str] | None = None,
+                 dynamic_extract_fields:Extract_Fields | None = None,
+                 static_check:str | Callable[[str,Any],bool] | None = None,
+                 max_in_flight:int | None = None,
+                 journal_path:str | None = None,
+                 journal_batch_size:int = 100,
+                 adaptive_concurrency:bool = False,
+                 min_threading_numbers:int = 1,
+                 metric_hooks:list[Callable[[UrlTrace],Any]] | None = None
                 ) -> None:
         self.to_parse_urls = url_list
         self.start_threading = start_threading
@@ -73,107 +242,710 @@ class PreParser():
         self.cached_data = cached_data
         self.cached_request_datas = {}
         self.request_call_back_func = request_call_back_func
-        self.parser_mode:Literal['html','api','html_dynamic'] = parser_mode
+        self.parser_mode:Literal['html','api','html_dynamic','html_auto'] = parser_mode
         self.checked_same_site:bool = checked_same_site
         self.stop_when_task_failed = stop_when_task_failed
-        self.threading_mode:Literal['map','single'] = threading_mode
-        self.tasker = Tasker(self.threading_mode,self._pre_parse_datas,self.to_parse_urls,self.threading_numbers,self.cached_data,self.stop_when_task_failed)
+        self.threading_mode:Literal['map','single','async'] = threading_mode
+        self.scheduler = Scheduler(requests_per_second,max_concurrent_per_host) if (requests_per_second or max_concurrent_per_host) else None
+        self.retry_policy = RetryPolicy(max_retries,retry_backoff_factor) if max_retries > 0 else None
+        self.circuit_breaker = CircuitBreaker(circuit_breaker_threshold,circuit_breaker_timeout) if circuit_breaker_threshold else None
+        self.cacher = Cacher(cache_dir,cache_max_size) if cache_dir else None
+        self.journaler = Journaler(journal_path,journal_batch_size) if journal_path else None
+        self.concurrency_limiter = ConcurrencyLimiter(threading_numbers,min_threading_numbers) if adaptive_concurrency else None
+        self.metricer = Metricer(hooks=metric_hooks)
+        self._url_taken_at:dict[str,float] = {}
+        self.urler = Urler(url_tracking_params,dedup_backend) if dedup_urls else None
+        self.souper = Souper(parser_backend)
+        if isinstance(html_scope,SoupStrainer) and self.souper.parser_backend == 'selectolax':
+            raise ValueError('the `SoupStrainer` html_scope is not supported by the selectolax parser_backend, please use a css selecter instead !!!')
+        self.response_parser = ResponseParser(parser_mode,self.souper,html_scope,request_call_back_func,json_decoder)
+        self.api_stream_path = api_stream_path
+        self.parse_in_process = parse_in_process
+        self.process_numbers = process_numbers
+        self._process_executor:ProcessPoolExecutor | None = None
+        self._skipped_urls:set[str] = set()  # the failed urls skipped for the transient failures of their hosts, which don't stop the task
+        self.tasker = Tasker(self.threading_mode,self._pre_parse_datas,self.to_parse_urls,self.threading_numbers,self.cached_data,self.stop_when_task_failed,self.scheduler,max_in_flight,self._flush_journal,self.concurrency_limiter,self._pop_skipped_url)
         self._request_ssl_verified = ssl_certi_verified
-        self.dynamicer= Dynamicer(ignore_https_errors = not ssl_certi_verified)
+        self.response_checker = ResponseChecker(max_body_size,allowed_content_types)
+        self.sessioner = Sessioner(pool_connections,pool_maxsize,host_pool_sizes,request_timeout,self.response_checker)
+        self.async_tasker = AsyncTasker(self._async_pre_parse_datas,self.to_parse_urls,self.threading_numbers,self.cached_data,self.stop_when_task_failed,self.scheduler,max_in_flight,self.concurrency_limiter,self._pop_skipped_url)
+        self.async_sessioner = AsyncSessioner(self.threading_numbers,0,request_timeout,self.response_checker)
+        browser_numbers = browser_numbers if browser_numbers else (self.threading_numbers if self.start_threading else 1)
+        resource_policy = ResourcePolicy(blocked_resource_types,blocked_url_patterns,allowed_hosts)
+        self.dynamicer= Dynamicer(not ssl_certi_verified,browser_numbers,max_pages_per_context,browser_restart_after,dynamic_engine,max_pages_per_browser,page_timeout,resource_policy)
         self._stop_running = False
+        self._browser_probe_lock = threading.Lock()
         self._async_bundle_index = self._get_aync_bundle_index()
         self._html_dynamic_scope = html_dynamic_scope
+        self._dynamic_extract_fields = normalize_extract_fields(dynamic_extract_fields) if dynamic_extract_fields else None
+        self.static_check = static_check
+        self.auto_moder = AutoModer()
+        self.max_in_flight = max_in_flight if max_in_flight else 256
 
     
     def _get_aync_bundle_index(self) -> int:
+        if self.parser_mode == 'html_auto':
+            # most of the pages never need the browser, so it's probed at the first escalation
+            return _BROWSER_NOT_PROBED
         if self.parser_mode == 'html_dynamic':
             avalibe_bundle_index = self.dynamicer._check_dynamic_async_env()
             if avalibe_bundle_index == -1:
                 self._async_bundle_index = -1
                 self.stop_parse()
+                return -1
             else:
                 return avalibe_bundle_index
         else:
             return -1
+
+    def _probe_auto_browser(self) -> int:
+        # probe the installed browser for the escalated urls of the html_auto mode, never prompt to install it in the middle of the crawl
+        with self._browser_probe_lock:
+            if self._async_bundle_index == _BROWSER_NOT_PROBED:
+                self._async_bundle_index = self.dynamicer._check_dynamic_async_env(install_missing=False)
+                if self._async_bundle_index < 0:
+                    logger.error('no preparser browser is installed, the urls failed the static_check will be failed, please install one by `python -m playwright install chromium` !!!')
+            return self._async_bundle_index
     
-    def _get_synamic_soup(self,url:str) -> BeautifulSoup | None:
+    def _get_dynamic_response(self,url:str) -> FetchedResponse | None:
+        if self._async_bundle_index == _BROWSER_NOT_PROBED:
+            self._probe_auto_browser()
+        if self._async_bundle_index >= 0:
+            with measure_phase('browser'):
+                html = self.dynamicer._get_dynamic_html(url,self._html_dynamic_scope)
+            if html:
+               return FetchedResponse(url,200,{'Content-Type':'text/html; charset=utf-8'},html.encode('utf-8'),'utf-8')
+        return None
+
+    async def _async_get_dynamic_response(self,url:str) -> FetchedResponse | None:
+        if self._async_bundle_index == _BROWSER_NOT_PROBED:
+            await asyncio.to_thread(self._probe_auto_browser)  # the playwright sync api can't run in the event loop
         if self._async_bundle_index >= 0:
-            html = self.dynamicer._get_dynamic_html(url,self._html_dynamic_scope)
+            with measure_phase('browser'):
+                html = await self.dynamicer._async_get_dynamic_html(url,self._html_dynamic_scope)
             if html:
-               return BeautifulSoup(html, 'html.parser')
+               return FetchedResponse(url,200,{'Content-Type':'text/html; charset=utf-8'},html.encode('utf-8'),'utf-8')
         return None
         
 
+    def _get_retry_wait_seconds(self,url:str,retry_times:int,respos:FetchedResponse | None = None,error:Exception | None = None) -> float | None:
+        # record the request result into the circuit breaker, and get the seconds to wait before next retry, None means no need to retry
+        failed = (error is not None) or respos.status_code >= 500 or respos.status_code == 429
+        if respos is not None:
+            self._record_throttled(respos.status_code)
+        if self.circuit_breaker:
+            if failed:
+                self.circuit_breaker.record_failure(url)
+            else:
+                self.circuit_breaker.record_success(url)
+        if (not failed) or (self.retry_policy is None):
+            return None
+        if error is not None:
+            if not self.retry_policy.is_retryable_error(error):
+                return None
+            retry_after = None
+            reason = f'error: {error}'
+        else:
+            if not self.retry_policy.is_retryable_status(respos.status_code):
+                return None
+            retry_after = Scheduler.parse_retry_after(respos.headers.get('Retry-After'))
+            reason = f'response_status_code: {respos.status_code}'
+        if retry_times >= self.retry_policy.max_retries:
+            logger.warning(f'the url:{url} still failed after {retry_times} retries, as the {reason}, skip it !!!')
+            mark_skipped('retries_exhausted')
+            return None
+        wait_seconds = self.retry_policy.get_backoff_seconds(retry_times + 1,retry_after)
+        logger.warning(f'retry({retry_times + 1}/{self.retry_policy.max_retries}) the url:{url} after {wait_seconds:.2f} seconds, as the {reason} !!!')
+        return wait_seconds
+
+    def _is_circuit_open(self,url:str) -> bool:
+        if self.circuit_breaker and not self.circuit_breaker.allow_request(url):
+            logger.warning(f'the circuit of the host of url:{url} is open, skip requesting it !!!')
+            mark_skipped('circuit_open')
+            return True
+        return False
+
+    def _get_cache_entry(self,url:str,headers:dict[str,str]) -> CacheEntry | None:
+        return self.cacher.get(url,headers) if self.cacher else None
+
+    def _get_conditional_headers(self,headers:dict[str,str],cache_entry:CacheEntry | None) -> dict[str,str]:
+        return {**headers,**cache_entry.get_validators()} if cache_entry else headers
+
+    def _update_cache(self,url:str,headers:dict[str,str],respos:FetchedResponse | None,cache_entry:CacheEntry | None) -> FetchedResponse | None:
+        if self.cacher and respos is not None:
+            return self.cacher.update(url,headers,respos,cache_entry)
+        return respos
+
+    def _fetch_response(self,url:str) -> FetchedResponse | None:
+        headers = self._create_request_headers(url)
+        cache_entry = self._get_cache_entry(url,headers)
+        if cache_entry and cache_entry.is_fresh():
+            return self.cacher.hit(cache_entry)
+        respos = self._request_response(url,self._get_conditional_headers(headers,cache_entry))
+        return self._update_cache(url,headers,respos,cache_entry)
+
+    async def _async_fetch_response(self,url:str) -> FetchedResponse | None:
+        headers = self._create_request_headers(url)
+        cache_entry = self._get_cache_entry(url,headers)
+        if cache_entry and cache_entry.is_fresh():
+            return self.cacher.hit(cache_entry)
+        respos = await self._async_request_response(url,self._get_conditional_headers(headers,cache_entry))
+        return self._update_cache(url,headers,respos,cache_entry)
+
+    def _request_response(self,url:str,headers:dict[str,str]) -> FetchedResponse | None:
+        retry_times = 0
+        while True:
+            if self._is_circuit_open(url):
+                return None
+            respos, error = None, None
+            try:
+                respos = self.sessioner.fetch(url, headers=headers,verify=self._request_ssl_verified)
+                if self.scheduler:
+                    self.scheduler.report(url,respos.status_code,respos.headers)
+            except Exception as err:
+                error = err
+            wait_seconds = self._get_retry_wait_seconds(url,retry_times,respos,error)
+            if wait_seconds is None:
+                if error is not None:
+                    raise error
+                return respos
+            retry_times += 1
+            sleep(wait_seconds)
+
+    async def _async_request_response(self,url:str,headers:dict[str,str]) -> FetchedResponse | None:
+        retry_times = 0
+        while True:
+            if self._is_circuit_open(url):
+                return None
+            respos, error = None, None
+            try:
+                respos = await self.async_sessioner.fetch(url, headers=headers,verify=self._request_ssl_verified)
+                if self.scheduler:
+                    self.scheduler.report(url,respos.status_code,respos.headers)
+            except Exception as err:
+                error = err
+            wait_seconds = self._get_retry_wait_seconds(url,retry_times,respos,error)
+            if wait_seconds is None:
+                if error is not None:
+                    raise error
+                return respos
+            retry_times += 1
+            await asyncio.sleep(wait_seconds)
+
+    def _is_empty_urls(self) -> bool:
+        # the iterators can't be checked without consuming them, so only the sized ones are checked
+        return isinstance(self.to_parse_urls,Sized) and len(self.to_parse_urls) == 0
+
+    def _get_to_parse_urls(self,resume:bool = False) -> Iterable[str]:
+        to_parse_urls = self.to_parse_urls if self.urler is None else self._iter_filtered_urls()
+        if self.journaler:
+            if resume:
+                to_parse_urls = self.journaler.filter_urls(to_parse_urls)
+            else:
+                self.journaler.reset()
+        return self._iter_taken_urls(to_parse_urls)
+
+    def _iter_taken_urls(self,to_parse_urls:Iterable[str]) -> Iterator[str]:
+        # record when the urls were taken, to measure their `queue_wait` phase
+        self._url_taken_at = {}
+        for url in to_parse_urls:
+            self._url_taken_at[url] = perf_counter()
+            yield url
+
+    def _pop_queue_wait(self,url:str) -> float | None:
+        taken_at = self._url_taken_at.pop(url,None)
+        return None if taken_at is None else perf_counter() - taken_at
+
+    def _flush_journal(self):
+        if self.journaler:
+            self.journaler.flush()
+
+    def _iter_filtered_urls(self) -> Iterator[str]:
+        # drop the duplicated urls lazily, so the urls are not loaded into memory at once
+        self.urler.reset()
+        yield from self.urler.filter_urls(self.to_parse_urls)
+        if self.urler.duplicated_numbers > 0:
+            logger.info(f'dropped {self.urler.duplicated_numbers} duplicated urls !!!')
+
+    def _iter_scheduled_urls(self,to_parse_urls:Iterable[str]):
+        # dispatch the urls one by one when their hosts are ready, for the parsing without threading,
+        # and only `max_in_flight` urls are waiting in the host queues of the scheduler
+        url_iterator = iter(to_parse_urls)
+        exhausted = False
+        while True:
+            while not exhausted and self.scheduler.pending_numbers < self.max_in_flight:
+                url = next(url_iterator,None)
+                if url is None:
+                    exhausted = True
+                    break
+                self.scheduler.add(url)
+            url, wait_seconds = self.scheduler.poll()
+            if url is not None:
+                yield url
+            elif wait_seconds is None:
+                if exhausted:
+                    break
+            else:
+                sleep(wait_seconds)
+
+    def _record_throttled(self,status_code:int):
+        # cut the concurrency at once when the server is throttling, without waiting for the url failed after the retries
+        if self.concurrency_limiter and status_code in (429,503):
+            self.concurrency_limiter.record_throttled()
+
+    def _record_circuit_result(self,url:str,status_code:int):
+        self._record_throttled(status_code)
+        if self.circuit_breaker:
+            if status_code >= 500 or status_code == 429:
+                self.circuit_breaker.record_failure(url)
+            else:
+                self.circuit_breaker.record_success(url)
+
+    def _hand_to_call_back(self,url:str,datas:Any) -> Any:
+        # hand the parsed datas to the callback outside the event loop
+        if self.request_call_back_func is None:
+            return datas
+        with measure_phase('callback'):
+            handled_result = self.request_call_back_func(url,datas)
+            if isawaitable(handled_result):
+                handled_result = asyncio.run(handled_result)
+        return self.response_parser.check_call_back_result(url,handled_result)
+
+    async def _async_hand_to_call_back(self,url:str,datas:Any) -> Any:
+        if self.request_call_back_func is None:
+            return datas
+        with measure_phase('callback'):
+            handled_result = self.request_call_back_func(url,datas)
+            if isawaitable(handled_result):
+                handled_result = await handled_result
+        return self.response_parser.check_call_back_result(url,handled_result)
+
+    def _extract_dynamic_datas(self,url:str) -> Any:
+        if self._async_bundle_index < 0:
+            return None
+        with measure_phase('browser'):
+            datas = self.dynamicer._get_dynamic_html(url,self._html_dynamic_scope,self._dynamic_extract_fields)
+        return None if datas is None else self._hand_to_call_back(url,datas)
+
+    async def _async_extract_dynamic_datas(self,url:str) -> Any:
+        if self._async_bundle_index < 0:
+            return None
+        with measure_phase('browser'):
+            datas = await self.dynamicer._async_get_dynamic_html(url,self._html_dynamic_scope,self._dynamic_extract_fields)
+        return None if datas is None else await self._async_hand_to_call_back(url,datas)
+
+    def _get_static_check_selector(self) -> str | None:
+        if callable(self.static_check):
+            return None
+        return self.static_check if self.static_check else (self._html_dynamic_scope[0] if self._html_dynamic_scope else None)
+
+    def _check_static_soup(self,url:str,soup:BeautifulSoup | Any | None) -> bool:
+        if soup is None:
+            return False
+        if callable(self.static_check):
+            return bool(self.static_check(url,soup))
+        return bool(self.souper.get_text(soup).strip())
+
+    def _check_static_response(self,url:str,respos:FetchedResponse) -> tuple[bool,BeautifulSoup | Any | None]:
+        # parse the static response and check it, return wheather need escalating to the browser and the parsed soup
+        selector = self._get_static_check_selector()
+        with measure_phase('parse'):
+            if selector:
+                # match the selecter on the whole page, as the html_scope nodes lost their parents, and then take the html_scope nodes from it
+                document = self.souper.parse(respos.text)
+                matched = self.souper.select_one(document,selector) is not None
+                soup = self.souper.select_scope(document,self.response_parser.html_scope) if matched else None
+            else:
+                soup = self.souper.parse(respos.text,self.response_parser.html_scope)
+        escalated = soup is None if selector else not self._check_static_soup(url,soup)
+        self.auto_moder.record(url,escalated)
+        if escalated:
+            logger.warning(f'the static html of url:{url} failed the static_check, load it with the browser !!!')
+        return escalated, soup
+
+    def _auto_parse_datas(self,url:str) -> Any:
+        if not self.auto_moder.prefer_dynamic(url):
+            respos = self._fetch_response(url)
+            if respos is None:
+                return None
+            if respos.status_code != 200:
+                return self.response_parser(url,respos)
+            escalated, soup = self._check_static_response(url,respos)
+            if not escalated:
+                return self._hand_to_call_back(url,soup)
+        respos = self._get_dynamic_response(url)
+        if respos is None:
+            self._log_failed_escalation(url)
+            return None
+        # the same html_scope as the static pages, so the callback gets the same shape of the soup
+        soup = self.response_parser.parse_response(url,respos)
+        return None if soup is None else self._hand_to_call_back(url,soup)
+
+    async def _async_auto_parse_datas(self,url:str) -> Any:
+        if not self.auto_moder.prefer_dynamic(url):
+            respos = await self._async_fetch_response(url)
+            if respos is None:
+                return None
+            if respos.status_code != 200:
+                return self.response_parser.parse_response(url,respos)
+            escalated, soup = self._check_static_response(url,respos)
+            if not escalated:
+                return await self._async_hand_to_call_back(url,soup)
+        respos = await self._async_get_dynamic_response(url)
+        if respos is None:
+            self._log_failed_escalation(url)
+            return None
+        soup = self.response_parser.parse_response(url,respos)
+        return None if soup is None else await self._async_hand_to_call_back(url,soup)
+
+    def _log_failed_escalation(self,url:str):
+        if self._async_bundle_index < 0:
+            logger.error(f'the url:{url} needs the browser in the html_auto mode, but no preparser browser is installed, skip it !!!')
+
+    def _handle_stream_item(self,url:str,item:Any) -> bool:
+        # hand a streamed json item to the callback, and return wheather the item was handled successfully
+        if self.request_call_back_func is None:
+            return True
+        return self._hand_to_call_back(url,item) is not None
+
+    def _stream_api_datas(self,url:str) -> int | None:
+        if self._is_circuit_open(url):
+            return None
+        handled_numbers = 0
+        with self.sessioner.stream(url,headers=self._create_request_headers(url),verify=self._request_ssl_verified) as (respos,reader):
+            if self.scheduler:
+                self.scheduler.report(url,respos.status_code,respos.headers)
+            self._record_circuit_result(url,respos.status_code)
+            if respos.status_code != 200:
+                logger.warning(f"something unknow happend when parsing the datas with the url:({url}), response_status_code:{respos.status_code},response:{respos}!!!")
+                return None
+            for item in iter_json_items(reader,self.api_stream_path):
+                handled_numbers += self._handle_stream_item(url,item)
+        return handled_numbers
+
+    async def _async_stream_api_datas(self,url:str) -> int | None:
+        if self._is_circuit_open(url):
+            return None
+        handled_numbers = 0
+        async with self.async_sessioner.stream(url,headers=self._create_request_headers(url),verify=self._request_ssl_verified) as (respos,reader):
+            if self.scheduler:
+                self.scheduler.report(url,respos.status,respos.headers)
+            self._record_circuit_result(url,respos.status)
+            if respos.status != 200:
+                logger.warning(f"something unknow happend when parsing the datas with the url:({url}), response_status_code:{respos.status},response:{respos}!!!")
+                return None
+            async for item in aiter_json_items(reader,self.api_stream_path):
+                if self.request_call_back_func is None:
+                    handled_numbers += 1
+                else:
+                    handled_numbers += await self._async_hand_to_call_back(url,item) is not None
+        return handled_numbers
+
+    def _parse_in_process(self,url:str,respos:FetchedResponse) -> Any:
+        with measure_phase('parse'):  # the parse and callback phases in the processes can't be told apart
+            return self._process_executor.submit(self.response_parser,url,respos).result()
+
+    def _remember_skipped_url(self,trace:UrlTrace):
+        # only the stopping checks need them, and they pop the urls, so the set won't keep growing
+        if trace.skipped_reason and not trace.succeeded and self.stop_when_task_failed:
+            self._skipped_urls.add(trace.url)
+
+    def _pop_skipped_url(self,url:str) -> bool:
+        # wheather the failed url was skipped for the transient failure of its host, which shouldn't stop the task
+        try:
+            self._skipped_urls.remove(url)
+        except KeyError:
+            return False
+        logger.warning(f'the url:{url} was skipped for the transient failure of its host, go on parsing the other urls !!!')
+        return True
+
+    def _should_stop(self,url:str,prepar_result:Any) -> bool:
+        if (not prepar_result) and self.stop_when_task_failed and not self._pop_skipped_url(url):
+            logger.warning(f'parsing task terminated as the get None data from url ({url})')
+            return True
+        return False
+
     def _pre_parse_datas(self, url: str) -> BeautifulSoup | Json_Data | Any:
-        print(f'Start the parse task from the url:{url} !!!')
+        with self.metricer.trace(url,self._pop_queue_wait(url)) as trace:
+            prepar_result = self._parse_datas(url)
+            trace.succeeded = bool(prepar_result)
+        self._remember_skipped_url(trace)
+        if self.journaler:
+            self.journaler.record(url,prepar_result)
+        return prepar_result
+
+    def _parse_datas(self, url: str) -> BeautifulSoup | Json_Data | Any:
+        logger.debug(f'Start the parse task from the url:{url} !!!')
+        if url is None or url.__len__() == 0:
+            logger.warning(f'invalid parse url: {url} !!!!')
+            return None
+        try:
+            if self.parser_mode not in ['html','api','html_dynamic','html_auto']:
+                logger.error(f'invalid parser_mode : {self.parser_mode}')
+                return None
+            if self.parser_mode == 'html_auto':
+                return self._auto_parse_datas(url)
+            if self.parser_mode == 'api' and self.api_stream_path:
+                return self._stream_api_datas(url)
+            if self.parser_mode == 'html_dynamic' and self._dynamic_extract_fields:
+                return self._extract_dynamic_datas(url)
+            respos = self._get_dynamic_response(url) if self.parser_mode == 'html_dynamic' else self._fetch_response(url)
+            if respos is None:
+                return None
+            if self._process_executor is not None:
+                return self._parse_in_process(url,respos)
+            return self.response_parser(url,respos)
+        except Exception as err:
+            logger.error(f'there were an error when parsing from url: {url}, error: {err} !!!')
+            return None
+        finally:
+            logger.debug(f'end the parse task from the url:{url} !!!')
+
+    async def _async_pre_parse_datas(self, url: str) -> BeautifulSoup | Json_Data | Any:
+        with self.metricer.trace(url,self._pop_queue_wait(url)) as trace:
+            prepar_result = await self._async_parse_datas(url)
+            trace.succeeded = bool(prepar_result)
+        self._remember_skipped_url(trace)
+        if self.journaler:
+            self.journaler.record(url,prepar_result)
+        return prepar_result
+
+    async def _async_parse_datas(self, url: str) -> BeautifulSoup | Json_Data | Any:
+        logger.debug(f'Start the async parse task from the url:{url} !!!')
         if url is None or url.__len__() == 0:
-            print(f'warning: invalid parse url: {url} !!!!')
+            logger.warning(f'invalid parse url: {url} !!!!')
             return None
         try:
-            to_pass_next_data = None
-            headers = self._create_request_headers(url)
+            if self.parser_mode not in ['html','api','html_dynamic','html_auto']:
+                logger.error(f'invalid parser_mode : {self.parser_mode}')
+                return None
+            if self.parser_mode == 'html_auto':
+                return await self._async_auto_parse_datas(url)
+            if self.parser_mode == 'api' and self.api_stream_path:
+                return await self._async_stream_api_datas(url)
+            if self.parser_mode == 'html_dynamic' and self._dynamic_extract_fields:
+                return await self._async_extract_dynamic_datas(url)
+            loop = asyncio.get_running_loop()
             if self.parser_mode == 'html_dynamic':
-                to_pass_next_data = self._get_synamic_soup(url)
-            else:
-                if self.parser_mode not in ['html','api']:
-                    print(f'invalid parser_mode : {self.parser_mode}')
-                    return None
-                else:
-                    respos = requests.get(url, headers=headers,verify=self._request_ssl_verified)
-                if respos.status_code == 200:
-                    if self.parser_mode == 'html':
-                        to_pass_next_data = BeautifulSoup(respos.text, 'html.parser')
-                    else:  # self.parser_mode == 'api'
-                        to_pass_next_data = respos.json() 
-                else:
-                    print(f"something unknow happend when parsing the datas with the url:({url}), response_status_code:{respos.status_code},response:{respos}!!!")
-                    return None 
-            if (self.request_call_back_func is not None ) and (to_pass_next_data is not None):
-                handled_result = self.request_call_back_func(url,to_pass_next_data)
-                if handled_result is None:
-                    # return to_pass_next_data
-                    print(f"warning: parsing by function({self.request_call_back_func})with url({url}) get None Result !!!")
-                return handled_result
+                # the browsers run in their own threads, just wait for the loaded html on the event loop
+                respos = await self._async_get_dynamic_response(url)
             else:
-                return to_pass_next_data
+                respos = await self._async_fetch_response(url)
+            if respos is None:
+                return None
+            if self._process_executor is not None:
+                with measure_phase('parse'):
+                    return await loop.run_in_executor(self._process_executor,self.response_parser,url,respos)
+            to_pass_next_data = self.response_parser.parse_response(url,respos)
+            if to_pass_next_data is not None:
+                return await self._async_hand_to_call_back(url,to_pass_next_data)
+            return None
         except Exception as err:
-            print(
-                f'there were an error when parsing from url: {url}, error: {err} !!!')
+            logger.error(f'there were an error when parsing from url: {url}, error: {err} !!!')
             return None
         finally:
-            print(f'end the parse task from the url:{url} !!!')
+            logger.debug(f'end the async parse task from the url:{url} !!!')
+
+    def _start_process_pool(self):
+        if self.parse_in_process and self._process_executor is None:
+            try:
+                pickle.dumps(self.response_parser)
+            except Exception as err:
+                logger.warning(f'the request_call_back_func can\'t be sent to the other processes, please define it at the module level, parse in the threads instead, error: {err} !!!')
+                return
+            self._process_executor = ProcessPoolExecutor(max_workers=self.process_numbers)
+
+    def _stop_process_pool(self,wait:bool = True):
+        if self._process_executor is not None:
+            self._process_executor.shutdown(wait=wait,cancel_futures=True)
+            self._process_executor = None
+
+    def _iter_sequential_results(self,to_parse_urls:Iterable[str]) -> Iterator[tuple[str,Any]]:
+        # parse the urls one by one in current thread
+        for url in (self._iter_scheduled_urls(to_parse_urls) if self.scheduler else to_parse_urls):
+            prepar_result = self._pre_parse_datas(url)
+            if self.scheduler:
+                self.scheduler.release(url)
+            yield url, prepar_result
+
+    @staticmethod
+    def _drive_async_iterator(async_iterator:AsyncIterator[Any]) -> Iterator[Any]:
+        # iterate the async iterator with a new event loop in current thread, the tasks are paused while the results are being handled
+        loop = asyncio.new_event_loop()
+        try:
+            while True:
+                try:
+                    yield loop.run_until_complete(async_iterator.__anext__())
+                except StopAsyncIteration:
+                    break
+        finally:
+            loop.run_until_complete(async_iterator.aclose())
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+    def iter_parse(self,ordered:bool = False,resume:bool = False) -> Iterator[tuple[str,Any]]:
+        """
+            start the parse task and yield the `(url, result)` of per url as soon as it was parsed, so the results can be handled one by one without waiting for all of the urls,
+            and they won't be kept in the `cached_request_datas` unless the `cached_data` is True.
+            for example: `for url, result in parser.iter_parse(): ...`, and the not started urls will be cancelled when you break the loop.
 
-    def start_parse(self)-> Json_Data:
-        print('start  parse data task !!!')
+            Parameters:
+                ordered (bool): wheather yield the results in the same order of the urls, default is False, which means yield them in the finished order.
+                                the ordered results may be held in memory until all of the results before them were parsed.
+                resume (bool): wheather skip the done urls in the journal of the `journal_path`, so only the failed and the not started urls will be parsed, default is False,
+                               which means a new run, and the journal will be cleared.
+        """
+        if self.start_threading and self.threading_mode == 'async':
+            yield from self._drive_async_iterator(self.aiter_parse(ordered,resume))
+            return
+        logger.info('start  iter parse data task !!!')
         self._stop_running = False
         self.cached_request_datas = {}
-        if self.to_parse_urls.__len__() == 0:
-            print(f"to parse urls can't be empty !!!")
-            return self.cached_request_datas
-        else:
+        self._skipped_urls.clear()
+        if self._is_empty_urls():
+            logger.warning("to parse urls can't be empty !!!")
+            return
+        self._start_process_pool()
+        try:
             if self.start_threading:
-                self.tasker.start_task()
-                self.cached_request_datas = self.tasker.task_result_dict
-                self._stop_running = True
+                self.tasker.task_params_list = self._get_to_parse_urls(resume)
+                results = self.tasker.iter_task(ordered)
             else:
-                for url in self.to_parse_urls:
-                    prepar_result = self._pre_parse_datas(url)
-                    if self.cached_data:
-                        self.cached_request_datas[url] = prepar_result
-                    if (not prepar_result) and self.stop_when_task_failed:
-                        print(f'parsing task terminated as the get None data from url ({url})')
-                        break
-                    if self._stop_running:
-                        break
-        print('ended parse data task !!!')
+                results = self._iter_sequential_results(self._get_to_parse_urls(resume))
+            for url, prepar_result in results:
+                if self.cached_data:
+                    self.cached_request_datas[url] = prepar_result
+                yield url, prepar_result
+                if self._should_stop(url,prepar_result):
+                    break
+                if self._stop_running:
+                    break
+        finally:
+            self._stop_process_pool()
+            self.dynamicer.close()
+            self._flush_journal()
+            self._stop_running = True
+        logger.info('ended iter parse data task !!!')
+
+    async def aiter_parse(self,ordered:bool = False,resume:bool = False) -> AsyncIterator[tuple[str,Any]]:
+        """
+            the async version of `iter_parse`, which runs the parse task on the running event loop just like the `start_parse_async`.
+            for example: `async for url, result in parser.aiter_parse(): ...`.
+        """
+        logger.info('start  async iter parse data task !!!')
+        self._stop_running = False
+        self.cached_request_datas = {}
+        self._skipped_urls.clear()
+        if self._is_empty_urls():
+            logger.warning("to parse urls can't be empty !!!")
+            return
+        self.async_tasker.task_params_list = self._get_to_parse_urls(resume)
+        self._start_process_pool()
+        results = self.async_tasker.iter_task(ordered)
+        try:
+            await self.async_sessioner.open()
+            async for url, prepar_result in results:
+                if self.cached_data:
+                    self.cached_request_datas[url] = prepar_result
+                yield url, prepar_result
+                if self._should_stop(url,prepar_result):
+                    break
+                if self._stop_running:
+                    break
+        finally:
+            await results.aclose()
+            await self.async_sessioner.close()
+            self._stop_process_pool()
+            self.dynamicer.close(wait=False)
+            self._flush_journal()
+            self._stop_running = True
+        logger.info('ended async iter parse data task !!!')
+
+    def start_parse(self,resume:bool = False)-> Json_Data:
+        """
+            start the parse task and return the `cached_request_datas`.
+
+            Parameters:
+                resume (bool): wheather skip the done urls in the journal of the `journal_path`, so only the failed and the not started urls will be parsed, default is False,
+                               which means a new run, and the journal will be cleared.
+        """
+        logger.info('start  parse data task !!!')
+        self._stop_running = False
+        self.cached_request_datas = {}
+        self._skipped_urls.clear()
+        if self._is_empty_urls():
+            logger.warning("to parse urls can't be empty !!!")
+            return self.cached_request_datas
+        else:
+            self._start_process_pool()
+            try:
+                if self.start_threading:
+                    if self.threading_mode == 'async':
+                        asyncio.run(self.start_parse_async(resume))
+                    else:
+                        self.tasker.task_params_list = self._get_to_parse_urls(resume)
+                        self.tasker.start_task()
+                        self.cached_request_datas = self.tasker.task_result_dict
+                    self._stop_running = True
+                else:
+                    for url, prepar_result in self._iter_sequential_results(self._get_to_parse_urls(resume)):
+                        if self.cached_data:
+                            self.cached_request_datas[url] = prepar_result
+                        if self._should_stop(url,prepar_result):
+                            break
+                        if self._stop_running:
+                            break
+            finally:
+                self._stop_process_pool()
+                self.dynamicer.close()
+                self._flush_journal()
+        logger.info('ended parse data task !!!')
+        return self.cached_request_datas
+
+    async def start_parse_async(self,resume:bool = False) -> Json_Data:
+        """
+            start the parse task on the running event loop, at most `threading_numbers` urls will be requested at the same time,
+            and the `request_call_back_func` can be a normal function or a coroutine function.
+            for example: `result = await parser.start_parse_async()`, and the `resume` is the same as the `start_parse`.
+        """
+        logger.info('start  async parse data task !!!')
+        self._stop_running = False
+        self.cached_request_datas = {}
+        self._skipped_urls.clear()
+        if self._is_empty_urls():
+            logger.warning("to parse urls can't be empty !!!")
+            return self.cached_request_datas
+        self.async_tasker.task_params_list = self._get_to_parse_urls(resume)
+        self._start_process_pool()
+        try:
+            await self.async_sessioner.open()
+            await self.async_tasker.start_task()
+        finally:
+            await self.async_sessioner.close()
+            self._stop_process_pool()
+            # the browsers are closed in the worker threads, so don't block the event loop
+            self.dynamicer.close(wait=False)
+            self._flush_journal()
+            self.cached_request_datas = self.async_tasker.task_result_dict
+            self._stop_running = True
+        logger.info('ended async parse data task !!!')
         return self.cached_request_datas
 
     def stop_parse(self):
         """
           stop current parse process 
         """
-        self.cached_request_datas = self.tasker.task_result_dict
         self._stop_running = True
+        self._stop_process_pool(wait=False)
+        self.dynamicer.close(wait=False)
+        self._flush_journal()
+        if self.threading_mode == 'async':
+            # called inside the running event loop, just cancel the not finished tasks
+            self.cached_request_datas = self.async_tasker.task_result_dict
+            self.async_tasker.terminal_task()
+            return
+        self.cached_request_datas = self.tasker.task_result_dict
+        self.sessioner.close()
         if self.start_threading:
             self.tasker.terminal_task()
             
@@ -0,0 +1,149 @@
+import logging
+import threading
+from time import monotonic
+from random import uniform
+from urllib.parse import urlparse
+from typing import Literal
+import requests
+
+logger = logging.getLogger(__name__)
+
+
+def _get_retryable_errors() -> tuple[type[BaseException], ...]:
+    retryable_errors = [
+        ConnectionError,    # includes the connection reset, refused and aborted errors
+        TimeoutError,       # includes the asyncio.TimeoutError
+        requests.exceptions.ConnectionError,
+        requests.exceptions.Timeout,
+        requests.exceptions.ChunkedEncodingError,
+    ]
+    try:
+        import aiohttp
+        retryable_errors += [aiohttp.ClientConnectionError, aiohttp.ClientPayloadError]
+    except ImportError:
+        pass
+    return tuple(retryable_errors)
+
+
+class RetryPolicy():
+    """
+        A slight retry policy to retry the transient errors (timeouts, connection resets, 5xx and 429) with the exponential backoff and jitter.
+
+        Parameters:
+            max_retries (int): the maximum retry times for per url, default is 3.
+            backoff_factor (float): the base seconds of the backoff, the n-th retry will wait `backoff_factor * 2 ** (n - 1)` seconds at most, default is 0.5.
+            backoff_max (float): the maximum seconds to wait before a retry, default is 30.
+            jitter (bool): wheather randomize the backoff seconds between 0 and the computed seconds (full jitter) to avoid all threads retrying at the same time, default is True.
+            retry_status_codes (tuple[int,...]): the response status codes to retry, default is `(429, 500, 502, 503, 504)`.
+            respect_retry_after (bool): wheather wait at least the seconds of the `Retry-After` header of the response, default is True.
+    """
+    def __init__(self,
+                 max_retries: int = 3,
+                 backoff_factor: float = 0.5,
+                 backoff_max: float = 30,
+                 jitter: bool = True,
+                 retry_status_codes: tuple[int, ...] = (429, 500, 502, 503, 504),
+                 respect_retry_after: bool = True
+                 ) -> None:
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+        self.retry_status_codes = retry_status_codes
+        self.respect_retry_after = respect_retry_after
+        self._retryable_errors = _get_retryable_errors()
+
+    def is_retryable_status(self, status_code: int) -> bool:
+        return status_code in self.retry_status_codes
+
+    def is_retryable_error(self, error: BaseException) -> bool:
+        return isinstance(error, self._retryable_errors)
+
+    def get_backoff_seconds(self, retry_times: int, retry_after: float | None = None) -> float:
+        """
+            get the seconds to wait before the `retry_times`-th retry (starts from 1).
+        """
+        backoff_seconds = min(self.backoff_max, self.backoff_factor * (2 ** (retry_times - 1)))
+        if self.jitter:
+            backoff_seconds = uniform(0, backoff_seconds)
+        if self.respect_retry_after and retry_after is not None:
+            backoff_seconds = max(backoff_seconds, retry_after)
+        return backoff_seconds
+
+
+class _Circuit():
+    def __init__(self) -> None:
+        self.state: Literal['closed', 'open', 'half_open'] = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+
+
+class CircuitBreaker():
+    """
+        A slight per-host circuit breaker, when a host failed `failure_threshold` times continuously, the circuit of the host will be opened,
+        and all of the requests to this host will be rejected directly, until `recovery_timeout` seconds later, one probe request will be let through,
+        if the probe succeeded, the circuit will be closed again, otherwise it keeps open for another `recovery_timeout` seconds.
+
+        Parameters:
+            failure_threshold (int): the continuous failure times to open the circuit of a host, default is 5.
+            recovery_timeout (float): the seconds to keep the circuit open before probing the host again, default is 30.
+    """
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30) -> None:
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._circuits: dict[str, _Circuit] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_host(url: str) -> str:
+        return urlparse(str(url)).netloc.lower()
+
+    def _get_circuit(self, url: str) -> _Circuit:
+        host = self.get_host(url)
+        circuit = self._circuits.get(host)
+        if circuit is None:
+            circuit = _Circuit()
+            self._circuits[host] = circuit
+        return circuit
+
+    def get_state(self, url: str) -> Literal['closed', 'open', 'half_open']:
+        """
+            get the circuit state of the host of the url.
+        """
+        with self._lock:
+            return self._get_circuit(url).state
+
+    def allow_request(self, url: str) -> bool:
+        """
+            check wheather the request to the host of the url can be sent.
+        """
+        with self._lock:
+            circuit = self._get_circuit(url)
+            if circuit.state == 'closed':
+                return True
+            if circuit.state == 'open' and monotonic() - circuit.opened_at >= self.recovery_timeout:
+                circuit.state = 'half_open'
+                circuit.probing = False
+            if circuit.state == 'half_open' and not circuit.probing:
+                circuit.probing = True  # only let one probe request through
+                return True
+            return False
+
+    def record_success(self, url: str):
+        with self._lock:
+            circuit = self._get_circuit(url)
+            circuit.state = 'closed'
+            circuit.failures = 0
+            circuit.probing = False
+
+    def record_failure(self, url: str):
+        with self._lock:
+            circuit = self._get_circuit(url)
+            circuit.failures += 1
+            circuit.probing = False
+            if circuit.state == 'half_open' or circuit.failures >= self.failure_threshold:
+                if circuit.state != 'open':
+                    logger.warning(f'host {self.get_host(url)} failed {circuit.failures} times, open its circuit for {self.recovery_timeout} seconds !!!')
+                circuit.state = 'open'
+                circuit.opened_at = monotonic()
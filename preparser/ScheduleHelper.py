@@ -0,0 +1,344 @@
+import logging
+import threading
+from time import monotonic
+from collections import deque
+from typing import Any
+from urllib.parse import urlparse
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket():
+    """
+        A slight token bucket to limit the requesting rate.
+
+        Parameters:
+            rate (float): the number of tokens refilled per second.
+            capacity (float): the maximum number of tokens kept in the bucket, which means the max burst requests, default is 1.
+    """
+    def __init__(self, rate: float, capacity: float = 1) -> None:
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+        self.tokens = self.capacity
+        self._last_time = monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self._last_time) * self.rate)
+        self._last_time = now
+
+    def get_wait_seconds(self, now: float) -> float:
+        """
+            get the seconds to wait until there is a token available, 0 means can consume a token right now.
+        """
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self):
+        self.tokens -= 1
+
+
+class _HostState():
+    def __init__(self, bucket: TokenBucket | None) -> None:
+        self.bucket = bucket
+        self.queue: deque[Any] = deque()
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self.throttled_times = 0
+
+
+class Scheduler():
+    """
+        A slight per-host politeness scheduler, which keeps one queue for per host, and only hands out the urls whose host
+        is ready to be requested, so the slow or throttled hosts won't stall the worker pool for the fast ones.
+
+        Parameters:
+            requests_per_second (float | None): the maximum requests per second for per host, default is None, which means no limit.
+            max_concurrent_per_host (int | None): the maximum number of the in-flight requests for per host, default is None, which means no limit.
+            burst (int): the maximum number of requests can be sent at once to per host when it was idle, default is 1.
+            host_requests_per_second (dict[str,float] | None): the specified requests per second for the specified hosts, for example `{'example.com': 0.5}`.
+            default_retry_after (float): the seconds to pause a host when it responded `429` without the `Retry-After` header, default is 1, and it will be doubled when the host keeps throttling.
+            max_retry_after (float): the maximum seconds to pause a host, default is 300.
+            poll_interval (float): the seconds to wait for rechecking a host which reached the `max_concurrent_per_host`, only used by the blocking `acquire`, default is 0.05.
+    """
+    def __init__(self,
+                 requests_per_second: float | None = None,
+                 max_concurrent_per_host: int | None = None,
+                 burst: int = 1,
+                 host_requests_per_second: dict[str, float] | None = None,
+                 default_retry_after: float = 1,
+                 max_retry_after: float = 300,
+                 poll_interval: float = 0.05
+                 ) -> None:
+        self.requests_per_second = requests_per_second
+        self.max_concurrent_per_host = max_concurrent_per_host
+        self.burst = burst
+        self.host_requests_per_second = host_requests_per_second if host_requests_per_second else {}
+        self.default_retry_after = default_retry_after
+        self.max_retry_after = max_retry_after
+        self.poll_interval = poll_interval
+        self._hosts: dict[str, _HostState] = {}
+        self._host_order: deque[str] = deque()
+        self._condition = threading.Condition()
+        self._pending_numbers = 0
+
+    @staticmethod
+    def get_host(url: str) -> str:
+        return urlparse(str(url)).netloc.lower()
+
+    def _get_state(self, host: str) -> _HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            rate = self.host_requests_per_second.get(host, self.requests_per_second)
+            state = _HostState(TokenBucket(rate, self.burst) if rate else None)
+            self._hosts[host] = state
+            self._host_order.append(host)
+        return state
+
+    def _get_wait_seconds(self, state: _HostState, now: float) -> float | None:
+        # None means need waiting for a in-flight request to be released
+        if self.max_concurrent_per_host and state.in_flight >= self.max_concurrent_per_host:
+            return None
+        if state.blocked_until > now:
+            return state.blocked_until - now
+        if state.bucket:
+            return state.bucket.get_wait_seconds(now)
+        return 0
+
+    def _take(self, state: _HostState):
+        state.in_flight += 1
+        if state.bucket:
+            state.bucket.consume()
+
+    @property
+    def pending_numbers(self) -> int:
+        """
+            the number of the urls which are still waiting in the host queues.
+        """
+        return self._pending_numbers
+
+    def add(self, url: Any):
+        """
+            put an url into the queue of its host.
+        """
+        with self._condition:
+            self._get_state(self.get_host(url)).queue.append(url)
+            self._pending_numbers += 1
+            self._condition.notify_all()
+
+    def extend(self, url_list: list[Any]):
+        """
+            put the urls into the queues of their hosts.
+        """
+        for url in url_list:
+            self.add(url)
+
+    def poll(self) -> tuple[Any | None, float | None]:
+        """
+            get the next url whose host is ready to be requested, and the url will be counted as in-flight until it's `release`.
+
+            Returns:
+                tuple[Any | None, float | None]: the next ready url and 0, or None and the seconds to wait for next ready host,
+                                                 if the waiting seconds is None, it means no urls are pending or all of the pending hosts
+                                                 are waiting for their in-flight requests finished.
+        """
+        with self._condition:
+            now = monotonic()
+            min_wait_seconds = None
+            for _ in range(len(self._host_order)):
+                host = self._host_order[0]
+                self._host_order.rotate(-1)  # round robin among the hosts
+                state = self._hosts[host]
+                if not state.queue:
+                    continue
+                wait_seconds = self._get_wait_seconds(state, now)
+                if wait_seconds == 0:
+                    self._take(state)
+                    self._pending_numbers -= 1
+                    return state.queue.popleft(), 0
+                if wait_seconds is not None and (min_wait_seconds is None or wait_seconds < min_wait_seconds):
+                    min_wait_seconds = wait_seconds
+            return None, min_wait_seconds
+
+    def try_acquire(self, url: Any) -> float:
+        """
+            try to take a requesting slot for the url which was not put into the queues.
+
+            Returns:
+                float: 0 means the slot was taken, otherwise the seconds to wait before trying again.
+        """
+        with self._condition:
+            state = self._get_state(self.get_host(url))
+            wait_seconds = self._get_wait_seconds(state, monotonic())
+            if wait_seconds == 0:
+                self._take(state)
+                return 0
+            return self.poll_interval if wait_seconds is None else wait_seconds
+
+    def acquire(self, url: Any):
+        """
+            block current thread until the host of the url is ready, and take a requesting slot for it.
+        """
+        with self._condition:
+            while True:
+                wait_seconds = self.try_acquire(url)
+                if wait_seconds == 0:
+                    return
+                self._condition.wait(wait_seconds)
+
+    def release(self, url: Any):
+        """
+            release the requesting slot of the url when its request finished.
+        """
+        with self._condition:
+            state = self._hosts.get(self.get_host(url))
+            if state and state.in_flight > 0:
+                state.in_flight -= 1
+            self._condition.notify_all()
+
+    def report(self, url: Any, status_code: int, headers: dict[str, str] | None = None):
+        """
+            report the response status of the url, when the host responded `429` or `503` with the `Retry-After` header,
+            the host will be paused until the retry time.
+        """
+        retry_after = self.parse_retry_after(headers.get('Retry-After') if headers else None)
+        with self._condition:
+            state = self._get_state(self.get_host(url))
+            if status_code == 429 or (status_code == 503 and retry_after is not None):
+                state.throttled_times += 1
+                if retry_after is None:
+                    retry_after = self.default_retry_after * (2 ** (state.throttled_times - 1))
+                pause_seconds = min(retry_after, self.max_retry_after)
+                state.blocked_until = max(state.blocked_until, monotonic() + pause_seconds)
+                logger.warning(f'host {self.get_host(url)} throttled the requests, pause it for {pause_seconds:.2f} seconds !!!')
+            elif 200 <= status_code < 400:
+                state.throttled_times = 0
+            self._condition.notify_all()
+
+    @staticmethod
+    def parse_retry_after(retry_after: str | None) -> float | None:
+        """
+            parse the value of the `Retry-After` header, which can be seconds or a http date, into seconds.
+        """
+        if not retry_after:
+            return None
+        retry_after = retry_after.strip()
+        try:
+            return max(float(retry_after), 0)
+        except ValueError:
+            pass
+        try:
+            retry_date = parsedate_to_datetime(retry_after)
+            if retry_date.tzinfo is None:
+                retry_date = retry_date.replace(tzinfo=timezone.utc)
+            return max((retry_date - datetime.now(timezone.utc)).total_seconds(), 0)
+        except (TypeError, ValueError):
+            return None
+
+
+class ConcurrencyLimiter():
+    """
+        A slight adaptive concurrency limiter in the AIMD way (just like the TCP congestion control), which raises the limit by 1 after a whole limit of tasks succeeded,
+        and cuts it by the `backoff_ratio` when a task failed, the server throttled the requests (`429` / `503`), or the latency went much higher than the baseline,
+        so the number of the running tasks follows what the target sites can take within `[min_limit, max_limit]`.
+        it starts from the `initial_limit` and doubles the limit for per round (the slow start) until the first cut.
+
+        Parameters:
+            max_limit (int): the maximum number of the running tasks.
+            min_limit (int): the minimum number of the running tasks, default is 1.
+            initial_limit (int | None): the number of the running tasks at the beginning, default is None, which means the `min_limit`.
+            backoff_ratio (float): the ratio to cut the limit, default is 0.7.
+            latency_tolerance (float | None): cut the limit when the average latency is larger than this times of the baseline (the lowest average latency), default is 2, None means ignore the latency.
+
+        Attributes:
+            current_limit (int): the current number of the running tasks allowed.
+            decreases (int): the times that the limit was cut.
+    """
+    def __init__(self,
+                 max_limit: int,
+                 min_limit: int = 1,
+                 initial_limit: int | None = None,
+                 backoff_ratio: float = 0.7,
+                 latency_tolerance: float | None = 2
+                 ) -> None:
+        self.min_limit = max(min_limit, 1)
+        self.max_limit = max(max_limit, self.min_limit)
+        self.backoff_ratio = backoff_ratio
+        self.latency_tolerance = latency_tolerance
+        self.decreases = 0
+        self.failures = 0
+        self.throttles = 0
+        self._limit = float(min(max(initial_limit if initial_limit else self.min_limit, self.min_limit), self.max_limit))
+        self._slow_start = True
+        self._latency: float | None = None  # the moving average of the latency
+        self._baseline: float | None = None
+        self._finished_since_decrease = 0
+        self._lock = threading.Lock()
+
+    @property
+    def current_limit(self) -> int:
+        return int(self._limit)
+
+    def _decrease(self):
+        # cut at most once for per round, so a burst of the failures of the same round won't collapse the limit
+        if self._finished_since_decrease < self.current_limit:
+            return
+        self._limit = max(self._limit * self.backoff_ratio, self.min_limit)
+        self._slow_start = False
+        self._finished_since_decrease = 0
+        self.decreases += 1
+
+    def _increase(self):
+        step = 1 if self._slow_start else 1 / self._limit
+        self._limit = min(self._limit + step, self.max_limit)
+
+    def _is_congested(self, latency: float) -> bool:
+        self._latency = latency if self._latency is None else self._latency * 0.8 + latency * 0.2
+        if self._baseline is None or self._latency < self._baseline:
+            self._baseline = self._latency
+        else:
+            self._baseline += (self._latency - self._baseline) * 0.01  # follow the slow changes of the sites
+        return self.latency_tolerance is not None and self._latency > self._baseline * self.latency_tolerance
+
+    def record(self, latency: float, failed: bool = False):
+        """
+            record the latency seconds and the result of a finished task.
+        """
+        with self._lock:
+            self._finished_since_decrease += 1
+            congested = self._is_congested(latency)
+            if failed:
+                self.failures += 1
+                self._decrease()
+            elif congested:
+                self._decrease()
+            else:
+                self._increase()
+
+    def record_throttled(self):
+        """
+            record that the server throttled a request, like responded `429` or `503`.
+        """
+        with self._lock:
+            self.throttles += 1
+            self._decrease()
+
+    @property
+    def stats(self) -> dict[str, int | float | None]:
+        """
+            the current limit and the counters of the limiter.
+        """
+        with self._lock:
+            return {
+                'current_limit': self.current_limit,
+                'min_limit': self.min_limit,
+                'max_limit': self.max_limit,
+                'latency': self._latency,
+                'baseline_latency': self._baseline,
+                'decreases': self.decreases,
+                'failures': self.failures,
+                'throttles': self.throttles,
+            }
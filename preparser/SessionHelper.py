@@ -0,0 +1,405 @@
+import threading
+import requests
+from time import perf_counter
+from json import loads
+from typing import Any, AsyncIterator, Iterator
+from contextlib import contextmanager, asynccontextmanager
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.compat import chardet
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from .MetricHelper import record_phase, record_response
+
+Request_Timeout = float | tuple[float,float] | None
+
+# the content types which can't be parsed by preparser
+BINARY_CONTENT_TYPES = ('image/','audio/','video/','font/','application/octet-stream','application/pdf','application/zip',
+                        'application/gzip','application/x-tar','application/x-7z-compressed','application/vnd.')
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class ResponseAbortedError(Exception):
+    """
+        raised when the response was aborted before the download finished, as its content type is not allowed or its body is too large.
+    """
+
+
+class ResponseChecker():
+    """
+        A slight checker to check the response headers and body size while streaming the response, so the binary or huge response can be aborted early.
+
+        Parameters:
+            max_body_size (int | None): the maximum bytes of the response body, default is None, which means no limit.
+            allowed_content_types (list[str] | None): the allowed prefixes of the response content type, for example `['text/html', 'application/json']`,
+                                                      default is None, which means all of the content types except the binary ones (images, videos, archives and so on) are allowed.
+    """
+    def __init__(self,max_body_size:int | None = None,allowed_content_types:list[str] | None = None) -> None:
+        self.max_body_size = max_body_size
+        self.allowed_content_types = [content_type.lower() for content_type in allowed_content_types] if allowed_content_types else None
+
+    def check_headers(self,url:str,status_code:int,headers:dict[str,str]):
+        """
+            check the response headers before downloading the body, raise `ResponseAbortedError` if the response should be aborted.
+        """
+        if not (200 <= status_code < 300):
+            return
+        content_type = headers.get('Content-Type','').lower().strip()
+        if content_type:
+            if self.allowed_content_types is not None:
+                if not content_type.startswith(tuple(self.allowed_content_types)):
+                    raise ResponseAbortedError(f'the content type {content_type} of url:{url} is not allowed')
+            elif content_type.startswith(BINARY_CONTENT_TYPES):
+                raise ResponseAbortedError(f'the content type {content_type} of url:{url} is binary')
+        content_length = headers.get('Content-Length')
+        if self.max_body_size is not None and content_length and content_length.isdigit() and int(content_length) > self.max_body_size:
+            raise ResponseAbortedError(f'the body size {content_length} of url:{url} is larger than {self.max_body_size}')
+
+    def check_size(self,url:str,body_size:int):
+        """
+            check the downloaded body size, raise `ResponseAbortedError` if it's larger than the `max_body_size`.
+        """
+        if self.max_body_size is not None and body_size > self.max_body_size:
+            raise ResponseAbortedError(f'the body size of url:{url} is larger than {self.max_body_size}')
+
+
+class StreamReader():
+    """
+        A slight file-like reader of the streamed response body, which checks the body size while reading, so the body can be parsed incrementally.
+
+        Parameters:
+            url (str): the requested url.
+            chunks (Iterator[bytes]): the chunks of the response body.
+            response_checker (ResponseChecker | None): to check the body size while reading, default is None.
+    """
+    def __init__(self,url:str,chunks:Iterator[bytes],response_checker:ResponseChecker | None = None) -> None:
+        self.url = url
+        self._chunks = chunks
+        self._response_checker = response_checker
+        self.body_size = 0
+
+    def read(self,size:int = -1) -> bytes:
+        # return one chunk each time, the `size` is just a hint, empty bytes means the body was finished
+        if size == 0:
+            return b''
+        chunk = next(self._chunks,b'')
+        self.body_size += len(chunk)
+        if self._response_checker:
+            self._response_checker.check_size(self.url,self.body_size)
+        return chunk
+
+
+class AsyncStreamReader():
+    """
+        A slight async file-like reader of the streamed `aiohttp` response body, which checks the body size while reading.
+
+        Parameters:
+            url (str): the requested url.
+            respos (aiohttp.ClientResponse): the streamed response.
+            response_checker (ResponseChecker | None): to check the body size while reading, default is None.
+    """
+    def __init__(self,url:str,respos:Any,response_checker:ResponseChecker | None = None) -> None:
+        self.url = url
+        self._respos = respos
+        self._response_checker = response_checker
+        self.body_size = 0
+
+    async def read(self,size:int = -1) -> bytes:
+        if size == 0:
+            return b''
+        chunk = await self._respos.content.read(size if size > 0 else STREAM_CHUNK_SIZE)
+        self.body_size += len(chunk)
+        if self._response_checker:
+            self._response_checker.check_size(self.url,self.body_size)
+        return chunk
+
+
+class FetchedResponse():
+    """
+        A slight response object which holds the fetched datas from an url, so the responses from `requests`, `aiohttp`
+        or other fetching engines can be parsed by the same way.
+
+        Parameters:
+            url (str): the requested url.
+            status_code (int): the response status code.
+            headers (dict[str,str]): the response headers.
+            content (bytes): the response body.
+            encoding (str | None): the response body encoding, default is None, which means `utf-8`.
+    """
+    def __init__(self,url:str,status_code:int,headers:dict[str,str],content:bytes,encoding:str | None = None) -> None:
+        self.url = url
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.content = content
+        self.encoding = encoding
+
+    @property
+    def text(self) -> str:
+        try:
+            return self.content.decode(self.encoding or 'utf-8', errors='replace')
+        except LookupError:  # unknown encoding
+            return self.content.decode('utf-8', errors='replace')
+
+    def json(self) -> Any:
+        return loads(self.text)
+
+    def __repr__(self) -> str:
+        return f'<FetchedResponse [{self.status_code}]>'
+
+    @classmethod
+    def from_requests(cls,respos:requests.Response,content:bytes | None = None) -> 'FetchedResponse':
+        if content is None:
+            return cls(respos.url,respos.status_code,dict(respos.headers),respos.content,respos.encoding or respos.apparent_encoding)
+        # the streamed response, its content was consumed already
+        encoding = respos.encoding or (chardet.detect(content)['encoding'] if content else None)
+        return cls(respos.url,respos.status_code,dict(respos.headers),content,encoding)
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        started = perf_counter()
+        try:
+            super().connect()
+        finally:
+            record_phase('connect',perf_counter() - started)
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        started = perf_counter()
+        try:
+            super().connect()  # including the TLS handshake
+        finally:
+            record_phase('connect',perf_counter() - started)
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedHTTPAdapter(HTTPAdapter):
+    # the adapter whose new connections record the `connect` phase of the running url
+    def init_poolmanager(self,*args,**kwargs):
+        super().init_poolmanager(*args,**kwargs)
+        self.poolmanager.pool_classes_by_scheme = {'http': _TimedHTTPConnectionPool, 'https': _TimedHTTPSConnectionPool}
+
+
+class Sessioner():
+    """
+        A slight pooled session object, which keeps one `requests.Session` for per worker thread,
+        and all of the sessions share the same keep-alive connection pools, so the `Tasker` threads
+        can reuse the opened TCP and TLS connections to the same host instead of handshaking for every url.
+
+        Parameters:
+            pool_connections (int): the number of the hosts connection pools to cache, default is 10.
+            pool_maxsize (int): the maximum number of the connections to keep alive for per host, default is 10.
+            host_pool_sizes (dict[str,int] | None): the specified maximum number of the keep-alive connections for the specified hosts,
+                                                    for example: `{'example.com': 20, 'api.example.com:8080': 5}`, default is None,
+                                                    which means all of hosts use the `pool_maxsize`.
+            timeout (float | tuple[float,float] | None): the seconds of the connect and read timeout, or a tuple of `(connect timeout, read timeout)`, default is None, which means no timeout.
+            response_checker (ResponseChecker | None): to check the content type and body size while streaming the response body, default is None, which means no check.
+    """
+    def __init__(self,
+                 pool_connections:int = 10,
+                 pool_maxsize:int = 10,
+                 host_pool_sizes:dict[str,int] | None = None,
+                 timeout:Request_Timeout = None,
+                 response_checker:ResponseChecker | None = None
+                ) -> None:
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.host_pool_sizes = host_pool_sizes if host_pool_sizes else {}
+        self.timeout = timeout
+        self.response_checker = response_checker
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._sessions:list[requests.Session] = []
+        self._adapters:dict[str,HTTPAdapter] = {}
+        self._create_adapters()
+
+    def _create_adapters(self):
+        # the adapters (urllib3 pool managers) are thread safe, so they can be shared by all of the threads sessions
+        self._adapters = {
+            'http://': _TimedHTTPAdapter(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize),
+            'https://': _TimedHTTPAdapter(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize)
+        }
+        for host,pool_size in self.host_pool_sizes.items():
+            host_adapter = _TimedHTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            self._adapters[f'http://{host}/'] = host_adapter
+            self._adapters[f'https://{host}/'] = host_adapter
+
+    def get_session(self) -> requests.Session:
+        """
+            get the `requests.Session` of current thread, if not existed, will create a new one which mounted the shared connection pools.
+        """
+        session = getattr(self._local,'session',None)
+        if session is None:
+            session = requests.Session()
+            for prefix,adapter in self._adapters.items():
+                session.mount(prefix,adapter)
+            self._local.session = session
+            with self._lock:
+                self._sessions.append(session)
+        return session
+
+    def get(self,url:str,**kwargs) -> requests.Response:
+        """
+            send a `GET` request with the session of current thread, the parameters are the same as `requests.get`.
+        """
+        return self.get_session().get(url,**kwargs)
+
+    def fetch(self,url:str,**kwargs) -> FetchedResponse:
+        """
+            send a `GET` request with the session of current thread and stream the body into the `FetchedResponse`, the parameters are the same as `requests.get`.
+            if the response was not allowed by the `response_checker`, the download will be aborted and raise `ResponseAbortedError`.
+        """
+        kwargs.setdefault('timeout',self.timeout)
+        started = perf_counter()
+        with self.get(url,stream=True,**kwargs) as respos:
+            downloaded_at = perf_counter()
+            record_phase('ttfb',downloaded_at - started)
+            chunks = []
+            body_size = 0
+            try:
+                if self.response_checker:
+                    self.response_checker.check_headers(url,respos.status_code,respos.headers)
+                for chunk in respos.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                    body_size += len(chunk)
+                    if self.response_checker:
+                        self.response_checker.check_size(url,body_size)
+                    chunks.append(chunk)
+            finally:
+                record_phase('download',perf_counter() - downloaded_at)
+                record_response(respos.status_code,body_size)
+            return FetchedResponse.from_requests(respos,b''.join(chunks))
+
+    @contextmanager
+    def stream(self,url:str,**kwargs) -> Iterator[tuple[requests.Response,StreamReader]]:
+        """
+            send a `GET` request with the session of current thread, and get the response with a `StreamReader` of its body, which should be used in the `with` statement.
+            for example: `with sessioner.stream(url) as (respos, reader): ...`.
+        """
+        kwargs.setdefault('timeout',self.timeout)
+        started = perf_counter()
+        with self.get(url,stream=True,**kwargs) as respos:
+            record_phase('ttfb',perf_counter() - started)
+            record_response(respos.status_code)
+            if self.response_checker:
+                self.response_checker.check_headers(url,respos.status_code,respos.headers)
+            yield respos, StreamReader(url,respos.iter_content(chunk_size=STREAM_CHUNK_SIZE),self.response_checker)
+
+    def close(self):
+        """
+            close all of the threads sessions and their keep-alive connections.
+        """
+        with self._lock:
+            for session in self._sessions:
+                # the mounted adapters are shared, so here only clear the session itself
+                session.adapters.clear()
+                session.close()
+            self._sessions = []
+            for adapter in set(self._adapters.values()):
+                adapter.close()
+            self._local = threading.local()
+            self._create_adapters()
+
+
+class AsyncSessioner():
+    """
+        A slight pooled `aiohttp` session object to fetch the datas from urls on the event loop, 
+        which need the optional package `aiohttp` installed (`pip install aiohttp`).
+
+        Parameters:
+            max_connections (int): the maximum number of the opened connections, default is 100, 0 means no limit.
+            max_connections_per_host (int): the maximum number of the opened connections for per host, default is 0, which means no limit.
+            timeout (float | tuple[float,float] | None): the seconds of the connect and read timeout, or a tuple of `(connect timeout, read timeout)`, default is None, which means no timeout.
+            response_checker (ResponseChecker | None): to check the content type and body size while streaming the response body, default is None, which means no check.
+    """
+    def __init__(self,max_connections:int = 100,max_connections_per_host:int = 0,timeout:Request_Timeout = None,response_checker:ResponseChecker | None = None) -> None:
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.timeout = timeout
+        self.response_checker = response_checker
+        self._session = None
+
+    async def open(self):
+        """
+            open the `aiohttp.ClientSession`, it should be called inside the running event loop.
+        """
+        try:
+            import aiohttp
+        except ImportError as error:
+            raise ImportError("the async mode of preparser need the package `aiohttp`, please install it by `pip install aiohttp` !!!") from error
+        if self._session is None or self._session.closed:
+            connect_timeout, read_timeout = self.timeout if isinstance(self.timeout,tuple) else (self.timeout,self.timeout)
+            connector = aiohttp.TCPConnector(limit=self.max_connections,limit_per_host=self.max_connections_per_host)
+            self._session = aiohttp.ClientSession(connector=connector,timeout=aiohttp.ClientTimeout(total=None,sock_connect=connect_timeout,sock_read=read_timeout),
+                                                  trace_configs=[self._create_trace_config(aiohttp)])
+
+    @staticmethod
+    def _create_trace_config(aiohttp:Any) -> Any:
+        # record the `connect` phase of the running url when a new connection was opened
+        async def on_connection_create_start(session,context,params):
+            context.connect_started = perf_counter()
+
+        async def on_connection_create_end(session,context,params):
+            record_phase('connect',perf_counter() - context.connect_started)
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_create_start.append(on_connection_create_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        return trace_config
+
+    async def fetch(self,url:str,headers:dict[str,str] | None = None,verify:bool = True) -> FetchedResponse:
+        """
+            send a `GET` request on the event loop and stream the body into the `FetchedResponse`,
+            if the response was not allowed by the `response_checker`, the download will be aborted and raise `ResponseAbortedError`.
+        """
+        await self.open()
+        started = perf_counter()
+        async with self._session.get(url,headers=headers,ssl=verify) as respos:
+            downloaded_at = perf_counter()
+            record_phase('ttfb',downloaded_at - started)
+            chunks = []
+            body_size = 0
+            try:
+                if self.response_checker:
+                    self.response_checker.check_headers(url,respos.status,respos.headers)
+                async for chunk in respos.content.iter_chunked(STREAM_CHUNK_SIZE):
+                    body_size += len(chunk)
+                    if self.response_checker:
+                        self.response_checker.check_size(url,body_size)
+                    chunks.append(chunk)
+            finally:
+                record_phase('download',perf_counter() - downloaded_at)
+                record_response(respos.status,body_size)
+            content = b''.join(chunks)
+            encoding = respos.charset or (chardet.detect(content)['encoding'] if content else None)
+            return FetchedResponse(str(respos.url),respos.status,dict(respos.headers),content,encoding)
+
+    @asynccontextmanager
+    async def stream(self,url:str,headers:dict[str,str] | None = None,verify:bool = True) -> AsyncIterator[tuple[Any,AsyncStreamReader]]:
+        """
+            send a `GET` request on the event loop, and get the `aiohttp` response with an `AsyncStreamReader` of its body, which should be used in the `async with` statement.
+        """
+        await self.open()
+        started = perf_counter()
+        async with self._session.get(url,headers=headers,ssl=verify) as respos:
+            record_phase('ttfb',perf_counter() - started)
+            record_response(respos.status)
+            if self.response_checker:
+                self.response_checker.check_headers(url,respos.status,respos.headers)
+            yield respos, AsyncStreamReader(url,respos,self.response_checker)
+
+    async def close(self):
+        """
+            close the `aiohttp.ClientSession` and all of its connections.
+        """
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
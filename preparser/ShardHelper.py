@@ -0,0 +1,394 @@
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import multiprocessing
+from abc import ABC, abstractmethod
+from multiprocessing.connection import wait
+from time import time, sleep
+from json import dumps, loads
+from typing import Any, Iterable, Iterator
+from .UrlHelper import Urler
+
+logger = logging.getLogger(__name__)
+
+
+class WorkQueue(ABC):
+    """
+        The interface of the shared work queue of the sharded crawling, the urls are leased to the workers and acked when they finished,
+        and the urls whose lease expired (like the worker crashed) will be leased to the other workers again.
+        implement all of the abstract methods (for example with Redis) to share the work queue between several machines, and the object must be picklable to be sent to the worker processes.
+    """
+    @abstractmethod
+    def put(self, url_list: Iterable[str]) -> int:
+        """
+            add the urls into the queue, and return the number of the added urls, the urls already in the queue are ignored.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def lease(self, worker_id: str, numbers: int, lease_seconds: float) -> list[str]:
+        """
+            lease at most `numbers` urls to the worker for `lease_seconds` seconds.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def ack(self, worker_id: str, results: list[tuple[str, Any]]):
+        """
+            ack the `(url, result)` of the leased urls, the url is done if the result is not empty, otherwise it will be leased again until the max attempts.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def is_finished(self) -> bool:
+        """
+            check wheather all of the urls in the queue were done or failed.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def iter_results(self) -> Iterator[tuple[str, Any]]:
+        """
+            yield the `(url, result)` of the done urls.
+        """
+        raise NotImplementedError
+
+    @property
+    @abstractmethod
+    def stats(self) -> dict[str, int]:
+        """
+            the numbers of the urls in per status: `pending`, `leased`, `done` and `failed`.
+        """
+        raise NotImplementedError
+
+    def release(self, worker_id: str) -> int:
+        """
+            give back the leased urls of the worker (like it crashed) at once instead of waiting for the lease expired, and return the number of the released urls.
+            the default does nothing, so the urls will only be leased again after their lease expired.
+        """
+        return 0
+
+    def close(self):
+        """
+            close the connections of the queue, which will be opened again when the queue is used.
+        """
+        pass
+
+
+class SqliteWorkQueue(WorkQueue):
+    """
+        A slight `WorkQueue` in the SQLite WAL mode, which can be shared by the processes of a machine (the SQLite file on a network file system is not recommended).
+
+        Parameters:
+            queue_path (str): the path of the SQLite queue file, default is `.preparser_queue.db`.
+            max_attempts (int): the maximum times to lease an url, the url will be failed after that, default is 3.
+    """
+    def __init__(self, queue_path: str = '.preparser_queue.db', max_attempts: int = 3) -> None:
+        self.queue_path = os.path.abspath(queue_path)
+        self.max_attempts = max(max_attempts, 1)
+        self._lock = threading.Lock()
+        self._connection: sqlite3.Connection | None = None
+        self._connection_pid: int | None = None
+        queue_dir = os.path.dirname(self.queue_path)
+        if queue_dir:
+            os.makedirs(queue_dir, exist_ok=True)
+        connection = self._get_connection()
+        connection.execute('''
+            CREATE TABLE IF NOT EXISTS tasks (
+                url TEXT PRIMARY KEY,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                worker TEXT,
+                lease_until REAL,
+                result TEXT
+            )
+        ''')
+        connection.execute('CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, lease_until)')
+        connection.commit()
+
+    def __getstate__(self) -> dict[str, Any]:
+        # the connection and the lock can't be sent to the other processes, they will be created again there
+        state = self.__dict__.copy()
+        state['_lock'] = None
+        state['_connection'] = None
+        state['_connection_pid'] = None
+        return state
+
+    def __setstate__(self, state: dict[str, Any]):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        if self._connection is None or self._connection_pid != os.getpid():
+            # wait for the locks of the other processes instead of failing at once
+            self._connection = sqlite3.connect(self.queue_path, timeout=60, isolation_level=None, check_same_thread=False)
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute('PRAGMA synchronous=NORMAL')
+            self._connection_pid = os.getpid()
+        return self._connection
+
+    def put(self, url_list: Iterable[str], batch_size: int = 1000) -> int:
+        added_numbers = 0
+        batch = []
+        with self._lock:
+            connection = self._get_connection()
+            for url in url_list:
+                batch.append((url,))
+                if len(batch) >= batch_size:
+                    added_numbers += self._put_batch(connection, batch)
+                    batch = []
+            if batch:
+                added_numbers += self._put_batch(connection, batch)
+        return added_numbers
+
+    @staticmethod
+    def _put_batch(connection: sqlite3.Connection, batch: list[tuple[str]]) -> int:
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            added_numbers = connection.executemany('INSERT OR IGNORE INTO tasks (url) VALUES (?)', batch).rowcount
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+        return added_numbers
+
+    def lease(self, worker_id: str, numbers: int, lease_seconds: float) -> list[str]:
+        now = time()
+        with self._lock:
+            connection = self._get_connection()
+            connection.execute('BEGIN IMMEDIATE')  # take the write lock first, so the other workers can't lease the same urls
+            try:
+                # the urls of the crashed workers which were tried too many times
+                connection.execute("UPDATE tasks SET status = 'failed', worker = NULL WHERE status = 'leased' AND lease_until < ? AND attempts >= ?",
+                                   (now, self.max_attempts))
+                rows = connection.execute("SELECT url FROM tasks WHERE status = 'pending' OR (status = 'leased' AND lease_until < ?) LIMIT ?",
+                                          (now, numbers)).fetchall()
+                urls = [row[0] for row in rows]
+                connection.executemany("UPDATE tasks SET status = 'leased', worker = ?, lease_until = ?, attempts = attempts + 1 WHERE url = ?",
+                                       [(worker_id, now + lease_seconds, url) for url in urls])
+                connection.execute('COMMIT')
+            except Exception:
+                connection.execute('ROLLBACK')
+                raise
+        return urls
+
+    def ack(self, worker_id: str, results: list[tuple[str, Any]]):
+        if not results:
+            return
+        done_rows = []
+        failed_rows = []
+        for url, result in results:
+            if result:
+                done_rows.append((dumps(result, ensure_ascii=False, default=str), url, worker_id))
+            else:
+                failed_rows.append((self.max_attempts, url, worker_id))
+        with self._lock:
+            connection = self._get_connection()
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                # only the worker holding the lease can ack, the url may be leased to the other worker after the lease expired
+                connection.executemany("UPDATE tasks SET status = 'done', worker = NULL, result = ? WHERE url = ? AND worker = ? AND status = 'leased'", done_rows)
+                connection.executemany('''
+                    UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, worker = NULL
+                    WHERE url = ? AND worker = ? AND status = 'leased'
+                ''', failed_rows)
+                connection.execute('COMMIT')
+            except Exception:
+                connection.execute('ROLLBACK')
+                raise
+
+    def release(self, worker_id: str) -> int:
+        with self._lock:
+            connection = self._get_connection()
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                released_numbers = connection.execute('''
+                    UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, worker = NULL
+                    WHERE worker = ? AND status = 'leased'
+                ''', (self.max_attempts, worker_id)).rowcount
+                connection.execute('COMMIT')
+            except Exception:
+                connection.execute('ROLLBACK')
+                raise
+        return released_numbers
+
+    def is_finished(self) -> bool:
+        with self._lock:
+            row = self._get_connection().execute("SELECT 1 FROM tasks WHERE status IN ('pending', 'leased') LIMIT 1").fetchone()
+        return row is None
+
+    def iter_results(self, batch_size: int = 1000) -> Iterator[tuple[str, Any]]:
+        last_rowid = 0
+        while True:
+            with self._lock:
+                rows = self._get_connection().execute("SELECT rowid, url, result FROM tasks WHERE status = 'done' AND rowid > ? ORDER BY rowid LIMIT ?",
+                                                      (last_rowid, batch_size)).fetchall()
+            if not rows:
+                break
+            for rowid, url, result in rows:
+                last_rowid = rowid
+                yield url, loads(result)
+
+    @property
+    def stats(self) -> dict[str, int]:
+        numbers = {'pending': 0, 'leased': 0, 'done': 0, 'failed': 0}
+        with self._lock:
+            for status, count in self._get_connection().execute('SELECT status, COUNT(*) FROM tasks GROUP BY status'):
+                numbers[status] = count
+        return numbers
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+class _ShardWorker():
+    # feed the leased urls to the `PreParser` lazily, and ack their results in batches
+    def __init__(self, work_queue: WorkQueue, worker_id: str, lease_size: int, lease_seconds: float, poll_interval: float) -> None:
+        self.work_queue = work_queue
+        self.worker_id = worker_id
+        self.lease_size = lease_size
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.handled_numbers = 0
+        self._results: list[tuple[str, Any]] = []
+
+    def iter_urls(self) -> Iterator[str]:
+        # stop when there are no urls to lease, as waiting here would block the results of the in-flight urls
+        while True:
+            self.flush()
+            urls = self.work_queue.lease(self.worker_id, self.lease_size, self.lease_seconds)
+            if not urls:
+                return
+            yield from urls
+
+    def add_result(self, url: str, result: Any):
+        self._results.append((url, result))
+        self.handled_numbers += 1
+        if len(self._results) >= self.lease_size:
+            self.flush()
+
+    def flush(self):
+        results, self._results = self._results, []
+        self.work_queue.ack(self.worker_id, results)
+
+
+def _run_shard_worker(sharder: 'Sharder', worker_id: str) -> int:
+    return sharder.run_worker(worker_id)
+
+
+class Sharder():
+    """
+        A slight coordinator to shard a crawl across several processes (or several machines) through a shared `WorkQueue`,
+        each worker runs its own `PreParser` with the `parser_kwargs`, leases the urls from the queue, and acks the results back to the queue,
+        so all of the results are collected in the queue, and the urls of the crashed workers will be leased again after their lease expired.
+
+        Parameters:
+            parser_kwargs (dict[str,Any]): the parameters of the `PreParser` of per worker except the `url_list`, they must be picklable, so the `request_call_back_func` should be a module level function,
+                                           and its results must be json serializable (others will be saved as strings).
+                                           in the workers, the `stop_when_task_failed` and `cached_data` are False and the `journal_path` is not used, as the queue records all of them,
+                                           and the urls are deduplicated when they were submitted instead.
+            work_queue (WorkQueue | None): the shared work queue, default is None, which means the `SqliteWorkQueue` of the `queue_path`.
+            queue_path (str): the path of the default `SqliteWorkQueue`, default is `.preparser_queue.db`.
+            lease_size (int): the number of the urls leased by a worker at once, default is 50.
+            lease_seconds (float): the seconds of a lease, which must be enough to finish the leased urls, default is 300.
+            poll_interval (float): the seconds to wait when there are no urls to lease but the other workers are still working, default is 1.
+    """
+    def __init__(self,
+                 parser_kwargs: dict[str, Any],
+                 work_queue: WorkQueue | None = None,
+                 queue_path: str = '.preparser_queue.db',
+                 lease_size: int = 50,
+                 lease_seconds: float = 300,
+                 poll_interval: float = 1
+                 ) -> None:
+        self.parser_kwargs = parser_kwargs
+        self.work_queue = work_queue if work_queue else SqliteWorkQueue(queue_path)
+        self.lease_size = max(lease_size, 1)
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+
+    def submit(self, url_list: Iterable[str]) -> int:
+        """
+            add the urls into the work queue and return the number of the added ones, the duplicated urls are ignored.
+        """
+        if self.parser_kwargs.get('dedup_urls'):
+            url_list = (Urler(self.parser_kwargs.get('url_tracking_params')).canonicalize(url) for url in url_list if url)
+        added_numbers = self.work_queue.put(url_list)
+        logger.info(f'submitted {added_numbers} urls into the work queue !!!')
+        return added_numbers
+
+    def run_worker(self, worker_id: str | None = None) -> int:
+        """
+            run a worker in current process until the work queue finished, and return the number of the handled urls,
+            which can be called on the other machines sharing the same work queue.
+        """
+        from .PreParseHelper import PreParser
+        worker_id = worker_id if worker_id else f'{socket.gethostname()}-{os.getpid()}'
+        worker = _ShardWorker(self.work_queue, worker_id, self.lease_size, self.lease_seconds, self.poll_interval)
+        parser_kwargs = {
+            **self.parser_kwargs,
+            'stop_when_task_failed': False,
+            'cached_data': False,
+            'dedup_urls': False,
+            'journal_path': None,
+        }
+        logger.info(f'start the shard worker {worker_id} !!!')
+        parser = PreParser(**parser_kwargs)
+        try:
+            while True:
+                parser.to_parse_urls = worker.iter_urls()
+                for url, result in parser.iter_parse():
+                    worker.add_result(url, result)
+                worker.flush()
+                if self.work_queue.is_finished():
+                    break
+                sleep(self.poll_interval)  # the other workers are still holding the leases, which may expire
+        finally:
+            worker.flush()
+        logger.info(f'ended the shard worker {worker_id}, handled {worker.handled_numbers} urls !!!')
+        return worker.handled_numbers
+
+    def start(self, process_numbers: int = 2) -> dict[str, int]:
+        """
+            run `process_numbers` workers in the processes of current machine until the work queue finished, and return the `stats` of the work queue.
+        """
+        logger.info(f'start the sharded crawl with {process_numbers} processes !!!')
+        worker_ids = [f'{socket.gethostname()}-shard-{index}' for index in range(max(process_numbers, 1))]
+        processes = [multiprocessing.Process(target=_run_shard_worker, args=(self, worker_id)) for worker_id in worker_ids]
+        self.work_queue.close()  # don't carry the opened connections into the forked processes
+        try:
+            for process in processes:
+                process.start()
+            running = {process.sentinel: (process, worker_id) for process, worker_id in zip(processes, worker_ids)}
+            while running:
+                # handle per worker as soon as it exited, so the leases of a crashed one go back before the others wait for them
+                for sentinel in wait(list(running)):
+                    process, worker_id = running.pop(sentinel)
+                    process.join()
+                    if process.exitcode != 0:
+                        released_numbers = self.work_queue.release(worker_id)
+                        logger.error(f'the shard worker {worker_id} exited with code {process.exitcode}, released its {released_numbers} leased urls !!!')
+            if not self.work_queue.is_finished():
+                logger.error('all of the shard workers exited before the work queue finished, run `start` or `run_worker` again to go on !!!')
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+        stats = self.stats
+        logger.info(f'ended the sharded crawl, {stats} !!!')
+        return stats
+
+    def iter_results(self) -> Iterator[tuple[str, Any]]:
+        """
+            yield the `(url, result)` of the done urls from the work queue.
+        """
+        return self.work_queue.iter_results()
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return self.work_queue.stats
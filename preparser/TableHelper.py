@@ -0,0 +1,386 @@
+import re
+from array import array
+from html import unescape
+from typing import Any, Callable, Literal
+
+Table_Output = Literal['rows', 'records', 'columns']
+Column_Types = dict[str | int, Callable[[str], Any]]
+
+# the table tags, the comments, the CDATA and the elements whose content is not the html (so the `<table>` in the strings of the scripts is skipped)
+_TABLE_TAG_PATTERN = re.compile(r'<!--.*?(?:-->|\Z)|<!\[CDATA\[.*?(?:\]\]>|\Z)|<(script|style|template)\b[^>]*>.*?(?:</\1\s*>|\Z)|<(/?)table\b[^>]*>', re.IGNORECASE | re.DOTALL)
+_SKIPPED_TAGS = ('script', 'style', 'template')
+# the comments and CDATA, or the tags with the closing slash, the name and the attributes (which may have the `>` in the quoted values)
+_TOKEN_PATTERN = re.compile(r'<!--.*?-->|<!\[CDATA\[.*?\]\]>|<(/?)([a-zA-Z][a-zA-Z0-9]*)((?:"[^"]*"|\'[^\']*\'|[^\'">])*)>', re.DOTALL)
+_ATTR_PATTERN = re.compile(r'([^\s=/>"\']+)(?:\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+)))?')
+_INT_PATTERN = re.compile(r'[+-]?\d+')
+_FLOAT_PATTERN = re.compile(r'[+-]?(?:\d+\.\d*|\.\d+|\d+)(?:[eE][+-]?\d+)?')
+_THOUSANDS_PATTERN = re.compile(r'[+-]?\d{1,3}(?:,\d{3})+(?:\.\d+)?')
+_MAX_COLSPAN = 1000  # the limits of the browsers, so a broken span won't blow up the rows
+_MAX_ROWSPAN = 65534
+
+
+def coerce_cell(text: str) -> Any:
+    """
+        convert the text of a cell into the `int` or `float` if it looks like a number (the thousands separator `,` is allowed), the empty one into None, otherwise keep the text.
+    """
+    if not text:
+        return None
+    if text[0] not in '+-.0123456789':
+        return text
+    if _THOUSANDS_PATTERN.fullmatch(text):
+        text = text.replace(',', '')
+    if _INT_PATTERN.fullmatch(text):
+        return int(text)
+    if _FLOAT_PATTERN.fullmatch(text):
+        return float(text)
+    return text
+
+
+def _to_span(value: str | None, maximum: int) -> int:
+    try:
+        return min(max(int(value), 0), maximum) if value else 1
+    except ValueError:
+        return 1
+
+
+class ExtractedTable():
+    """
+        A table extracted by the `TableScanner`, the cells spanned by the `rowspan` and `colspan` are filled with the value of the spanning cell.
+
+        Attributes:
+            attrs (dict[str,str | None]): the attributes of the `table` tag.
+            caption (str | None): the text of the `caption` tag.
+            header (list[str] | None): the column names from the header rows (the rows in the `thead`, or the leading rows which only have the `th` cells),
+                                       the names of the stacked header rows are joined by ` / `, None means the table has no header rows.
+            rows (list[list[Any]]): the data rows, the short rows are filled with None to the width of the table.
+    """
+    __slots__ = ('attrs', 'caption', 'header', 'rows')
+
+    def __init__(self, attrs: dict[str, str | None], caption: str | None, header: list[str] | None, rows: list[list[Any]]) -> None:
+        self.attrs = attrs
+        self.caption = caption
+        self.header = header
+        self.rows = rows
+
+    @property
+    def column_names(self) -> list[str | int]:
+        """
+            the unique names of the columns, which are the keys of the `to_records` and `to_columns`, the duplicated header names get the `_2`, `_3` ... suffix,
+            and the columns without the header use their indexes.
+        """
+        width = len(self.rows[0]) if self.rows else len(self.header or [])
+        if not self.header:
+            return list(range(width))
+        names: list[str | int] = []
+        seen: dict[str, int] = {}
+        for index, name in enumerate(self.header):
+            if not name:
+                names.append(index)
+                continue
+            seen[name] = seen.get(name, 0) + 1
+            names.append(name if seen[name] == 1 else f'{name}_{seen[name]}')
+        return names
+
+    def to_rows(self) -> list[list[Any]]:
+        """
+            the rows with the header as the first one (if it has), just like the `Tooler.get_per_table_data`.
+        """
+        return [list(self.header)] + self.rows if self.header else self.rows
+
+    def to_records(self) -> list[dict[str | int, Any]]:
+        names = self.column_names
+        return [dict(zip(names, row)) for row in self.rows]
+
+    def to_columns(self, array_columns: bool = False) -> dict[str | int, list[Any] | array]:
+        """
+            the column oriented datas, set `array_columns` to store the columns which only have the `int` (or the `int` and `float`) values
+            in the compact `array('q')` (or `array('d')`) instead of the list.
+        """
+        columns: dict[str | int, list[Any] | array] = {}
+        for name, values in zip(self.column_names, zip(*self.rows) if self.rows else [() for _ in self.column_names]):
+            column: list[Any] | array = list(values)
+            if array_columns and column:
+                types = {type(value) for value in column}
+                try:
+                    if types == {int}:
+                        column = array('q', column)
+                    elif types <= {int, float}:
+                        column = array('d', column)
+                except OverflowError:  # the int out of the 64 bits
+                    pass
+            columns[name] = column
+        return columns
+
+    def to_output(self, output: Table_Output = 'rows', array_columns: bool = False) -> list[list[Any]] | list[dict[str | int, Any]] | dict[str | int, list[Any] | array]:
+        if output == 'records':
+            return self.to_records()
+        if output == 'columns':
+            return self.to_columns(array_columns)
+        return self.to_rows()
+
+
+class _TableBuilder():
+    # the state of a table which is being scanned, the cells of the not matched tables are not collected
+    __slots__ = ('attrs', 'matched', 'section', 'rows', 'header_rows', 'carry', 'row', 'row_is_header', 'filled',
+                 'cell_parts', 'cell_rowspan', 'cell_colspan', 'caption_parts', 'in_caption')
+
+    def __init__(self, attrs: dict[str, str | None], matched: bool) -> None:
+        self.attrs = attrs
+        self.matched = matched
+        self.section: str | None = None
+        self.rows: list[list[str | None]] = []
+        self.header_rows: list[list[str | None]] = []
+        self.carry: dict[int, list] = {}  # column index -> [the text of the spanning cell, the remaining rows]
+        self.row: list[str | None] | None = None
+        self.row_is_header = False
+        self.filled: set[int] = set()
+        self.cell_parts: list[str] | None = None
+        self.cell_rowspan = 1
+        self.cell_colspan = 1
+        self.caption_parts: list[str] = []
+        self.in_caption = False
+
+    def add_text(self, text: str):
+        if self.cell_parts is not None:
+            self.cell_parts.append(text)
+        elif self.in_caption:
+            self.caption_parts.append(text)
+
+    def _fill_carry(self):
+        row = self.row
+        while len(row) in self.carry:
+            column = len(row)
+            spanning = self.carry[column]
+            row.append(spanning[0])
+            self.filled.add(column)
+            spanning[1] -= 1
+            if spanning[1] <= 0:
+                del self.carry[column]
+
+    def start_section(self, section: str):
+        self.end_section()
+        self.section = section
+
+    def end_section(self):
+        # the rows can't span out of their row group
+        self.end_row()
+        self.carry.clear()
+        self.section = None
+
+    def start_row(self):
+        self.end_row()
+        self.row = []
+        self.row_is_header = self.section == 'thead' or (self.section != 'tfoot' and not self.rows)
+        self.filled.clear()
+
+    def end_row(self):
+        self.end_cell()
+        row = self.row
+        if row is None:
+            return
+        self.row = None
+        if self.carry:
+            # the spanned cells after the last cell of the row, and the ones overlapped by the other cells
+            for column in sorted(self.carry):
+                if column in self.filled:
+                    continue
+                if column >= len(row):
+                    row.extend([None] * (column - len(row)))
+                    row.append(self.carry[column][0])
+                self.carry[column][1] -= 1
+                if self.carry[column][1] <= 0:
+                    del self.carry[column]
+        if row:
+            (self.header_rows if self.row_is_header else self.rows).append(row)
+
+    def start_cell(self, is_header: bool, rowspan: str | None, colspan: str | None):
+        if self.row is None:
+            self.start_row()
+        self.end_cell()
+        if not is_header:
+            self.row_is_header = self.section == 'thead'
+        self._fill_carry()
+        self.cell_parts = []
+        self.cell_rowspan = _to_span(rowspan, _MAX_ROWSPAN)
+        self.cell_colspan = max(_to_span(colspan, _MAX_COLSPAN), 1)
+
+    def end_cell(self):
+        if self.cell_parts is None:
+            return
+        text = ' '.join(''.join(self.cell_parts).split())
+        if '&' in text:
+            text = unescape(text)
+        self.cell_parts = None
+        row = self.row
+        column = len(row)
+        row.extend([text] * self.cell_colspan)
+        if self.cell_rowspan != 1:
+            # rowspan=0 spans to the end of the row group
+            remaining = self.cell_rowspan - 1 if self.cell_rowspan else _MAX_ROWSPAN
+            for offset in range(self.cell_colspan):
+                self.carry[column + offset] = [text, remaining]
+                self.filled.add(column + offset)
+
+    def build(self, coerce_types: bool = False, column_types: Column_Types | None = None) -> ExtractedTable:
+        self.end_section()
+        width = max((len(row) for row in self.header_rows + self.rows), default=0)
+        header = None
+        if self.header_rows:
+            header = []
+            for column in range(width):
+                labels: list[str] = []
+                for row in self.header_rows:
+                    label = row[column] if column < len(row) else None
+                    if label and (not labels or labels[-1] != label):  # the label spanned down is only used once
+                        labels.append(label)
+                header.append(' / '.join(labels))
+        rows: list[list[Any]] = []
+        for row in self.rows:
+            if len(row) < width:
+                row.extend([None] * (width - len(row)))
+            rows.append(row)
+        caption = unescape(' '.join(''.join(self.caption_parts).split())) or None
+        table = ExtractedTable(self.attrs, caption, header, rows)
+        if coerce_types or column_types:
+            converters: list[Callable[[str], Any] | None] = [coerce_cell if coerce_types else None] * width
+            for name, column in zip(table.column_names, range(width)):
+                if column_types:
+                    converters[column] = column_types.get(name, column_types.get(column, converters[column]))
+            for row in rows:
+                for column, converter in enumerate(converters):
+                    if converter is not None and row[column] is not None:
+                        try:
+                            row[column] = converter(row[column])
+                        except (ValueError, TypeError):
+                            row[column] = None
+        return table
+
+
+def _parse_attrs(attrs_text: str) -> dict[str, str | None]:
+    attrs: dict[str, str | None] = {}
+    for match in _ATTR_PATTERN.finditer(attrs_text):
+        name, double_quoted, single_quoted, unquoted = match.groups()
+        value = double_quoted if double_quoted is not None else single_quoted if single_quoted is not None else unquoted
+        attrs[name.lower()] = unescape(value) if value and '&' in value else value
+    return attrs
+
+
+class TableScanner():
+    """
+        A slight single pass table scanner, which extracts all of the matched tables from the raw html with the regular expressions, without building the whole `BeautifulSoup` tree,
+        only the `table` parts of the html are tokenized, and the `rowspan` / `colspan` cells are expanded into the rows.
+        the nested tables are extracted as the separated tables, and their texts are not added into the cells of the outer table.
+        the tables in the comments, CDATA, `script`, `style` and `template` are skipped, just like the browsers don't render them.
+
+        Parameters:
+            table_attrs (dict[str,str | bool] | None): only extract the tables which have these attributes, just like the `attrs` of the `BeautifulSoup.find_all`,
+                                                      the `class` is matched if it's one of the classes of the table, and True means the table has the attribute, default is None, which means all of the tables.
+    """
+    def __init__(self, table_attrs: dict[str, str | bool] | None = None) -> None:
+        self.table_attrs = table_attrs
+
+    def _is_matched(self, attrs: dict[str, str | None]) -> bool:
+        if not self.table_attrs:
+            return True
+        for name, expected in self.table_attrs.items():
+            value = attrs.get(name)
+            if expected is True:
+                if name not in attrs:
+                    return False
+            elif value is None:
+                return False
+            elif name == 'class':
+                if expected not in value.split():
+                    return False
+            elif value != expected:
+                return False
+        return True
+
+    def _scan_segment(self, html: str, start: int, end: int, tables: list[_TableBuilder], stack: list[_TableBuilder]):
+        position = start
+        skipping: str | None = None
+        for match in _TOKEN_PATTERN.finditer(html, start, end):
+            table = stack[-1] if stack else None
+            if skipping is None and table is not None and match.start() > position and (table.cell_parts is not None or table.in_caption):
+                table.add_text(html[position:match.start()])
+            position = match.end()
+            tag = match.group(2)
+            if tag is None:  # the comment or CDATA
+                continue
+            tag = tag.lower()
+            is_closing = match.group(1) == '/'
+            if skipping is not None:
+                if is_closing and tag == skipping:
+                    skipping = None
+                continue
+            if tag == 'table':
+                if is_closing:
+                    if stack:
+                        stack.pop().end_section()
+                else:
+                    attrs = _parse_attrs(match.group(3))
+                    table = _TableBuilder(attrs, self._is_matched(attrs))
+                    stack.append(table)
+                    if table.matched:
+                        tables.append(table)
+                continue
+            if table is None or not table.matched:
+                continue
+            if tag == 'td' or tag == 'th':
+                if is_closing:
+                    table.end_cell()
+                else:
+                    attrs_text = match.group(3)
+                    attrs = _parse_attrs(attrs_text) if 'span' in attrs_text.lower() else {}
+                    table.start_cell(tag == 'th', attrs.get('rowspan'), attrs.get('colspan'))
+            elif tag == 'tr':
+                if is_closing:
+                    table.end_row()
+                else:
+                    table.start_row()
+            elif tag == 'br':
+                table.add_text(' ')
+            elif tag == 'thead' or tag == 'tbody' or tag == 'tfoot':
+                if is_closing:
+                    table.end_section()
+                else:
+                    table.start_section(tag)
+            elif tag == 'caption':
+                table.in_caption = not is_closing
+            elif tag in _SKIPPED_TAGS and not is_closing:
+                skipping = tag
+        if skipping is None and stack and position < end and (stack[-1].cell_parts is not None or stack[-1].in_caption):
+            stack[-1].add_text(html[position:end])
+
+    def scan(self, html: str, coerce_types: bool = False, column_types: Column_Types | None = None) -> list[ExtractedTable]:
+        """
+            extract the matched tables from the html in the document order.
+
+            Parameters:
+                html (str): the raw html.
+                coerce_types (bool): wheather convert the cells like the numbers into the `int` or `float`, and the empty ones into None, see `coerce_cell`, default is False.
+                column_types (dict[str | int,Callable[[str],Any]] | None): the converters of the columns by the header name or the column index, which take over the `coerce_types`,
+                                                                           the cell is None if its converter raised the `ValueError` or `TypeError`, default is None.
+        """
+        tables: list[_TableBuilder] = []
+        stack: list[_TableBuilder] = []
+        depth = 0
+        start = 0
+        # only tokenize the outermost tables, the rest of the page is skipped
+        for match in _TABLE_TAG_PATTERN.finditer(html):
+            if match.group(2) is None:  # the comment, CDATA, script, style or template
+                continue
+            if match.group(2):
+                if depth > 0:
+                    depth -= 1
+                    if depth == 0:
+                        self._scan_segment(html, start, match.end(), tables, stack)
+            else:
+                if depth == 0:
+                    start = match.start()
+                depth += 1
+        if depth > 0:  # the not closed table
+            self._scan_segment(html, start, len(html), tables, stack)
+        while stack:
+            stack.pop().end_section()
+        return [table.build(coerce_types, column_types) for table in tables]
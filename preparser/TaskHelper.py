@@ -1,8 +1,41 @@
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Callable, Literal, Any
+import logging
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, Iterable, Iterator, Literal, Any
+from time import sleep, monotonic
+from .ScheduleHelper import Scheduler, ConcurrencyLimiter
+import asyncio
 import signal
 import os
 
+logger = logging.getLogger(__name__)
+
+
+class _WindowResults():
+    # the finished results of a submitting window, which holds the early finished ones when the results need to be yielded in order
+    def __init__(self, ordered: bool) -> None:
+        self.ordered = ordered
+        self.next_index = 0
+        self._results: dict[int, tuple[Any, Any]] = {}
+        self._ready: deque[tuple[Any, Any]] = deque()
+
+    @property
+    def held_numbers(self) -> int:
+        return len(self._results)
+
+    def put(self, index: int, params: Any, result: Any):
+        if not self.ordered:
+            self._ready.append((params, result))
+            return
+        self._results[index] = (params, result)
+        while self.next_index in self._results:
+            self._ready.append(self._results.pop(self.next_index))
+            self.next_index += 1
+
+    def pop_ready(self) -> Iterator[tuple[Any, Any]]:
+        while self._ready:
+            yield self._ready.popleft()
+
 
 class Tasker():
     """
@@ -13,21 +46,36 @@ class Tasker():
                                                 `map`: use the `map` func of the theading pool to distribute tasks.
                                                 `single`: use the `submit` func to distribute the task one by one into the theading pool.
             cus_task (Callable | None = None): a function of the task details.
-            task_params_list (list[Any] = []): a list of parameters of the function `cus_task` above. 
+            task_params_list (Iterable[Any] = []): a list or any iterable (like a generator) of parameters of the function `cus_task` above, the iterable will be consumed lazily.
             max_threading (int): The maximum number of threads in the threading pool. Default is 3.
             cached_data (bool): weather cache the parsed datas, defalt is False.
             cached_result (bool): wheather need save the task executed result into the cache, default is False, if you set True, you can get the reault from the property `task_result_dict`.
             stop_when_task_failed (bool) : wheather need stop when you failed to get request from a Url,default is True
+            task_scheduler (Scheduler | None): the per-host politeness scheduler, default is None, if you set it, the task will only be submitted when its host is ready and there is a free thread,
+                                                so the slow hosts won't hold the threads, and the `map` mode still yields the results in order.
+            max_in_flight (int | None): the maximum number of the tasks which were taken from the `task_params_list` but their results were not handled yet,
+                                        (including the tasks waiting in the threading pool, the host queues of the scheduler, or for the results before them in the ordered results),
+                                        so the memory is bounded by this value instead of the length of the `task_params_list`, default is None, which means 4 times of the `max_threading`.
+            terminal_call_back (Callable[[],Any] | None): a function called before the `terminal_task` exits the program, to save the things which can't be lost, default is None.
+            concurrency_limiter (ConcurrencyLimiter | None): the adaptive limiter of the number of the running tasks, which is adjusted by the latency and the failures (the empty results) of the finished tasks,
+                                        and the `max_threading` is the upper bound, default is None, which means always run `max_threading` tasks at the same time.
+            is_skipped_task (Callable[[Any],bool] | None): a function to check wheather the failed task with the params was just skipped (like its host is unavailable for a while),
+                                        the skipped tasks won't stop the tasks even if the `stop_when_task_failed` is True, default is None, which means all of the failed tasks are fatal.
 
     """
 
     def __init__(self,
                  task_mode: Literal['map', 'single'],
                  cus_task: Callable | None = None,
-                 task_params_list: list[Any] = [],
+                 task_params_list: Iterable[Any] = [],
                  max_threading: int = 3,
                  cached_result: bool = False,
-                 stop_when_task_failed: bool = True
+                 stop_when_task_failed: bool = True,
+                 task_scheduler: Scheduler | None = None,
+                 max_in_flight: int | None = None,
+                 terminal_call_back: Callable[[], Any] | None = None,
+                 concurrency_limiter: ConcurrencyLimiter | None = None,
+                 is_skipped_task: Callable[[Any], bool] | None = None
                  ) -> None:
         self.task_mode: Literal['map', 'single'] = task_mode
         self.task_max_threading = max_threading
@@ -39,11 +87,135 @@ class Tasker():
         self.taker_executer = None
         self.futures = [],
         self.stop_when_task_failed = stop_when_task_failed
+        self.task_scheduler = task_scheduler
+        self.max_in_flight = max(max_in_flight if max_in_flight else max_threading * 4, max_threading)
+        self.terminal_call_back = terminal_call_back
+        self.concurrency_limiter = concurrency_limiter
+        self.is_skipped_task = is_skipped_task
+
+    @property
+    def current_concurrency(self) -> int:
+        """
+            the number of the tasks allowed to run at the same time, which changes at runtime when the `concurrency_limiter` is set.
+        """
+        if self.concurrency_limiter:
+            return min(self.concurrency_limiter.current_limit, self.task_max_threading)
+        return self.task_max_threading
+
+    def _record_finished(self, started_at: float, result: Any):
+        if self.concurrency_limiter:
+            self.concurrency_limiter.record(monotonic() - started_at, not result)
 
     def _handle_interrupt(self, signum, frame):  # detect the control + c
-        print("Interrupt received, shutting down tasks !!!")
+        logger.warning("Interrupt received, shutting down tasks !!!")
         self.terminal_task()
 
+    def _handle_task_result(self, params: Any, result: Any) -> bool:
+        # return False when the tasks need to be stopped
+        if self.cached_result:
+            self.task_result_dict[params] = result
+        if not result:
+            logger.warning(f"when running task with params({params}), we get the None result ! ")
+            if self.stop_when_task_failed and not (self.is_skipped_task and self.is_skipped_task(params)):
+                logger.warning(f"failed to run the task with params({params}), it'going to cancel all running jobs !!!")
+                self.terminal_task()
+                return False
+        return True
+
+    def _iter_scheduled_results(self, executor: ThreadPoolExecutor, ordered: bool) -> Iterator[tuple[Any, Any]]:
+        # feed the scheduler lazily, and submit the task only when its host is ready and there is a free thread
+        params_iterator = enumerate(self.task_params_list)
+        task_indexes: dict[Any, deque[int]] = {}  # the scheduler only hands back the params, so find their indexes by the params
+        in_flight: dict[Future, tuple[int, Any, float]] = {}
+        results = _WindowResults(ordered)
+        exhausted = False
+        while True:
+            while not exhausted and self.task_scheduler.pending_numbers + len(in_flight) + results.held_numbers < self.max_in_flight:
+                index, params = next(params_iterator, (None, None))
+                if index is None:
+                    exhausted = True
+                    break
+                task_indexes.setdefault(params, deque()).append(index)
+                self.task_scheduler.add(params)
+            wait_seconds = None
+            while len(in_flight) < self.current_concurrency:
+                params, wait_seconds = self.task_scheduler.poll()
+                if params is None:
+                    break
+                indexes = task_indexes[params]
+                in_flight[executor.submit(self.task_job, params)] = (indexes.popleft(), params, monotonic())
+                if not indexes:
+                    del task_indexes[params]
+            self.futures = list(in_flight)
+            if not in_flight:
+                if self.task_scheduler.pending_numbers == 0 and exhausted:
+                    break
+                if wait_seconds is not None:
+                    sleep(wait_seconds)  # all of the pending hosts are not ready
+                continue
+            done, _ = wait(self.futures, timeout=wait_seconds, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, params, started_at = in_flight.pop(future)
+                self.task_scheduler.release(params)
+                result = future.result()
+                self._record_finished(started_at, result)
+                results.put(index, params, result)
+            yield from results.pop_ready()
+
+    def _iter_window_results(self, executor: ThreadPoolExecutor, ordered: bool) -> Iterator[tuple[Any, Any]]:
+        # only take the next params when the number of the not handled tasks is under the `max_in_flight`,
+        # and when the `concurrency_limiter` is set, only submit the tasks which can run at once, so the limit takes effect immediately
+        params_iterator = enumerate(self.task_params_list)
+        in_flight: dict[Future, tuple[int, Any, float]] = {}
+        results = _WindowResults(ordered)
+        exhausted = False
+        while True:
+            while not exhausted and len(in_flight) + results.held_numbers < self.max_in_flight and \
+                    (self.concurrency_limiter is None or len(in_flight) < self.current_concurrency):
+                index, params = next(params_iterator, (None, None))
+                if index is None:
+                    exhausted = True
+                    break
+                in_flight[executor.submit(self.task_job, params)] = (index, params, monotonic())
+            self.futures = list(in_flight)
+            if not in_flight:
+                break
+            done, _ = wait(self.futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, params, started_at = in_flight.pop(future)
+                result = future.result()
+                self._record_finished(started_at, result)
+                results.put(index, params, result)
+            yield from results.pop_ready()
+
+    def iter_task(self, ordered: bool = False) -> Iterator[tuple[Any, Any]]:
+        """
+            run all tasks and yield the `(params, result)` of per task as soon as it finished, so the results can be handled one by one without waiting for all tasks.
+            the not started tasks will be cancelled when the iterating is stopped, and the results are not saved into the `task_result_dict`.
+
+            Parameters:
+                ordered (bool): wheather yield the results in the same order of the `task_params_list`, default is False, which means yield them in the finished order.
+                                the ordered results may be held in memory until all of the results before them finished, and the `map` mode always yields them in order.
+        """
+        if self.task_job is None:
+            logger.warning('no tasks need to run !!!')
+            return
+        if self.task_mode not in ['map', 'single']:
+            logger.error(f'invalid task_mode: {self.task_mode}')
+            return
+        self.is_running = True
+        executor = ThreadPoolExecutor(max_workers=self.task_max_threading)
+        self.taker_executer = executor
+        try:
+            # the `map` mode yields the results in order just like the `executor.map`
+            if self.task_scheduler:
+                yield from self._iter_scheduled_results(executor, ordered or self.task_mode == 'map')
+            else:
+                yield from self._iter_window_results(executor, ordered or self.task_mode == 'map')
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            self.is_running = False
+
     def terminal_task(self):
         """
             a func to terminal all tasks and exit current program
@@ -51,13 +223,18 @@ class Tasker():
         if self.taker_executer:
             if self.task_mode == 'map':
                 self.taker_executer.shutdown(wait=False)
-            elif self.task_mode == 'sigle':
+            elif self.task_mode == 'single':
                 for f in self.futures:  # cancel all tasks, even it is running
                     if not f.done():
                         f.cancel()
             # sys.exit(0)  # Exit the program
             # os.kill(os.getpid(), 9)  # force exit program
-        print('task canceled, existed the program !!!')
+        if self.terminal_call_back:
+            try:
+                self.terminal_call_back()
+            except Exception as err:
+                logger.error(f'error when calling the terminal_call_back, error: {err}.')
+        logger.warning('task canceled, existed the program !!!')
         os._exit(1)  # force exit program
 
     def start_task(self) -> dict[int,Any] | dict:
@@ -66,51 +243,167 @@ class Tasker():
         """
         # Registering signal handler for Ctrl + C (SIGINT)
         signal.signal(signal.SIGINT, self._handle_interrupt)
-        print(f'start to run all tasks !!!')
+        logger.info('start to run all tasks !!!')
         self.task_result_dict = {}
-        self.is_running = True
         try:
-            if self.task_job is None:
-                print('no tasks need to run !!!')
-                self.is_running = False
-                return self.task_result_dict
-            with ThreadPoolExecutor(max_workers=self.task_max_threading) as executor:
-                self.taker_executer = executor
-                if self.task_mode == 'map':  # not recommend, as the task can't be terminated forcely when it started
-                    results = executor.map(
-                        self.task_job, self.task_params_list)
-                    for i, result in enumerate(results):
-                        if self.cached_result:
-                            self.task_result_dict[self.task_params_list[i]] = result
-                        if not result:
-                            print(
-                                f"warning: when running task {i} with params({self.task_params_list[i]}), we get the None result ! ")
-                            if self.stop_when_task_failed:
-                                print(
-                                    f"warning: failed to run the task {i} with params({self.task_params_list[i]}), it's going to cancel not start jobs ")
-                                self.terminal_task()
-                                break
-                elif self.task_mode == 'single':
-                    self.futures = [executor.submit(self.task_job, params)
-                                    for params in self.task_params_list]
-                    for i, future in enumerate(as_completed(self.futures)):
-                        result = future.result()  # jump out when there were an error
-                        if self.cached_result:
-                            self.task_result_dict[self.task_params_list[i]] = result
-                        if not result:
-                            print(
-                                f"warning: when running task {i} with params({self.task_params_list[i]}), we get the None result ! ")
-                            if self.stop_when_task_failed:
-                                print(
-                                    f"failed to run the task {i} with params({self.task_params_list[i]}), it'going to cancel all running jobs !!!")
-                                self.terminal_task()
-                                break
-                else:
-                    print(f'invalid task_mode: {self.task_mode}')
-                    executor.shutdown(wait=False)
+            for params, result in self.iter_task():
+                if not self._handle_task_result(params, result):
+                    break
         except Exception as err:
-            print(f'error when running the task jobs, error: {err}.')
+            logger.error(f'error when running the task jobs, error: {err}.')
         finally:
-            self.is_running = False
-            print(f'finished all running task !!!')
+            logger.info('finished all running task !!!')
             return self.task_result_dict
+
+
+class AsyncTasker():
+    """
+        A slight task object to process the coroutine tasks on the event loop, the number of in-flight tasks is bounded by a semaphore.
+
+        Parameters:
+            cus_task (Callable[[Any],Awaitable[Any]] | None = None): a coroutine function of the task details.
+            task_params_list (Iterable[Any] = []): a list or any iterable (like a generator) of parameters of the coroutine function `cus_task` above, the iterable will be consumed lazily.
+            max_concurrency (int): The maximum number of the in-flight tasks. Default is 100.
+            cached_result (bool): wheather need save the task executed result into the cache, default is False, if you set True, you can get the reault from the property `task_result_dict`.
+            stop_when_task_failed (bool) : wheather need stop when you failed to get request from a Url,default is True, when stopped, all of the not finished tasks will be cancelled.
+            task_scheduler (Scheduler | None): the per-host politeness scheduler, default is None, if you set it, each task will wait for its host to be ready before taking the semaphore.
+            max_in_flight (int | None): the maximum number of the created but not handled tasks (including the tasks waiting for the semaphore, their hosts, or for the results before them in the ordered results),
+                                        so the memory is bounded by this value instead of the length of the `task_params_list`, default is None, which means 2 times of the `max_concurrency`.
+            concurrency_limiter (ConcurrencyLimiter | None): the adaptive limiter of the number of the running tasks just like the `Tasker`, and the `max_concurrency` is the upper bound, default is None.
+            is_skipped_task (Callable[[Any],bool] | None): a function to check wheather the failed task was just skipped just like the `Tasker`, default is None.
+    """
+
+    def __init__(self,
+                 cus_task: Callable[[Any], Awaitable[Any]] | None = None,
+                 task_params_list: Iterable[Any] = [],
+                 max_concurrency: int = 100,
+                 cached_result: bool = False,
+                 stop_when_task_failed: bool = True,
+                 task_scheduler: Scheduler | None = None,
+                 max_in_flight: int | None = None,
+                 concurrency_limiter: ConcurrencyLimiter | None = None,
+                 is_skipped_task: Callable[[Any], bool] | None = None
+                 ) -> None:
+        self.task_job = cus_task
+        self.task_params_list = task_params_list
+        self.task_max_concurrency = max_concurrency
+        self.cached_result = cached_result
+        self.stop_when_task_failed = stop_when_task_failed
+        self.is_running = False
+        self.task_result_dict = {}
+        self.futures: list[asyncio.Task] = []
+        self.task_scheduler = task_scheduler
+        self.max_in_flight = max(max_in_flight if max_in_flight else max_concurrency * 2, max_concurrency)
+        self.concurrency_limiter = concurrency_limiter
+        self.is_skipped_task = is_skipped_task
+
+    @property
+    def current_concurrency(self) -> int:
+        """
+            the number of the tasks allowed to run at the same time, which changes at runtime when the `concurrency_limiter` is set.
+        """
+        if self.concurrency_limiter:
+            return min(self.concurrency_limiter.current_limit, self.task_max_concurrency)
+        return self.task_max_concurrency
+
+    async def _run_task(self, semaphore: asyncio.Semaphore, params: Any) -> tuple[Any, Any]:
+        if self.task_scheduler:
+            # wait outside the semaphore, so the not ready hosts won't hold the in-flight slots
+            while (wait_seconds := self.task_scheduler.try_acquire(params)) > 0:
+                await asyncio.sleep(wait_seconds)
+        try:
+            async with semaphore:
+                return params, await self.task_job(params)
+        except Exception as err:
+            logger.error(f'error when running the task with params({params}), error: {err}.')
+            return params, None
+        finally:
+            if self.task_scheduler:
+                self.task_scheduler.release(params)
+
+    def terminal_task(self, quiet: bool = False):
+        """
+            a func to cancel all of the not finished tasks, it should be called inside the running event loop.
+        """
+        canceled = False
+        for f in self.futures:
+            if not f.done():
+                f.cancel()
+                canceled = True
+        if canceled or not quiet:
+            logger.warning('async task canceled !!!')
+
+    async def iter_task(self, ordered: bool = False) -> AsyncIterator[tuple[Any, Any]]:
+        """
+            run all tasks and yield the `(params, result)` of per task as soon as it finished, for example: `async for params, result in tasker.iter_task(): ...`.
+            the not finished tasks will be cancelled when the iterating is stopped, and the results are not saved into the `task_result_dict`.
+
+            Parameters:
+                ordered (bool): wheather yield the results in the same order of the `task_params_list`, default is False, which means yield them in the finished order.
+                                the ordered results may be held in memory until all of the results before them finished.
+        """
+        if self.task_job is None:
+            logger.warning('no tasks need to run !!!')
+            return
+        self.is_running = True
+        try:
+            semaphore = asyncio.Semaphore(self.task_max_concurrency)
+            params_iterator = enumerate(self.task_params_list)
+            in_flight: dict[asyncio.Task, tuple[int, float]] = {}
+            results = _WindowResults(ordered)
+            exhausted = False
+            while True:
+                # only create the next tasks when the number of the not handled tasks is under the `max_in_flight`,
+                # and under the current limit of the `concurrency_limiter` if it was set
+                while not exhausted and len(in_flight) + results.held_numbers < self.max_in_flight and \
+                        (self.concurrency_limiter is None or len(in_flight) < self.current_concurrency):
+                    index, params = next(params_iterator, (None, None))
+                    if index is None:
+                        exhausted = True
+                        break
+                    in_flight[asyncio.ensure_future(self._run_task(semaphore, params))] = (index, monotonic())
+                self.futures = list(in_flight)
+                if not in_flight:
+                    break
+                done, _ = await asyncio.wait(self.futures, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    params, result = future.result()
+                    index, started_at = in_flight.pop(future)
+                    if self.concurrency_limiter:
+                        self.concurrency_limiter.record(monotonic() - started_at, not result)
+                    results.put(index, params, result)
+                for params, result in results.pop_ready():
+                    yield params, result
+        finally:
+            self.terminal_task(quiet=True)
+            if self.futures:
+                await asyncio.gather(*self.futures, return_exceptions=True)
+            self.futures = []
+            self.is_running = False
+
+    async def start_task(self) -> dict[Any, Any]:
+        """
+            a coroutine func to start all tasks
+        """
+        logger.info('start to run all async tasks !!!')
+        self.task_result_dict = {}
+        results = self.iter_task()
+        try:
+            async for params, result in results:
+                if self.cached_result:
+                    self.task_result_dict[params] = result
+                if not result:
+                    logger.warning(f"when running task with params({params}), we get the None result ! ")
+                    if self.stop_when_task_failed and not (self.is_skipped_task and self.is_skipped_task(params)):
+                        logger.warning(f"failed to run the task with params({params}), it'going to cancel all running jobs !!!")
+                        self.terminal_task()
+                        break
+        except asyncio.CancelledError:
+            self.terminal_task()
+            raise
+        except Exception as err:
+            logger.error(f'error when running the async task jobs, error: {err}.')
+        finally:
+            await results.aclose()  # wait for the cancelled tasks
+            logger.info('finished all running async task !!!')
+        return self.task_result_dict
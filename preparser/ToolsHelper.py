@@ -1,15 +1,27 @@
+import logging
+from array import array
+from typing import Any
 from bs4 import BeautifulSoup
 from re import Pattern,search
+from .ParserHelper import Souper,Parser_Backend
+from .TableHelper import TableScanner,Table_Output,Column_Types
 # from .TaskHelper import Tasker  # ready for the futures functions
 
+logger = logging.getLogger(__name__)
+
 class Tooler():
     """
        an Object to help manage some of the additional tools of preparser
+
+       Parameters:
+            parser_backend (Literal['html.parser','lxml','html5lib','selectolax']): the parser backend to build the `BeautifulSoup` Object, default is `html.parser`,
+                                                if the backend is not installed, will fall back to the `html.parser`, and as the tools here need the `BeautifulSoup` Object, `selectolax` will use `lxml` instead.
     """
-    def __init__(self,start_threading:bool = False,threading_numbers:int=3) -> None:
+    def __init__(self,start_threading:bool = False,threading_numbers:int=3,parser_backend:Parser_Backend = 'html.parser') -> None:
         #  here below defines the parameters for the futures optimise
         self.start_threading = start_threading
         self.threading_numbers = threading_numbers
+        self.souper = Souper(parser_backend)
         
 
     
@@ -33,12 +45,12 @@ class Tooler():
                 decoded_html = clear_conetnt.encode('utf-8').decode('unicode_escape')
                 decode_soup = None
                 if transfer_soup:
-                    decode_soup = BeautifulSoup(decoded_html, 'html.parser')
+                    decode_soup = self.souper.make_soup(decoded_html)
                 return [decoded_html,decode_soup]
             else:
                 return None
         except Exception as error:
-            print(f"error: when decoding the encode html content, error: {error} !!!!")
+            logger.error(f"when decoding the encode html content, error: {error} !!!!")
             return None
 
     def find_all_betweem_same_level_nodes(self,start_node:BeautifulSoup | None =None,
@@ -62,7 +74,7 @@ class Tooler():
         
         
         if (not start_node)  and (not end_node):
-            print("error: start_node and end_node are both None !!!")
+            logger.error("start_node and end_node are both None !!!")
             return None
         valid_numbers = 0
         parent = parent_node if parent_node else (start_node.parent if start_node else end_node.parent)
@@ -83,16 +95,17 @@ class Tooler():
             end_index += 1
         between_nodes_list = parent_chidren_list[start_index:end_index]
         if len(between_nodes_list) == valid_numbers:
-            print('no sibling nodes between the start_node and end_node !!!')
+            logger.warning('no sibling nodes between the start_node and end_node !!!')
             return None
         else:
             html_str = ''.join(str(node) for node in between_nodes_list)
-            return BeautifulSoup(html_str, 'html.parser')
+            return self.souper.make_soup(html_str)
 
 
     def get_per_table_data(self,table_soup:BeautifulSoup) -> list[list[str]]:
         """
             get the table datas from the standard element of table, which has 1 row head at most.
+            for many tables (or the tables with the `rowspan` / `colspan`), the `get_tables_data` is much faster.
         
         """
         final_tables_row = []
@@ -119,4 +132,32 @@ class Tooler():
                     tr_datas.append(td_txt)
                 final_tables_row.append(tr_datas)
         return final_tables_row
-    
\ No newline at end of file
+    
+
+
+    def get_tables_data(self,html:str | BeautifulSoup,
+                        table_attrs:dict[str,str | bool] | None = None,
+                        output:Table_Output = 'rows',
+                        coerce_types:bool = False,
+                        column_types:Column_Types | None = None,
+                        array_columns:bool = False
+                        ) -> list[list[list[Any]] | list[dict[str | int,Any]] | dict[str | int,list[Any] | array]]:
+        """
+            get the datas of all of the matched tables in the page in a single pass by the `TableScanner`, which scans the raw html without building the `BeautifulSoup` Object,
+            and expands the `rowspan` / `colspan` cells, so it's much faster than the `get_per_table_data` for the table scraping.
+
+            Parameters:
+                html (str | BeautifulSoup): the raw html of the page (the fastest), or the `BeautifulSoup` Object which will be turned back into the html.
+                table_attrs (dict[str,str | bool] | None): only get the tables which have these attributes, like `{'class': 'data'}` or `{'id': 'prices'}`, default is None, which means all of the tables.
+                output (Literal['rows','records','columns']): the format of per table, default is `rows`.
+                                                              `rows`: the list of the rows, with the header row as the first one, just like the `get_per_table_data`.
+                                                              `records`: the list of the dicts of the column names and the cells of per row.
+                                                              `columns`: the dict of the column names and the cells of per column.
+                coerce_types (bool): wheather convert the number cells into the `int` or `float`, and the empty ones into None, default is False.
+                column_types (dict[str | int,Callable[[str],Any]] | None): the converters of the columns by the header name or the column index, which take over the `coerce_types`, default is None.
+                array_columns (bool): in the `columns` output, store the number columns in the compact `array` instead of the list, default is False.
+        """
+        if not isinstance(html,str):  # the `BeautifulSoup` Object or a `Tag` of it
+            html = str(html)
+        tables = TableScanner(table_attrs).scan(html,coerce_types,column_types)
+        return [table.to_output(output,array_columns) for table in tables]
@@ -0,0 +1,189 @@
+from math import ceil, log
+from hashlib import blake2b
+from typing import Iterable, Iterator, Literal
+from urllib.parse import urlsplit, urlunsplit, unquote_plus
+
+# the common tracking query parameters, the one ends with `*` matches all of the parameters with the same prefix
+DEFAULT_TRACKING_PARAMS = ['utm_*', 'gclid', 'gclsrc', 'dclid', 'fbclid', 'msclkid', 'yclid', 'mc_cid', 'mc_eid', '_ga', '_gl', 'igshid', 'spm', 'ref_src']
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def _get_url_hash(url: str) -> bytes:
+    return blake2b(url.encode('utf-8'), digest_size=16).digest()
+
+
+class UrlSeenSet():
+    """
+        A slight exact seen-set of urls, which only keeps a 64 bits hash of per url instead of the url string, it takes about 70 bytes for per url with the overhead of the python `int` and `set`.
+    """
+    def __init__(self) -> None:
+        self._hashes: set[int] = set()
+
+    def add(self, url: str) -> bool:
+        """
+            add the url into the set, return True if the url was not seen before.
+        """
+        url_hash = int.from_bytes(_get_url_hash(url)[:8], 'little')
+        if url_hash in self._hashes:
+            return False
+        self._hashes.add(url_hash)
+        return True
+
+    def __contains__(self, url: str) -> bool:
+        return int.from_bytes(_get_url_hash(url)[:8], 'little') in self._hashes
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+
+class BloomFilter():
+    """
+        A slight bloom filter seen-set of urls, which takes fixed memory no matter how many urls were added,
+        but a few of the not seen urls may be treated as seen with the probability of `error_rate`.
+
+        Parameters:
+            capacity (int): the expected number of the urls, default is 10,000,000.
+            error_rate (float): the false positive probability when the `capacity` urls were added, default is 0.001.
+    """
+    def __init__(self, capacity: int = 10_000_000, error_rate: float = 0.001) -> None:
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.bit_numbers = max(8, ceil(-capacity * log(error_rate) / (log(2) ** 2)))
+        self.hash_numbers = max(1, round(self.bit_numbers / capacity * log(2)))
+        self._bits = bytearray(ceil(self.bit_numbers / 8))
+        self._count = 0
+
+    def _get_bit_indexes(self, url: str) -> list[int]:
+        # double hashing: h1 + i * h2
+        url_hash = _get_url_hash(url)
+        h1 = int.from_bytes(url_hash[:8], 'little')
+        h2 = int.from_bytes(url_hash[8:], 'little') | 1
+        return [(h1 + i * h2) % self.bit_numbers for i in range(self.hash_numbers)]
+
+    def add(self, url: str) -> bool:
+        """
+            add the url into the filter, return True if the url was not seen before.
+        """
+        is_new = False
+        for index in self._get_bit_indexes(url):
+            mask = 1 << (index & 7)
+            if not self._bits[index >> 3] & mask:
+                self._bits[index >> 3] |= mask
+                is_new = True
+        if is_new:
+            self._count += 1
+        return is_new
+
+    def __contains__(self, url: str) -> bool:
+        return all(self._bits[index >> 3] & (1 << (index & 7)) for index in self._get_bit_indexes(url))
+
+    def __len__(self) -> int:
+        return self._count
+
+
+class Urler():
+    """
+        A slight url object to canonicalize the urls and drop the duplicated ones.
+
+        Parameters:
+            tracking_params (list[str] | None): the query parameters to remove from the urls, the one ends with `*` matches all of the parameters with the same prefix,
+                                                default is None, which means the common tracking parameters like `utm_*`, `gclid`, `fbclid` and so on.
+            dedup_backend (Literal['set','bloom']): the seen-set to drop the duplicated urls, default is `set`.
+                                                `set`: the exact hash set, which takes about 70 bytes for per url (a 64 bits hash in the python `set`).
+                                                `bloom`: the bloom filter, which takes fixed memory (about 18 MB for 10,000,000 urls with 0.001 error rate), but may drop a few of the not duplicated urls.
+            dedup_capacity (int): the expected number of the urls for the `bloom` backend, default is 10,000,000.
+            dedup_error_rate (float): the false positive probability for the `bloom` backend, default is 0.001.
+    """
+    def __init__(self,
+                 tracking_params: list[str] | None = None,
+                 dedup_backend: Literal['set', 'bloom'] = 'set',
+                 dedup_capacity: int = 10_000_000,
+                 dedup_error_rate: float = 0.001
+                 ) -> None:
+        tracking_params = DEFAULT_TRACKING_PARAMS if tracking_params is None else tracking_params
+        self._tracking_names = {param.lower() for param in tracking_params if not param.endswith('*')}
+        self._tracking_prefixes = tuple(param[:-1].lower() for param in tracking_params if param.endswith('*'))
+        self.dedup_backend: Literal['set', 'bloom'] = dedup_backend
+        self.dedup_capacity = dedup_capacity
+        self.dedup_error_rate = dedup_error_rate
+        self.seen_urls = self._create_seen_set()
+        self.duplicated_numbers = 0
+
+    def _create_seen_set(self) -> UrlSeenSet | BloomFilter:
+        if self.dedup_backend == 'bloom':
+            return BloomFilter(self.dedup_capacity, self.dedup_error_rate)
+        return UrlSeenSet()
+
+    def reset(self):
+        """
+            forget all of the seen urls.
+        """
+        self.seen_urls = self._create_seen_set()
+        self.duplicated_numbers = 0
+
+    def _is_tracking_param(self, name: str) -> bool:
+        name = name.lower()
+        return name in self._tracking_names or (bool(self._tracking_prefixes) and name.startswith(self._tracking_prefixes))
+
+    def canonicalize(self, url: str) -> str:
+        """
+            canonicalize the url: lowercase the scheme and host, remove the default port, the fragment and the tracking parameters, and sort the query parameters by their names.
+            the canonical url is the one to fetch, so the query parameters are kept as they are, like the `?flag` without the value and the `%20` won't be changed.
+            for example, `HTTPS://Example.com:443/a?b=2&utm_source=x&a=1#top` will be `https://example.com/a?a=1&b=2`.
+        """
+        url = url.strip()
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in DEFAULT_PORTS:
+            return url
+        host = (parts.hostname or '').rstrip('.')
+        if ':' in host:  # ipv6
+            host = f'[{host}]'
+        try:
+            port = parts.port
+        except ValueError:
+            port = None
+        netloc = host if port in (None, DEFAULT_PORTS[scheme]) else f'{host}:{port}'
+        if parts.username is not None:
+            user_info = parts.username if parts.password is None else f'{parts.username}:{parts.password}'
+            netloc = f'{user_info}@{netloc}'
+        query_params = []
+        for param in parts.query.split('&'):
+            name = unquote_plus(param.partition('=')[0])
+            if param and not self._is_tracking_param(name):
+                query_params.append((name, param))
+        query_params.sort(key=lambda query_param: query_param[0])  # the stable sort keeps the order of the repeated parameters
+        return urlunsplit((scheme, netloc, parts.path or '/', '&'.join(param for _, param in query_params), ''))
+
+    def add(self, url: str) -> bool:
+        """
+            add the canonicalized url into the seen-set, return True if the url was not seen before.
+        """
+        is_new = self.seen_urls.add(url)
+        if not is_new:
+            self.duplicated_numbers += 1
+        return is_new
+
+    def filter_urls(self, url_list: Iterable[str]) -> Iterator[str]:
+        """
+            canonicalize the urls and yield the ones which were not seen before.
+        """
+        for url in url_list:
+            if not url:
+                continue
+            canonical_url = self.canonicalize(url)
+            if self.add(canonical_url):
+                yield canonical_url
+
+    @staticmethod
+    def iter_file_urls(file_path: str, encoding: str = 'utf-8') -> Iterator[str]:
+        """
+            yield the urls from a text file line by line without loading the whole file, the blank lines and the lines start with `#` are skipped,
+            for example: `PreParser(url_list=Urler.iter_file_urls('urls.txt'))`.
+        """
+        with open(file_path, 'r', encoding=encoding) as file:
+            for line in file:
+                url = line.strip()
+                if url and not url.startswith('#'):
+                    yield url
@@ -1,5 +1,82 @@
+from importlib import import_module
+from typing import TYPE_CHECKING
 
-from .PreParseHelper import PreParser,BeautifulSoup,Json_Data,Tasker,requests
-from .FileHelper import Filer
-from .ToolsHelper import Tooler 
+# the public objects and their modules, which are only imported when they are used for the first time,
+# so the unused backends (like the playwright browsers) cost nothing when importing preparser
+_LAZY_ATTRIBUTES = {
+    'PreParser': '.PreParseHelper',
+    'Json_Data': '.PreParseHelper',
+    'BeautifulSoup': 'bs4',
+    'requests': None,
+    'Tasker': '.TaskHelper',
+    'AsyncTasker': '.TaskHelper',
+    'Filer': '.FileHelper',
+    'Tooler': '.ToolsHelper',
+    'TableScanner': '.TableHelper',
+    'ExtractedTable': '.TableHelper',
+    'Sessioner': '.SessionHelper',
+    'AsyncSessioner': '.SessionHelper',
+    'FetchedResponse': '.SessionHelper',
+    'ResponseChecker': '.SessionHelper',
+    'ResponseAbortedError': '.SessionHelper',
+    'StreamReader': '.SessionHelper',
+    'AsyncStreamReader': '.SessionHelper',
+    'Scheduler': '.ScheduleHelper',
+    'TokenBucket': '.ScheduleHelper',
+    'ConcurrencyLimiter': '.ScheduleHelper',
+    'RetryPolicy': '.RetryHelper',
+    'CircuitBreaker': '.RetryHelper',
+    'Cacher': '.CacheHelper',
+    'CacheEntry': '.CacheHelper',
+    'Journaler': '.JournalHelper',
+    'Sharder': '.ShardHelper',
+    'WorkQueue': '.ShardHelper',
+    'SqliteWorkQueue': '.ShardHelper',
+    'Metricer': '.MetricHelper',
+    'UrlTrace': '.MetricHelper',
+    'METRIC_PHASES': '.MetricHelper',
+    'Urler': '.UrlHelper',
+    'UrlSeenSet': '.UrlHelper',
+    'BloomFilter': '.UrlHelper',
+    'Souper': '.ParserHelper',
+    'ResponseParser': '.ParserHelper',
+    'ResourcePolicy': '.DynamicHelper',
+    'HEAVY_RESOURCE_TYPES': '.DynamicHelper',
+    'AutoModer': '.AutoHelper',
+}
 
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name: str):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name = _LAZY_ATTRIBUTES[name]
+    if module_name is None:  # the module itself
+        value = import_module(name)
+    else:
+        value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value  # cache it, so the `__getattr__` won't be called again
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
+
+
+if TYPE_CHECKING:
+    from .PreParseHelper import PreParser,BeautifulSoup,Json_Data,Tasker,AsyncTasker,requests
+    from .FileHelper import Filer
+    from .ToolsHelper import Tooler
+    from .TableHelper import TableScanner,ExtractedTable
+    from .SessionHelper import Sessioner,AsyncSessioner,FetchedResponse,ResponseChecker,ResponseAbortedError,StreamReader,AsyncStreamReader
+    from .ScheduleHelper import Scheduler,TokenBucket,ConcurrencyLimiter
+    from .RetryHelper import RetryPolicy,CircuitBreaker
+    from .CacheHelper import Cacher,CacheEntry
+    from .JournalHelper import Journaler
+    from .ShardHelper import Sharder,WorkQueue,SqliteWorkQueue
+    from .MetricHelper import Metricer,UrlTrace,METRIC_PHASES
+    from .UrlHelper import Urler,UrlSeenSet,BloomFilter
+    from .ParserHelper import Souper,ResponseParser
+    from .DynamicHelper import ResourcePolicy,HEAVY_RESOURCE_TYPES
+    from .AutoHelper import AutoModer
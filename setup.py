@@ -32,6 +32,14 @@ setup(
         "beautifulsoup4",
         "playwright"  
     ],
+    extras_require={  # optional packages
+        "async": ["aiohttp"],
+        "lxml": ["lxml"],
+        "html5lib": ["html5lib"],
+        "selectolax": ["selectolax"],
+        "orjson": ["orjson"],
+        "ijson": ["ijson"],
+    },
     url="https://github.com/BertramYe/preparser",  # project home page
     license="MIT",
     classifiers=[  # package class label, which helps user learn about current package